@@ -84,3 +84,13 @@ WHERE year_id = 10;
 -- 4. Major functions sum to Public Budget amount
 -- 5. State companies are handled separately in economic classification
 -- 6. Detailed sub-function breakdowns need source document data
+
+-- =====================================================
+-- REFRESH MATERIALIZED VIEWS (create_materialized_views.sql)
+-- =====================================================
+DO $$
+BEGIN
+    IF to_regproc('refresh_budget_views') IS NOT NULL THEN
+        PERFORM refresh_budget_views();
+    END IF;
+END $$;
@@ -37,3 +37,13 @@ WHERE year_id = 10;
 
 -- Expected Public Budget Total: 55,845,000 (55.845T)
 -- State Companies Total: 74,594,000 (74.594T) - handled in expenditures table
+
+-- =====================================================
+-- REFRESH MATERIALIZED VIEWS (create_materialized_views.sql)
+-- =====================================================
+DO $$
+BEGIN
+    IF to_regproc('refresh_budget_views') IS NOT NULL THEN
+        PERFORM refresh_budget_views();
+    END IF;
+END $$;
@@ -46,3 +46,13 @@ FROM expenditures
 WHERE year_id = 10;
 
 -- Expected Total: 74,594,000 (74.594T)
+
+-- =====================================================
+-- REFRESH MATERIALIZED VIEWS (create_materialized_views.sql)
+-- =====================================================
+DO $$
+BEGIN
+    IF to_regproc('refresh_budget_views') IS NOT NULL THEN
+        PERFORM refresh_budget_views();
+    END IF;
+END $$;
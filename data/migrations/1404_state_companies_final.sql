@@ -37,3 +37,13 @@ FROM expenditures
 WHERE year_id = 10;
 
 -- Expected: 63,770,000 (63.77T)
+
+-- =====================================================
+-- REFRESH MATERIALIZED VIEWS (create_materialized_views.sql)
+-- =====================================================
+DO $$
+BEGIN
+    IF to_regproc('refresh_budget_views') IS NOT NULL THEN
+        PERFORM refresh_budget_views();
+    END IF;
+END $$;
@@ -1,12 +1,23 @@
 import { NextResponse } from 'next/server';
 import { query } from '@/lib/db';
 
+// Read from the mv_* materialized views (scripts/create_materialized_views.sql)
+// instead of joining the base tables on every request
+const useMaterializedViews = process.env.BUDGET_USE_MATERIALIZED_VIEWS === 'true';
+
 export async function GET(request: Request) {
   try {
     const { searchParams } = new URL(request.url);
     const year = searchParams.get('year');
     
-    if (year) {
+    if (year && useMaterializedViews) {
+      const result = await query(
+        'SELECT * FROM mv_budget_year_detail WHERE year_persian = $1',
+        [parseInt(year)]
+      );
+
+      return NextResponse.json(result[0] || null);
+    } else if (year) {
       // Get specific year with complete revenue breakdown
       const result = await query(`
         SELECT 
@@ -68,6 +79,14 @@ export async function GET(request: Request) {
       `, [parseInt(year)]);
       
       return NextResponse.json(result[0] || null);
+    } else if (useMaterializedViews) {
+      const result = await query(`
+        SELECT year_persian, year_gregorian, revenue_total, expenditure_total, surplus_deficit, status
+        FROM mv_budget_overview
+        ORDER BY year_persian
+      `);
+
+      return NextResponse.json(result);
     } else {
       // Get all years summary
       const result = await query(`
@@ -5,19 +5,10 @@ Comprehensive analysis of 1400 budget data
 Compares text extraction with CSV data
 """
 
-import pandas as pd
 import json
 import os
 
-def clean_number(s):
-    """Clean and convert number strings to float"""
-    if isinstance(s, (int, float)):
-        return s
-    s = str(s).replace(',', '').strip()
-    try:
-        return float(s)
-    except ValueError:
-        return None
+from csv_cache import load_csv
 
 def analyze_1400():
     print("="*80)
@@ -56,14 +47,14 @@ def analyze_1400():
     
     revenues_file = '../data/raw/unverified/revenues1400.csv'
     if os.path.exists(revenues_file):
-        df_rev = pd.read_csv(revenues_file)
-        df_rev['1400_cleaned'] = df_rev['1400'].apply(clean_number)
+        df_rev = load_csv(revenues_file)
+        df_rev['1400_cleaned'] = df_rev['1400']
         
         total_revenues = df_rev['1400_cleaned'].sum()
         print(f"  Total Revenues: {total_revenues:,.2f} billion rials\n")
         
         # By Level 1
-        level1_summary = df_rev.groupby('LEVEL1')['1400_cleaned'].sum().sort_values(ascending=False)
+        level1_summary = df_rev.groupby('LEVEL1', observed=True)['1400_cleaned'].sum().sort_values(ascending=False)
         print("  📊 BY MAJOR CATEGORY (LEVEL1):")
         for cat, amount in level1_summary.items():
             print(f"    {cat:40s}: {amount:>20,.0f} billion rials")
@@ -99,14 +90,14 @@ def analyze_1400():
     
     expenses_file = '../data/raw/unverified/expenses1400.csv'
     if os.path.exists(expenses_file):
-        df_exp = pd.read_csv(expenses_file)
-        df_exp['1400_cleaned'] = df_exp['1400'].apply(clean_number)
+        df_exp = load_csv(expenses_file)
+        df_exp['1400_cleaned'] = df_exp['1400']
         
         total_expenses = df_exp['1400_cleaned'].sum()
         print(f"  Total Expenses: {total_expenses:,.2f} billion rials\n")
         
         # By Level 1
-        level1_summary = df_exp.groupby('LEVEL1')['1400_cleaned'].sum().sort_values(ascending=False)
+        level1_summary = df_exp.groupby('LEVEL1', observed=True)['1400_cleaned'].sum().sort_values(ascending=False)
         print("  📊 BY MAJOR CATEGORY (LEVEL1):")
         for cat, amount in level1_summary.items():
             print(f"    {cat:40s}: {amount:>20,.0f} billion rials")
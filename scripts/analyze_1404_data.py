@@ -8,16 +8,8 @@ import pandas as pd
 import json
 import os
 
-def clean_number(s):
-    if isinstance(s, (int, float)):
-        return s
-    if pd.isna(s):
-        return 0.0
-    s = str(s).replace(',', '').strip()
-    try:
-        return float(s)
-    except ValueError:
-        return 0.0
+from csv_cache import load_csv
+from numeric_ingest import parse_numeric
 
 def analyze_1404():
     print("="*80)
@@ -26,13 +18,13 @@ def analyze_1404():
     
     # Read the revenues CSV
     csv_path = '../data/raw/unverified/revenues1404.csv'
-    df = pd.read_csv(csv_path)
+    df = load_csv(csv_path)
     
     print(f"\n📊 Loaded {len(df)} rows")
     print(f"Columns: {list(df.columns)}")
     
     # Clean the Grand Total column
-    df['amount'] = df['Grand Total'].apply(clean_number)
+    df['amount'] = parse_numeric(df['Grand Total'])
     
     print(f"\n💰 REVENUE BREAKDOWN:")
     print("-"*80)
@@ -4,79 +4,70 @@
 Analyze CSV budget data for 1399-1403
 """
 
-import pandas as pd
 import json
 
+from budget_tree import load_tree
+from csv_cache import load_budget_csv
+
 def analyze_revenue_1399():
     """Analyze revenue data for 1399"""
     
-    df = pd.read_csv('../data/raw/unverified/revenues1399.csv')
+    df = load_budget_csv('revenues', 1399)
+    # Subtotals of every LEVEL path, built once (see budget_tree)
+    tree = load_tree('revenues', 1399)
     
     print("=" * 80)
     print("REVENUE ANALYSIS - 1399")
     print("=" * 80)
     
     # Total revenues
-    total = df[df['LEVEL'] == 0]['1399'].values[0]
-    print(f"\nTotal Revenues: {total} billion rials")
+    total = tree.amount()
+    print(f"\nTotal Revenues: {total:,.2f} billion rials")
     
     # Major categories (LEVEL1)
-    level1 = df[df['LEVEL'] == 1][['LEVEL1', '1399']]
     print("\n📊 MAJOR CATEGORIES (Level 1):")
     print("-" * 80)
-    for _, row in level1.iterrows():
-        print(f"{row['LEVEL1']:40s}: {row['1399']:>20s} billion rials")
+    for name in tree.children():
+        print(f"{name:40s}: {tree.amount(name):>20,.2f} billion rials")
     
     # Tax breakdown (LEVEL2 where LEVEL1 = درآمدها)
-    tax_detail = df[(df['LEVEL1'] == 'درآمدها') & (df['LEVEL'] == 2)]
     print("\n💰 TAX AND REVENUE BREAKDOWN:")
     print("-" * 80)
-    for _, row in tax_detail.iterrows():
-        print(f"{row['LEVEL2']:40s}: {row['1399']:>20s} billion rials")
+    for name in tree.children('درآمدها'):
+        print(f"{name:40s}: {tree.amount('درآمدها', name):>20,.2f} billion rials")
     
     # Extract key numbers
-    tax_total = df[(df['LEVEL1'] == 'درآمدها') & (df['LEVEL2'] == 'مالیات')]['1399'].values
-    if len(tax_total) > 0:
-        print(f"\n✅ Total Tax Revenue: {tax_total[0]} billion rials")
+    if ('درآمدها', 'مالیات') in tree:
+        print(f"\n✅ Total Tax Revenue: {tree.amount('درآمدها', 'مالیات'):,.2f} billion rials")
     
-    oil_total = df[(df['LEVEL1'] == 'سرمایه‌های ملی') & (df['LEVEL2'] == 'نفت')]['1399'].values
-    if len(oil_total) > 0:
-        print(f"✅ Oil Revenue: {oil_total[0]} billion rials")
+    if ('سرمایه‌های ملی', 'نفت') in tree:
+        print(f"✅ Oil Revenue: {tree.amount('سرمایه‌های ملی', 'نفت'):,.2f} billion rials")
     
     return df
 
 def analyze_expenses_1399():
     """Analyze expense data for 1399"""
     
-    df = pd.read_csv('../data/raw/unverified/expenses1399.csv')
+    df = load_budget_csv('expenses', 1399)
+    tree = load_tree('expenses', 1399)
     
     print("\n\n" + "=" * 80)
     print("EXPENSE ANALYSIS - 1399")
     print("=" * 80)
     
     # Get unique LEVEL1 categories
-    level1_cats = df[df['LEVEL'] == 1]['LEVEL1'].unique()
+    level1_cats = list(tree.children())
     print(f"\nFound {len(level1_cats)} major expenditure categories")
     
-    # Convert values to float first
-    def clean_number(x):
-        if pd.isna(x):
-            return 0
-        if isinstance(x, str):
-            return float(x.replace(',', ''))
-        return float(x)
-    
-    df['1399_num'] = df['1399'].apply(clean_number)
-    
     # Aggregate by LEVEL1
-    level1_agg = df[df['LEVEL'] == 1].groupby('LEVEL1')['1399_num'].sum().sort_values(ascending=False)
+    level1_agg = sorted(((cat, tree.amount(cat)) for cat in level1_cats), key=lambda item: item[1], reverse=True)
     
     print("\n💸 EXPENDITURE BY MAJOR CATEGORY:")
     print("-" * 80)
-    for cat, amount in level1_agg.items():
+    for cat, amount in level1_agg:
         print(f"{cat:40s}: {amount:>20,.2f} billion rials")
     
-    total_exp = df[df['LEVEL'] == 0]['1399_num'].sum() if len(df[df['LEVEL'] == 0]) > 0 else df['1399_num'].sum()
+    total_exp = tree.amount()
     print(f"\n✅ Total Expenditures: {total_exp:,.2f} billion rials")
     
     return df
@@ -84,30 +75,20 @@ def analyze_expenses_1399():
 def create_summary():
     """Create summary JSON with key metrics"""
     
-    rev_df = pd.read_csv('../data/raw/unverified/revenues1399.csv')
-    exp_df = pd.read_csv('../data/raw/unverified/expenses1399.csv')
-    
-    # Convert to float (remove commas if any)
-    def clean_number(x):
-        if pd.isna(x):
-            return 0
-        if isinstance(x, str):
-            return float(x.replace(',', ''))
-        return float(x)
-    
-    rev_df['1399'] = rev_df['1399'].apply(clean_number)
-    exp_df['1399'] = exp_df['1399'].apply(clean_number)
+    # Trees are cached per process, so this reuses the ones built above
+    rev_tree = load_tree('revenues', 1399)
+    exp_tree = load_tree('expenses', 1399)
     
     summary = {
         "year": 1399,
         "source": "CSV files from unverified folder",
         "revenues": {
-            "total": float(rev_df[rev_df['LEVEL'] == 0]['1399'].values[0]) if len(rev_df[rev_df['LEVEL'] == 0]) > 0 else 0,
-            "tax": float(rev_df[(rev_df['LEVEL1'] == 'درآمدها') & (rev_df['LEVEL2'] == 'مالیات')]['1399'].values[0]) if len(rev_df[(rev_df['LEVEL1'] == 'درآمدها') & (rev_df['LEVEL2'] == 'مالیات')]) > 0 else 0,
-            "oil": float(rev_df[(rev_df['LEVEL1'] == 'سرمایه‌های ملی') & (rev_df['LEVEL2'] == 'نفت')]['1399'].values[0]) if len(rev_df[(rev_df['LEVEL1'] == 'سرمایه‌های ملی') & (rev_df['LEVEL2'] == 'نفت')]) > 0 else 0,
+            "total": float(rev_tree.amount()),
+            "tax": float(rev_tree.amount('درآمدها', 'مالیات')),
+            "oil": float(rev_tree.amount('سرمایه‌های ملی', 'نفت')),
         },
         "expenditures": {
-            "total": float(exp_df[exp_df['LEVEL'] == 0]['1399'].sum()) if len(exp_df[exp_df['LEVEL'] == 0]) > 0 else float(exp_df['1399'].sum())
+            "total": float(exp_tree.amount())
         }
     }
     
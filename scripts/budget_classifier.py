@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Budget Classifier - Vectorized keyword labelling for budget CSV rows
+Replaces the per-row iterrows() keyword scans in the extraction scripts
+
+Named categories (tax, oil/gas, subsidies, ...) are declared in
+category_rules.json as column + keyword conditions per frame kind.
+CategoryRules compiles them once and evaluates every category of a frame
+together, reporting rows that match several categories or none.
+
+Usage:
+    python budget_classifier.py 1400            # category totals, overlaps, unmatched rows
+
+From another script:
+    from budget_classifier import load_category_rules
+    rules = load_category_rules('revenues')
+    masks = rules.masks(df_rev)
+    totals = rules.totals(df_rev, masks=masks)   # {'tax': ..., 'oil_gas': ...}
+"""
+
+import argparse
+import itertools
+import json
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Columns joined (in this order) into the text that keywords are matched against
+SEARCH_COLUMNS = ('TOOLTIP', 'LEVEL2', 'LEVEL3')
+
+CURRENT_KEYWORDS = ['جاری', 'عملیاتی', 'هزینه‌ای']
+CAPITAL_KEYWORDS = ['سرمایه', 'تملک', 'عمرانی']
+
+# Ordered rules: the first rule whose keywords match a row wins
+EXPENDITURE_RULES = [
+    ('current', CURRENT_KEYWORDS),
+    ('capital', CAPITAL_KEYWORDS),
+]
+
+UNCLASSIFIED = 'unclassified'
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'category_rules.json')
+
+
+def compile_keywords(keywords):
+    """
+    Compile a keyword list into a single alternation regex.
+
+    Args:
+        keywords (list): Literal substrings to search for
+
+    Returns:
+        re.Pattern: Pattern matching any of the keywords
+    """
+    # Longest first so overlapping keywords never shadow each other
+    ordered = sorted(set(keywords), key=len, reverse=True)
+    return re.compile('|'.join(re.escape(kw) for kw in ordered))
+
+
+def search_text(df, columns=SEARCH_COLUMNS):
+    """
+    Build the per-row search text by joining the given columns with spaces.
+
+    Missing columns and empty cells contribute an empty string, same as
+    row.get(col, '') did in the old loop.
+
+    Args:
+        df (DataFrame): Budget rows
+        columns (tuple): Column names to join
+
+    Returns:
+        Series: One string per row
+    """
+    parts = []
+    for col in columns:
+        if col in df.columns:
+            # astype(object) first: fillna('') is rejected on categorical columns
+            parts.append(df[col].astype(object).fillna('').astype(str))
+        else:
+            parts.append(pd.Series('', index=df.index))
+
+    text = parts[0]
+    for part in parts[1:]:
+        text = text + ' ' + part
+    return text
+
+
+def classify_rows(df, rules=EXPENDITURE_RULES, columns=SEARCH_COLUMNS, default=UNCLASSIFIED):
+    """
+    Label every row of a frame in one vectorized pass.
+
+    Args:
+        df (DataFrame): Budget rows
+        rules (list): Ordered (label, keywords) pairs; first match wins
+        columns (tuple): Columns whose text is searched
+        default (str): Label for rows no rule matches
+
+    Returns:
+        Series: Label per row, aligned with df.index
+    """
+    if df.empty:
+        return pd.Series(default, index=df.index, dtype=object)
+
+    text = search_text(df, columns)
+    conditions = [text.str.contains(compile_keywords(keywords), regex=True).to_numpy()
+                  for _, keywords in rules]
+    labels = [label for label, _ in rules]
+
+    # np.select takes the first true condition, preserving rule priority
+    return pd.Series(np.select(conditions, labels, default=default), index=df.index)
+
+
+def sum_by_label(df, labels, amount_col='amount'):
+    """
+    Sum an amount column per label.
+
+    Args:
+        df (DataFrame): Budget rows
+        labels (Series): Output of classify_rows()
+        amount_col (str): Column holding cleaned amounts
+
+    Returns:
+        dict: label -> total amount
+    """
+    return df[amount_col].groupby(labels).sum().to_dict()
+
+
+def split_current_capital(df, amount_col='amount'):
+    """
+    Split expenditure rows into current and capital totals.
+
+    Args:
+        df (DataFrame): Expense rows with a cleaned amount column
+        amount_col (str): Column holding cleaned amounts
+
+    Returns:
+        tuple: (current_total, capital_total)
+    """
+    totals = sum_by_label(df, classify_rows(df), amount_col)
+    return totals.get('current', 0.0), totals.get('capital', 0.0)
+
+
+class CategoryRules:
+    """
+    Compiled category rules for one kind of frame.
+
+    A category matches a row when every condition in its "all" list
+    matches; a condition matches when its column contains any of its
+    keywords. Each distinct column text and each distinct condition is
+    computed once per frame, however many categories share it.
+
+    Usage:
+        rules = CategoryRules({'tax': {'all': [{'column': 'LEVEL2', 'contains': ['مالیات']}]}})
+        masks = rules.masks(df)           # one boolean column per category
+        rules.report(df, masks)           # overlaps and unmatched rows
+    """
+
+    def __init__(self, categories):
+        self.categories = dict(categories)
+        self._conditions = []    # distinct (column, keywords) pairs
+        self._members = {}       # category -> condition indices
+        for name, spec in self.categories.items():
+            conditions = spec.get('all') or []
+            if not conditions:
+                raise ValueError(f"Category {name!r} has no conditions")
+            parent = spec.get('parent')
+            if parent is not None and parent not in self.categories:
+                raise ValueError(f"Category {name!r} has unknown parent {parent!r}")
+            indices = []
+            for condition in conditions:
+                key = (condition['column'], tuple(condition['contains']))
+                if key not in self._conditions:
+                    self._conditions.append(key)
+                indices.append(self._conditions.index(key))
+            self._members[name] = indices
+        self._patterns = [compile_keywords(keywords) for _, keywords in self._conditions]
+
+    def masks(self, df):
+        """
+        Evaluate every category over a frame.
+
+        Returns:
+            DataFrame: One boolean column per category, aligned with df.index
+        """
+        texts = {}
+        matched = []
+        for (column, _), pattern in zip(self._conditions, self._patterns):
+            if column not in texts:
+                texts[column] = search_text(df, (column,))
+            matched.append(texts[column].str.contains(pattern, regex=True).to_numpy())
+
+        columns = {name: np.logical_and.reduce([matched[i] for i in indices])
+                   for name, indices in self._members.items()}
+        return pd.DataFrame(columns, index=df.index, dtype=bool)
+
+    def totals(self, df, amount_col='amount', masks=None):
+        """
+        Sum an amount column per category.
+
+        Args:
+            df (DataFrame): Budget rows
+            amount_col (str): Column holding cleaned amounts
+            masks (DataFrame, optional): Output of masks(), to reuse
+
+        Returns:
+            dict: category -> total amount (rows in several categories count in each)
+        """
+        masks = self.masks(df) if masks is None else masks
+        amounts = df[amount_col]
+        return {name: float(amounts[masks[name]].sum()) for name in self.categories}
+
+    def report(self, df, masks=None):
+        """
+        Rows claimed by several categories, and rows claimed by none.
+
+        Overlaps between a category and its declared parent are expected
+        and not reported.
+
+        Returns:
+            dict: 'overlaps' {(category, category): row count} and
+                'unmatched' (index of rows no category matches)
+        """
+        masks = self.masks(df) if masks is None else masks
+        overlaps = {}
+        for first, second in itertools.combinations(self.categories, 2):
+            if self._related(first, second):
+                continue
+            count = int((masks[first] & masks[second]).sum())
+            if count:
+                overlaps[(first, second)] = count
+        unmatched = masks.index[~masks.any(axis=1)] if len(masks.columns) else masks.index
+        return {'overlaps': overlaps, 'unmatched': unmatched}
+
+    def _related(self, first, second):
+        """True if one category is an ancestor of the other."""
+        for child, ancestor in ((first, second), (second, first)):
+            parent = self.categories[child].get('parent')
+            while parent is not None:
+                if parent == ancestor:
+                    return True
+                parent = self.categories[parent].get('parent')
+        return False
+
+
+def load_category_rules(kind, path=RULES_PATH):
+    """
+    Load the category rules for 'revenues' or 'expenses' frames.
+
+    Returns:
+        CategoryRules: Compiled rules
+
+    Raises:
+        KeyError: If the rules file has no section for kind
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        rules = json.load(f)
+    return CategoryRules(rules[kind])
+
+
+def main(argv=None):
+    from csv_cache import load_year
+
+    parser = argparse.ArgumentParser(description="Apply category_rules.json to one year's budget CSVs")
+    parser.add_argument('year', type=int)
+    parser.add_argument('--rules', default=RULES_PATH, help='Rules file (default: category_rules.json)')
+    args = parser.parse_args(argv)
+
+    try:
+        frames = dict(zip(('revenues', 'expenses'), load_year(args.year)))
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+
+    for kind, df in frames.items():
+        rules = load_category_rules(kind, args.rules)
+        masks = rules.masks(df)
+        totals = rules.totals(df, str(args.year), masks)
+        report = rules.report(df, masks)
+
+        print("="*80)
+        print(f"{kind.upper()} {args.year}: {len(df)} rows, {len(rules.categories)} categories")
+        print("="*80)
+        for name, total in totals.items():
+            print(f"  {name:<20} {int(masks[name].sum()):>5} rows {total:>20,.2f}")
+        for (first, second), count in report['overlaps'].items():
+            print(f"  ⚠️  {count} rows in both {first} and {second}")
+        print(f"  {len(report['unmatched'])} rows match no category")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Budget DB - Shared PostgreSQL access for the import, update and diagram scripts
+
+One psycopg2 ThreadedConnectionPool per database config, created on first
+use and closed at exit, so a run that applies several corrections and
+regenerates diagrams connects once instead of once per script step.
+
+Configuration comes from the environment (same names as DATABASE_README.md):
+    DATABASE_URL                      full libpq URL; overrides the rest
+    DB_HOST, DB_PORT, DB_NAME,
+    DB_USER, DB_PASSWORD              individual settings
+    DB_POOL_MAX                       max pooled connections (default 10)
+
+Usage:
+    import budget_db
+    with budget_db.cursor() as cur:       # commits when the block exits cleanly
+        cur.execute("UPDATE expenditures SET ... WHERE year_id = %s", (year_id,))
+
+    conn = budget_db.acquire(config)       # long-lived connection (importers)
+    ...
+    budget_db.release(conn, config)
+"""
+
+import atexit
+import getpass
+import os
+import threading
+from contextlib import contextmanager
+
+from psycopg2 import pool
+
+DEFAULT_CONFIG = {
+    'host': 'localhost',
+    'database': 'iran_budget',
+    'user': getpass.getuser(),  # Use current system user
+    'password': '',  # set password if required
+    'port': 5432,
+}
+
+ENV_VARS = {
+    'host': 'DB_HOST',
+    'port': 'DB_PORT',
+    'database': 'DB_NAME',
+    'user': 'DB_USER',
+    'password': 'DB_PASSWORD',
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def db_config(**overrides):
+    """
+    Build connection settings: defaults, then environment, then overrides.
+
+    Args:
+        **overrides: Explicit settings (e.g. database='ib_test'); None values
+            are ignored so argparse defaults can be passed straight through
+
+    Returns:
+        dict: Keyword arguments for psycopg2.connect()
+    """
+    if os.environ.get('DATABASE_URL'):
+        config = {'dsn': os.environ['DATABASE_URL']}
+    else:
+        config = dict(DEFAULT_CONFIG)
+        for key, var in ENV_VARS.items():
+            if os.environ.get(var):
+                config[key] = os.environ[var]
+
+    config.update({key: value for key, value in overrides.items() if value is not None})
+    return config
+
+
+def get_pool(config=None):
+    """
+    Return the shared pool for a config, creating it on first use.
+
+    Args:
+        config (dict, optional): Connection settings (default: db_config())
+
+    Returns:
+        ThreadedConnectionPool
+    """
+    config = config or db_config()
+    key = tuple(sorted((k, str(v)) for k, v in config.items()))
+
+    with _pools_lock:
+        if key not in _pools:
+            maxconn = int(os.environ.get('DB_POOL_MAX', 10))
+            _pools[key] = pool.ThreadedConnectionPool(1, maxconn, **config)
+        return _pools[key]
+
+
+def close_pools():
+    """Close every pooled connection."""
+    with _pools_lock:
+        for connection_pool in _pools.values():
+            connection_pool.closeall()
+        _pools.clear()
+
+
+atexit.register(close_pools)
+
+
+def acquire(config=None):
+    """Take a connection out of the pool; give it back with release()."""
+    return get_pool(config).getconn()
+
+
+def release(conn, config=None):
+    """Return a connection to its pool (open transactions are rolled back)."""
+    get_pool(config).putconn(conn)
+
+
+@contextmanager
+def connection(config=None):
+    """
+    Pooled connection that commits on success and rolls back on error.
+
+    Usage:
+        with connection() as conn:
+            df = pd.read_sql(query, conn)
+    """
+    conn = acquire(config)
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        release(conn, config)
+
+
+@contextmanager
+def cursor(config=None, cursor_factory=None):
+    """Cursor on a pooled connection, committed when the block exits cleanly."""
+    with connection(config) as conn:
+        with conn.cursor(cursor_factory=cursor_factory) as cur:
+            yield cur
+
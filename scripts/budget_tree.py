@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Budget Tree - LEVEL1-LEVEL6 aggregation tree with O(1) path totals
+
+Each revenues{year}.csv / expenses{year}.csv mixes line items with the
+subtotal rows above them: a LEVEL=3 row for "درآمدها / مالیات / مالیات
+شرکت‌ها" sits next to its LEVEL=4 children, and a LEVEL=0 row holds the
+file total. Summing a column therefore double counts, and every script
+used to filter its own slice (df[df['LEVEL'] == 1], str.contains on
+LEVEL2, ...).
+
+BudgetTree builds the whole hierarchy once per frame:
+
+- a row's path is its leading non-empty LEVEL1..LEVEL6 values
+- rows whose path has no descendants are the leaves; one groupby over
+  the leaves' full paths gives the leaf sums
+- the sums are rolled up into every prefix, so total(path), children(path)
+  and reported(path) (the file's own subtotal row) are dict lookups
+
+Usage:
+    python budget_tree.py revenues 1400                 # print the tree
+    python budget_tree.py expenses 1401 --depth 2
+    python budget_tree.py revenues 1400 --check         # computed vs reported subtotals
+
+From another script:
+    from budget_tree import load_tree
+    tree = load_tree('revenues', 1400)
+    tree.total('درآمدها', 'مالیات')
+    tree.children('درآمدها')            # {'مالیات': ..., 'سایر درآمدها': ...}
+"""
+
+import argparse
+import sys
+from functools import lru_cache
+
+import pandas as pd
+
+from csv_cache import LEVEL_COLUMNS, load_budget_csv
+
+ROOT = ()
+
+
+def row_paths(df):
+    """
+    Hierarchy path of every row: its leading non-empty LEVEL values.
+
+    Returns:
+        list: One tuple of stripped names per row; () for rows without
+            LEVEL values (file totals)
+    """
+    columns = [col for col in LEVEL_COLUMNS if col in df.columns]
+    if not columns:
+        return [ROOT] * len(df)
+    levels = [df[col].astype(object).where(df[col].notna(), None).tolist() for col in columns]
+    paths = []
+    for values in zip(*levels):
+        path = []
+        for value in values:
+            name = str(value).strip() if value is not None else ''
+            if not name:
+                break
+            path.append(name)
+        paths.append(tuple(path))
+    return paths
+
+
+def file_total_mask(df):
+    """Rows marked LEVEL=0: the file total, whatever their LEVEL1..LEVEL6 say."""
+    if 'LEVEL' not in df.columns:
+        return [False] * len(df)
+    return (pd.to_numeric(df['LEVEL'], errors='coerce') == 0).tolist()
+
+
+def subtotal_mask(df, paths):
+    """
+    Which rows are subtotals rather than line items.
+
+    A row is a subtotal when another row's path extends its own, or when it
+    is a file total (no LEVEL values, or LEVEL=0 even if LEVEL1 is filled in).
+
+    Args:
+        df: Parsed budget CSV
+        paths: row_paths(df)
+
+    Returns:
+        list: One bool per row
+    """
+    internal = {path[:depth] for path in set(paths) for depth in range(len(path))}
+    return [not path or path in internal or total for path, total in zip(paths, file_total_mask(df))]
+
+
+class BudgetTree:
+    """
+    Subtotals of one amount column at every node of the LEVEL hierarchy.
+
+    Usage:
+        tree = BudgetTree(df_rev, '1400')
+        tree.total()                          # sum of all line items
+        tree.total('درآمدها', 'مالیات')
+        for path, amount in tree.level(2).items():
+            ...
+    """
+
+    def __init__(self, df, amount_col):
+        self.amount_col = amount_col
+        paths = row_paths(df)
+        amounts = pd.to_numeric(df[amount_col], errors='coerce')
+
+        is_leaf = ~pd.Series(subtotal_mask(df, paths), index=df.index, dtype=bool)
+
+        # Explicit subtotal rows (and the LEVEL=0 file total) as printed in the CSV
+        self._reported = {}
+        for path, amount, leaf, file_total in zip(paths, amounts.tolist(), is_leaf.tolist(),
+                                                  file_total_mask(df)):
+            if file_total:
+                path = ROOT
+            if not leaf and pd.notna(amount):
+                self._reported[path] = self._reported.get(path, 0.0) + amount
+
+        # One groupby over the leaves' full paths ...
+        leaf_paths = pd.Series([path for path, leaf in zip(paths, is_leaf) if leaf], dtype=object)
+        leaf_sums = amounts[is_leaf.to_numpy()].groupby(leaf_paths.to_numpy(), sort=False).sum(min_count=1)
+
+        # ... rolled up into every ancestor
+        self._totals = {ROOT: 0.0}
+        self._children = {}
+        for path, amount in leaf_sums.items():
+            amount = 0.0 if pd.isna(amount) else float(amount)
+            for depth in range(len(path) + 1):
+                node = path[:depth]
+                self._totals[node] = self._totals.get(node, 0.0) + amount
+                if depth:
+                    self._children.setdefault(path[:depth - 1], {})[path[depth - 1]] = None
+        for path in self._reported:
+            # Subtotal rows without line items still appear in the tree
+            for depth in range(1, len(path) + 1):
+                self._children.setdefault(path[:depth - 1], {})[path[depth - 1]] = None
+                self._totals.setdefault(path[:depth], 0.0)
+
+        self.leaf_count = len(leaf_sums)
+
+    @classmethod
+    def from_year(cls, kind, year):
+        """Tree of revenues{year}.csv or expenses{year}.csv (through csv_cache)."""
+        return cls(load_budget_csv(kind, year), str(year))
+
+    def __contains__(self, path):
+        return tuple(path) in self._totals
+
+    def total(self, *path):
+        """Sum of the line items under path (0.0 for unknown paths)."""
+        return self._totals.get(tuple(path), 0.0)
+
+    def reported(self, *path):
+        """The file's own subtotal row for path, or None if it has none."""
+        return self._reported.get(tuple(path))
+
+    def amount(self, *path):
+        """reported(path) when the file has a subtotal row for it, else total(path)."""
+        reported = self._reported.get(tuple(path))
+        return self.total(*path) if reported is None else reported
+
+    def reported_paths(self):
+        """Paths that have a subtotal row (or the file total, ()) in the file."""
+        return list(self._reported)
+
+    def children(self, *path):
+        """{child name: total} directly under path, in file order."""
+        path = tuple(path)
+        return {name: self._totals[path + (name,)] for name in self._children.get(path, {})}
+
+    def paths(self):
+        """Every node path except the root, depth first in file order."""
+        found = []
+        stack = [ROOT]
+        while stack:
+            path = stack.pop()
+            if path:
+                found.append(path)
+            stack.extend(path + (name,) for name in reversed(list(self._children.get(path, {}))))
+        return found
+
+    def level(self, depth):
+        """{path: total} of every node at one depth (1 = LEVEL1)."""
+        return {path: amount for path, amount in self._totals.items() if len(path) == depth}
+
+    def mismatches(self, tolerance=0.5):
+        """
+        Nodes whose reported subtotal differs from the sum of their line items.
+
+        Returns:
+            list: (path, reported, computed) tuples
+        """
+        found = []
+        for path, reported in self._reported.items():
+            computed = self._totals.get(path, 0.0)
+            if abs(reported - computed) > tolerance:
+                found.append((path, reported, computed))
+        return found
+
+    def to_frame(self):
+        """One row per node: path, depth, LEVEL1..LEVEL6, total and reported."""
+        records = []
+        for path in self.paths():
+            record = {'path': ' / '.join(path), 'depth': len(path)}
+            record.update({col: (path[i] if i < len(path) else None) for i, col in enumerate(LEVEL_COLUMNS)})
+            record['total'] = self._totals[path]
+            record['reported'] = self._reported.get(path)
+            records.append(record)
+        return pd.DataFrame.from_records(records)
+
+
+@lru_cache(maxsize=None)
+def load_tree(kind, year):
+    """BudgetTree.from_year(), built once per (kind, year) and process."""
+    return BudgetTree.from_year(kind, year)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the LEVEL1-LEVEL6 tree of a budget CSV")
+    parser.add_argument('kind', choices=('revenues', 'expenses'))
+    parser.add_argument('year', type=int)
+    parser.add_argument('--depth', type=int, default=3, help='Deepest level printed (default: 3)')
+    parser.add_argument('--check', action='store_true', help='List subtotal rows that disagree with their items')
+    args = parser.parse_args(argv)
+
+    try:
+        tree = BudgetTree.from_year(args.kind, args.year)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+
+    print("="*80)
+    print(f"{args.kind.upper()} {args.year}: {tree.leaf_count} line items, "
+          f"total {tree.total():,.2f} billion rials")
+    print("="*80)
+
+    if args.check:
+        mismatches = tree.mismatches()
+        for path, reported, computed in mismatches:
+            print(f"  ⚠️  {' / '.join(path) or '(total)'}: reported {reported:,.2f}, "
+                  f"items {computed:,.2f}")
+        print(f"{len(mismatches)} of {len(tree.reported_paths())} subtotal rows disagree with their line items")
+        return 0
+
+    for path in tree.paths():
+        if len(path) <= args.depth:
+            print(f"{'  ' * (len(path) - 1)}{path[-1]:<{50 - 2 * len(path)}} {tree.total(*path):>20,.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
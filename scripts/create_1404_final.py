@@ -8,16 +8,7 @@ import pandas as pd
 import json
 import os
 
-def clean_number(s):
-    if isinstance(s, (int, float)):
-        return s
-    if pd.isna(s):
-        return 0.0
-    s = str(s).replace(',', '').strip()
-    try:
-        return float(s)
-    except ValueError:
-        return 0.0
+from numeric_ingest import parse_number, parse_numeric
 
 def main():
     print("="*80)
@@ -41,11 +32,11 @@ def main():
     # From Table 2 - Summary numbers
     # NOTE: Table 2 values are in BILLION rials, but 1395-1403 CSVs are in TRILLION rials
     # So we divide by 1000 to match units
-    total_revenues = clean_number(df_table2[df_table2['Unnamed: 0'] == 'درآمد ها']['Unnamed: 1'].iloc[0]) / 1000
-    tax_revenue = clean_number(df_table2[df_table2['Unnamed: 0'] == 'درآمدهای مالیاتی']['Unnamed: 1'].iloc[0]) / 1000
-    total_expenditures = clean_number(df_table2[df_table2['Unnamed: 0'] == 'هزینه ها']['Unnamed: 1'].iloc[0]) / 1000
-    current_exp = clean_number(df_table2[df_table2['Unnamed: 0'] == 'عمومی']['Unnamed: 1'].iloc[0]) / 1000
-    other_exp = clean_number(df_table2[df_table2['Unnamed: 0'] == 'متفرقه']['Unnamed: 1'].iloc[0]) / 1000
+    total_revenues = parse_number(df_table2[df_table2['Unnamed: 0'] == 'درآمد ها']['Unnamed: 1'].iloc[0]) / 1000
+    tax_revenue = parse_number(df_table2[df_table2['Unnamed: 0'] == 'درآمدهای مالیاتی']['Unnamed: 1'].iloc[0]) / 1000
+    total_expenditures = parse_number(df_table2[df_table2['Unnamed: 0'] == 'هزینه ها']['Unnamed: 1'].iloc[0]) / 1000
+    current_exp = parse_number(df_table2[df_table2['Unnamed: 0'] == 'عمومی']['Unnamed: 1'].iloc[0]) / 1000
+    other_exp = parse_number(df_table2[df_table2['Unnamed: 0'] == 'متفرقه']['Unnamed: 1'].iloc[0]) / 1000
     
     print(f"Total Revenues: {total_revenues:,.2f}")
     print(f"Tax Revenue: {tax_revenue:,.2f}")
@@ -54,7 +45,7 @@ def main():
     print(f"Other Expenditure: {other_exp:,.2f}")
     
     # From Table 5 - Tax breakdown (also divide by 1000)
-    df_table5['amount'] = df_table5['Grand Total'].apply(clean_number) / 1000
+    df_table5['amount'] = parse_numeric(df_table5['Grand Total']) / 1000
     
     corporate_tax = df_table5[df_table5['Classification Code'] == 110101.0]['amount'].iloc[0]
     income_tax_total = df_table5[df_table5['Classification Code'] == 110200.0]['amount'].iloc[0]
@@ -78,7 +69,7 @@ def main():
                                     df_table14['Unnamed: 1'].astype(str).str.contains('جمع', na=False)]
     if not subsidy_total_row.empty:
         # Try to get from the third column
-        subsidy_total = clean_number(subsidy_total_row.iloc[0]['Unnamed: 2']) / 1000
+        subsidy_total = parse_number(subsidy_total_row.iloc[0]['Unnamed: 2']) / 1000
     else:
         # Fallback: use 10,462,059 from the image
         subsidy_total = 10462059.0 / 1000
@@ -86,7 +77,7 @@ def main():
     # Find cash subsidy row
     cash_subsidy_row = df_table14[df_table14['Unnamed: 1'].astype(str).str.contains('یارانه نقدی', na=False)]
     if not cash_subsidy_row.empty:
-        cash_subsidy = clean_number(cash_subsidy_row.iloc[0]['Unnamed: 2'])
+        cash_subsidy = parse_number(cash_subsidy_row.iloc[0]['Unnamed: 2'])
     else:
         cash_subsidy = 0.0
     
@@ -15,69 +15,69 @@ builder = SankeyBuilder()
 # === LEVEL 1: Detailed Revenue Sources (11 nodes on far left) ===
 
 # Tax breakdown (5 items)
-builder.add_node('corporate-tax', 'مالیات شرکت‌ها', 8.17, '#1E5F8C', 0.05, 0.10)
-builder.add_node('individual-tax', 'مالیات بر درآمد', 1.82, '#1E5F8C', 0.05, 0.15)
-builder.add_node('vat', 'مالیات بر کالا و خدمات', 4.5, '#2A7BA8', 0.05, 0.20)
-builder.add_node('import-duties', 'عوارض گمرکی', 1.5, '#2A7BA8', 0.05, 0.25)
-builder.add_node('other-tax', 'سایر مالیات‌ها', 1.01, '#2A7BA8', 0.05, 0.30)
+builder.add_node('corporate-tax', 'مالیات شرکت‌ها', 8.17, '#1E5F8C')
+builder.add_node('individual-tax', 'مالیات بر درآمد', 1.82, '#1E5F8C')
+builder.add_node('vat', 'مالیات بر کالا و خدمات', 4.5, '#2A7BA8')
+builder.add_node('import-duties', 'عوارض گمرکی', 1.5, '#2A7BA8')
+builder.add_node('other-tax', 'سایر مالیات‌ها', 1.01, '#2A7BA8')
 
 # Oil & Gas (2 items)
-builder.add_node('oil-exports', 'صادرات نفت خام', 18.0, '#3D9BB8', 0.05, 0.40)
-builder.add_node('gas-exports', 'گاز و میعانات', 3.07, '#3D9BB8', 0.05, 0.45)
+builder.add_node('oil-exports', 'صادرات نفت خام', 18.0, '#3D9BB8')
+builder.add_node('gas-exports', 'گاز و میعانات', 3.07, '#3D9BB8')
 
 # **NEW: State Company Revenue Breakdown (from Table 11)**
 # These come from state_comp_revenues, state_comp_current_credits, etc.
-builder.add_node('state-operations', 'درآمد عملیاتی شرکت‌ها', 50.4, '#1E5F8C', 0.05, 0.55)
-builder.add_node('state-credits', 'اعتبارات هزینه‌ای', 0.5, '#2A7BA8', 0.05, 0.60)
-builder.add_node('state-loans-domestic', 'تسهیلات داخلی', 4.6, '#2A7BA8', 0.05, 0.65)
-builder.add_node('state-loans-foreign', 'وام خارجی', 3.2, '#3D9BB8', 0.05, 0.70)
-builder.add_node('state-assets', 'واگذاری دارایی‌ها', 2.0, '#5AB8CC', 0.05, 0.75)
-builder.add_node('state-other', 'سایر منابع', 3.0, '#6EC9D4', 0.05, 0.80)
+builder.add_node('state-operations', 'درآمد عملیاتی شرکت‌ها', 50.4, '#1E5F8C')
+builder.add_node('state-credits', 'اعتبارات هزینه‌ای', 0.5, '#2A7BA8')
+builder.add_node('state-loans-domestic', 'تسهیلات داخلی', 4.6, '#2A7BA8')
+builder.add_node('state-loans-foreign', 'وام خارجی', 3.2, '#3D9BB8')
+builder.add_node('state-assets', 'واگذاری دارایی‌ها', 2.0, '#5AB8CC')
+builder.add_node('state-other', 'سایر منابع', 3.0, '#6EC9D4')
 
 # Other revenue
-builder.add_node('fees-charges', 'حق و عوارض', 3.5, '#5AB8CC', 0.05, 0.87)
-builder.add_node('other-income', 'سایر درآمدها', 2.0, '#6EC9D4', 0.05, 0.92)
-builder.add_node('special-revenue', 'درآمد اختصاصی', 4.28, '#6EC9D4', 0.05, 0.97)
+builder.add_node('fees-charges', 'حق و عوارض', 3.5, '#5AB8CC')
+builder.add_node('other-income', 'سایر درآمدها', 2.0, '#6EC9D4')
+builder.add_node('special-revenue', 'درآمد اختصاصی', 4.28, '#6EC9D4')
 
 # === LEVEL 2: Aggregated Revenue Categories (4 nodes left-center) ===
 
-builder.add_node('tax-revenue', 'درآمد مالیاتی', 17.0, '#2A7BA8', 0.28, 0.35)
-builder.add_node('oil-gas-revenue', 'درآمد نفت و گاز', 21.07, '#3D9BB8', 0.28, 0.50)
-builder.add_node('state-company-revenue', 'درآمد شرکت‌های دولتی', 63.7, '#1E5F8C', 0.28, 0.65)
-builder.add_node('other-revenue', 'سایر درآمدها', 11.5, '#5AB8CC', 0.28, 0.80)
+builder.add_node('tax-revenue', 'درآمد مالیاتی', 17.0, '#2A7BA8')
+builder.add_node('oil-gas-revenue', 'درآمد نفت و گاز', 21.07, '#3D9BB8')
+builder.add_node('state-company-revenue', 'درآمد شرکت‌های دولتی', 63.7, '#1E5F8C')
+builder.add_node('other-revenue', 'سایر درآمدها', 11.5, '#5AB8CC')
 
 # === LEVEL 3: Total Budget (2 nodes at center) ===
 
-builder.add_node('total-revenue', 'کل منابع\n112.8 هزار میلیارد', 112.8, '#3D9BB8', 0.48, 0.50)
-builder.add_node('total-spending', 'کل مصارف\n112.8 هزار میلیارد', 112.8, '#FF69B4', 0.52, 0.50)
+builder.add_node('total-revenue', 'کل منابع\n112.8 هزار میلیارد', 112.8, '#3D9BB8')
+builder.add_node('total-spending', 'کل مصارف\n112.8 هزار میلیارد', 112.8, '#FF69B4')
 
 # === LEVEL 4: Main Spending Categories (4 nodes right-center) ===
 
-builder.add_node('personnel', 'هزینه‌های پرسنلی', 19.3, '#D6006E', 0.72, 0.30)
-builder.add_node('development', 'طرح‌های عمرانی', 11.9, '#BD0060', 0.72, 0.45)
-builder.add_node('debt-service', 'بازپرداخت بدهی', 13.7, '#A4004D', 0.72, 0.60)
-builder.add_node('support', 'برنامه‌های حمایتی', 8.9, '#8B003A', 0.72, 0.75)
+builder.add_node('personnel', 'هزینه‌های پرسنلی', 19.3, '#D6006E')
+builder.add_node('development', 'طرح‌های عمرانی', 11.9, '#BD0060')
+builder.add_node('debt-service', 'بازپرداخت بدهی', 13.7, '#A4004D')
+builder.add_node('support', 'برنامه‌های حمایتی', 8.9, '#8B003A')
 
 # === LEVEL 5: Detailed Spending (11 nodes far right) ===
 
 # Personnel breakdown
-builder.add_node('salaries', 'حقوق کارکنان', 6.0, '#D6006E', 0.95, 0.20)
-builder.add_node('pensions', 'بازنشستگی', 9.6, '#C20064', 0.95, 0.28)
-builder.add_node('benefits', 'مزایا', 3.7, '#D6006E', 0.95, 0.36)
+builder.add_node('salaries', 'حقوق کارکنان', 6.0, '#D6006E')
+builder.add_node('pensions', 'بازنشستگی', 9.6, '#C20064')
+builder.add_node('benefits', 'مزایا', 3.7, '#D6006E')
 
 # Development breakdown
-builder.add_node('infrastructure', 'زیرساخت', 6.8, '#BD0060', 0.95, 0.42)
-builder.add_node('technology', 'فناوری', 2.5, '#C20064', 0.95, 0.47)
-builder.add_node('regional-dev', 'توسعه منطقه‌ای', 2.6, '#BD0060', 0.95, 0.52)
+builder.add_node('infrastructure', 'زیرساخت', 6.8, '#BD0060')
+builder.add_node('technology', 'فناوری', 2.5, '#C20064')
+builder.add_node('regional-dev', 'توسعه منطقه‌ای', 2.6, '#BD0060')
 
 # Debt service breakdown
-builder.add_node('bonds', 'بازپرداخت اوراق', 10.5, '#A4004D', 0.95, 0.58)
-builder.add_node('debt-payments', 'بازپرداخت بدهی', 3.2, '#8B003A', 0.95, 0.64)
+builder.add_node('bonds', 'بازپرداخت اوراق', 10.5, '#A4004D')
+builder.add_node('debt-payments', 'بازپرداخت بدهی', 3.2, '#8B003A')
 
 # Support breakdown
-builder.add_node('cash-subsidies', 'یارانه نقدی', 4.2, '#8B003A', 0.95, 0.72)
-builder.add_node('energy-subsidies', 'یارانه انرژی', 2.5, '#6B002A', 0.95, 0.78)
-builder.add_node('food-subsidies', 'یارانه مواد اساسی', 2.2, '#8B003A', 0.95, 0.84)
+builder.add_node('cash-subsidies', 'یارانه نقدی', 4.2, '#8B003A')
+builder.add_node('energy-subsidies', 'یارانه انرژی', 2.5, '#6B002A')
+builder.add_node('food-subsidies', 'یارانه مواد اساسی', 2.2, '#8B003A')
 
 # === ADD ALL LINKS (using node names!) ===
 
@@ -142,6 +142,12 @@ builder.add_link('support', 'cash-subsidies', 4.2)
 builder.add_link('support', 'energy-subsidies', 2.5)
 builder.add_link('support', 'food-subsidies', 2.2)
 
+# === LAYOUT: columns by flow depth, rows ordered to avoid crossings ===
+
+# The center columns are not linked to each other, so their columns are pinned
+layout = builder.layout(columns=[0.05, 0.28, 0.48, 0.52, 0.72, 0.95],
+                        pinned={'total-revenue': 2, 'total-spending': 3})
+
 # === BUILD AND VISUALIZE ===
 
 # Get Plotly-compatible structure
@@ -171,6 +177,7 @@ fig.update_layout(
 # Show statistics
 print("=== Sankey Builder Statistics ===")
 builder.stats()
+print(f"Link crossings after layout: {layout.crossings}")
 
 # Save to HTML
 output_path = '/Users/hamidreza/Documents/AI-Projects/IranBudget/output/iran_budget_1404_hierarchical_with_state_breakdown.html'
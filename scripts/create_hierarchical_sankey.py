@@ -8,6 +8,8 @@ Shows: Detailed Revenue → Revenue Categories → Budget → Main Categories 
 import plotly.graph_objects as go
 import json
 
+from sankey_builder import solve_layout
+
 # ===== FARSI LABEL MAPPING =====
 # Based on 1404_MANUAL_ENTRY_TEMPLATE.txt and official Iranian budget terminology
 FARSI_LABELS = {
@@ -289,41 +291,21 @@ def create_hierarchical_sankey_1404():
         else:
             link_colors.append(source_color)
     
-    # ===== CREATE FIGURE WITH MANUAL POSITIONING =====
-    # Calculate node positions for better control
-    node_x = []
-    node_y = []
-    
-    # Level 1: Detailed revenue sources (Far left) - 11 items
-    for i in range(11):
-        node_x.append(0.05)
-        node_y.append(0.1 + i * 0.07)
-    
-    # Level 2: Aggregated revenue (Left-center) - 3 items
-    for i in range(3):
-        node_x.append(0.28)
-        node_y.append(0.35 + i * 0.12)
-    
-    # Central Revenue Column (Blue) - positioned left of center
-    node_x.append(0.48)
-    node_y.append(0.5)
-    
-    # Central Spending Column (Magenta) - positioned right of center  
-    node_x.append(0.52)
-    node_y.append(0.5)
-    
-    # Level 3: Main spending categories (Right-center) - 4 items
-    for i in range(4):
-        node_x.append(0.72)
-        node_y.append(0.3 + i * 0.13)
-    
-    # Level 4: Detailed spending (Far right) - 11 items
-    for i in range(11):
-        node_x.append(0.95)
-        node_y.append(0.1 + i * 0.07)
+    # ===== CREATE FIGURE WITH AUTOMATIC POSITIONING =====
+    # Columns follow the flow depth, rows are ordered to avoid crossings;
+    # the center columns stay close together for the vertical labels
+    layout = solve_layout(
+        len(nodes),
+        [link['source'] for link in links],
+        [link['target'] for link in links],
+        [link['value'] for link in links],
+        columns=[0.05, 0.28, 0.48, 0.52, 0.72, 0.95],
+    )
+    node_x = layout.x.tolist()
+    node_y = layout.y.tolist()
     
     fig = go.Figure(data=[go.Sankey(
-        arrangement='freeform',  # Use freeform for manual positioning
+        arrangement='freeform',  # Keep the solved positions
         node=dict(
             pad=15,
             thickness=60,  # Much wider central columns for prominence
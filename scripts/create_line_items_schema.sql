@@ -0,0 +1,94 @@
+-- Schema Update: Budget Line Items
+-- Date: 2026-10-17
+-- Purpose: Store every row of data/raw/unverified/{revenues,expenses}{year}.csv
+--          so totals can be rolled up to any LEVEL depth in SQL
+-- Run after create_schema.sql; load with: python import_line_items.py
+
+-- =====================================================
+-- LEVEL HIERARCHY DIMENSION
+-- =====================================================
+-- One row per distinct LEVEL1..LEVEL6 prefix. path holds the full chain of
+-- names from the root, so two nodes with the same name under different
+-- parents stay separate.
+CREATE TABLE IF NOT EXISTS budget_levels (
+    level_id SERIAL PRIMARY KEY,
+    parent_id INTEGER REFERENCES budget_levels(level_id) ON DELETE CASCADE,
+    depth SMALLINT NOT NULL CHECK (depth BETWEEN 1 AND 6),
+    name TEXT NOT NULL,
+    path TEXT[] NOT NULL UNIQUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE budget_levels IS 'LEVEL1-LEVEL6 hierarchy of the raw budget CSVs';
+COMMENT ON COLUMN budget_levels.path IS 'Names from LEVEL1 down to this node (stops at the first empty level)';
+
+CREATE INDEX IF NOT EXISTS idx_budget_levels_parent ON budget_levels(parent_id);
+CREATE INDEX IF NOT EXISTS idx_budget_levels_depth ON budget_levels(depth);
+
+-- =====================================================
+-- LINE ITEMS FACT TABLE
+-- =====================================================
+CREATE TABLE IF NOT EXISTS budget_line_items (
+    line_item_id BIGSERIAL PRIMARY KEY,
+    year_id INTEGER NOT NULL REFERENCES years(year_id) ON DELETE CASCADE,
+    kind VARCHAR(10) NOT NULL CHECK (kind IN ('revenue', 'expense')),
+    line_no INTEGER NOT NULL,           -- data row number within the CSV (1-based)
+    level_id INTEGER REFERENCES budget_levels(level_id),  -- NULL for file total rows
+    level_depth SMALLINT,               -- LEVEL column as given in the CSV
+    tooltip TEXT,
+    source TEXT,                        -- e.g. 'ردیف شماره ۱۰۱۰۰۰ جدول شماره ۷'
+    budget_row BIGINT,                  -- row code parsed from source, if present
+    source_url TEXT,
+    sidebar1 DECIMAL(20, 3),
+    sidebar2 DECIMAL(20, 3),
+    sidebar3 DECIMAL(20, 3),
+    amount DECIMAL(20, 3),
+    more_info TEXT,
+    is_subtotal BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(year_id, kind, line_no)
+);
+
+-- Tables created before is_subtotal existed
+ALTER TABLE budget_line_items ADD COLUMN IF NOT EXISTS is_subtotal BOOLEAN NOT NULL DEFAULT FALSE;
+
+COMMENT ON TABLE budget_line_items IS 'Raw budget CSV rows (billion rials), one per line';
+COMMENT ON COLUMN budget_line_items.level_id IS 'Deepest LEVEL node of the row; NULL for rows with no LEVEL values (file totals)';
+COMMENT ON COLUMN budget_line_items.is_subtotal IS 'Row repeats the sum of other rows: its path is a prefix of another row''s path in the same file, or it is a LEVEL=0 file total';
+
+CREATE INDEX IF NOT EXISTS idx_line_items_level ON budget_line_items(level_id);
+CREATE INDEX IF NOT EXISTS idx_line_items_budget_row ON budget_line_items(budget_row);
+
+-- =====================================================
+-- ROLLUP VIEW
+-- =====================================================
+-- Each line item counted once at every ancestor of its node, so
+--   SELECT * FROM budget_level_totals WHERE kind = 'expense' AND depth = 3
+-- gives LEVEL3 totals for every year without hand-coded rollups.
+-- Subtotal rows are skipped: the CSVs print them next to their own items,
+-- and counting both would double the totals (same rule as budget_tree.BudgetTree).
+CREATE OR REPLACE VIEW budget_level_totals AS
+SELECT
+    y.year_persian,
+    li.kind,
+    a.level_id,
+    a.parent_id,
+    a.depth,
+    a.name,
+    a.path,
+    SUM(li.amount) as amount,
+    COUNT(*) as line_items
+FROM budget_line_items li
+JOIN years y ON y.year_id = li.year_id
+JOIN budget_levels n ON n.level_id = li.level_id
+CROSS JOIN LATERAL generate_series(1, n.depth) AS d(depth)
+JOIN budget_levels a ON a.path = n.path[1:d.depth]
+WHERE NOT li.is_subtotal
+GROUP BY y.year_persian, li.kind, a.level_id, a.parent_id, a.depth, a.name, a.path;
+
+-- =====================================================
+-- GRANT PERMISSIONS (if needed)
+-- =====================================================
+-- GRANT SELECT ON budget_levels TO budget_user;
+-- GRANT SELECT ON budget_line_items TO budget_user;
+-- GRANT SELECT ON budget_level_totals TO budget_user;
@@ -0,0 +1,129 @@
+-- Schema Update: Materialized Rollup Views
+-- Date: 2026-10-17
+-- Purpose: Precompute the yearly rollups the API reads on every request.
+--          Each mv_* view snapshots the plain view of the same name and has
+--          a unique index on year_persian, so it can be refreshed with
+--          REFRESH MATERIALIZED VIEW CONCURRENTLY without blocking readers.
+-- Run after schema.sql (mv_budget_year_detail needs functional_expenditures
+-- and the state company columns). Re-runnable: drops and recreates the views.
+--
+-- Refresh after any data change with:
+--     SELECT refresh_budget_views();
+-- import_data.py and the data/migrations scripts call it automatically.
+
+DROP FUNCTION IF EXISTS refresh_budget_views();
+DROP MATERIALIZED VIEW IF EXISTS mv_budget_overview;
+DROP MATERIALIZED VIEW IF EXISTS mv_budget_overview_detailed;
+DROP MATERIALIZED VIEW IF EXISTS mv_yoy_growth;
+DROP MATERIALIZED VIEW IF EXISTS mv_revenue_trends;
+DROP MATERIALIZED VIEW IF EXISTS mv_balance_analysis;
+DROP MATERIALIZED VIEW IF EXISTS mv_budget_year_detail;
+
+-- =====================================================
+-- SNAPSHOTS OF THE PLAIN VIEWS
+-- =====================================================
+
+CREATE MATERIALIZED VIEW mv_budget_overview AS
+SELECT * FROM budget_overview;
+CREATE UNIQUE INDEX idx_mv_budget_overview_year ON mv_budget_overview(year_persian);
+
+CREATE MATERIALIZED VIEW mv_budget_overview_detailed AS
+SELECT * FROM budget_overview_detailed;
+CREATE UNIQUE INDEX idx_mv_budget_overview_detailed_year ON mv_budget_overview_detailed(year_persian);
+
+CREATE MATERIALIZED VIEW mv_yoy_growth AS
+SELECT * FROM yoy_growth;
+CREATE UNIQUE INDEX idx_mv_yoy_growth_year ON mv_yoy_growth(year_persian);
+
+CREATE MATERIALIZED VIEW mv_revenue_trends AS
+SELECT * FROM revenue_trends;
+CREATE UNIQUE INDEX idx_mv_revenue_trends_year ON mv_revenue_trends(year_persian);
+
+CREATE MATERIALIZED VIEW mv_balance_analysis AS
+SELECT * FROM balance_analysis;
+CREATE UNIQUE INDEX idx_mv_balance_analysis_year ON mv_balance_analysis(year_persian);
+
+-- =====================================================
+-- API YEAR DETAIL
+-- =====================================================
+-- Same columns as the single-year query in frontend/app/api/budget/route.ts
+CREATE MATERIALIZED VIEW mv_budget_year_detail AS
+SELECT
+    y.year_persian,
+    y.year_gregorian,
+    y.currency,
+    r.total as revenue_total,
+    r.operational_revenue,
+    r.special_accounts,
+    r.state_comp_revenue_total,
+    r.state_comp_revenues,
+    r.state_comp_current_credits,
+    r.state_comp_capital_credits,
+    r.state_comp_domestic_loans,
+    r.state_comp_foreign_loans,
+    r.state_comp_current_assets,
+    r.state_comp_other_receipts,
+    r.tax_total,
+    r.tax_corporate,
+    r.tax_individual,
+    r.tax_vat_sales,
+    r.tax_wealth,
+    r.tax_import_duties,
+    r.oil_gas,
+    r.oil_exports,
+    r.gas_condensate,
+    r.other,
+    r.ministry_revenue,
+    e.total as expenditure_total,
+    e.current_exp,
+    e.capital_exp,
+    e.subsidy_spending,
+    e.state_comp_net,
+    e.state_comp_current_exp,
+    e.state_comp_capital_exp,
+    e.state_comp_domestic_repay,
+    e.state_comp_foreign_repay,
+    e.state_comp_current_assets_increase,
+    f.defense,
+    f.education,
+    f.health,
+    f.economic_affairs,
+    f.general_public_services,
+    f.recreation_culture,
+    f.social_protection,
+    f.def_military,
+    f.econ_transport,
+    f.econ_fuel_energy,
+    f.gps_executive_legislative,
+    f.gps_public_debt,
+    b.surplus_deficit,
+    b.status
+FROM years y
+LEFT JOIN revenues r ON y.year_id = r.year_id
+LEFT JOIN expenditures e ON y.year_id = e.year_id
+LEFT JOIN functional_expenditures f ON y.year_id = f.year_id
+LEFT JOIN budget_balance b ON y.year_id = b.year_id;
+CREATE UNIQUE INDEX idx_mv_budget_year_detail_year ON mv_budget_year_detail(year_persian);
+
+-- =====================================================
+-- REFRESH FUNCTION
+-- =====================================================
+CREATE FUNCTION refresh_budget_views() RETURNS void
+LANGUAGE plpgsql AS $$
+BEGIN
+    REFRESH MATERIALIZED VIEW CONCURRENTLY mv_budget_overview;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY mv_budget_overview_detailed;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY mv_yoy_growth;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY mv_revenue_trends;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY mv_balance_analysis;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY mv_budget_year_detail;
+END;
+$$;
+
+COMMENT ON FUNCTION refresh_budget_views() IS 'Refresh every mv_* rollup without blocking readers';
+
+-- =====================================================
+-- GRANT PERMISSIONS (if needed)
+-- =====================================================
+-- GRANT SELECT ON mv_budget_overview, mv_budget_overview_detailed, mv_yoy_growth,
+--     mv_revenue_trends, mv_balance_analysis, mv_budget_year_detail TO budget_user;
@@ -9,13 +9,20 @@ Usage:
     python create_sankey_diagram.py [--year YEAR] [--output FILE]
 
 Options:
-    --year YEAR     Generate diagram for specific year (1395-1404) or 'all' for aggregate
-    --output FILE   Output filename (default: sankey_diagram.html)
-    --help          Show this help message
+    --year YEAR         Generate diagram for specific year (1395-1404) or 'all' for aggregate
+    --output FILE       Output filename (default: sankey_diagram.html)
+    --max-nodes N       At most N nodes per column; the smallest flows of each
+                        parent are folded into one "سایر / Other" node
+    --min-share SHARE   Fold flows below SHARE (e.g. 0.02) of their parent's total
+    --language LANG     Labels and titles in 'en' (default) or 'fa'
+    --batch             Render every year (1395-1404) x language into --output-dir,
+                        sharing one plotly.js file and one image renderer
+    --help              Show this help message
 
 Examples:
     python create_sankey_diagram.py --year 1404
     python create_sankey_diagram.py --year all --output budget_flows.html
+    python create_sankey_diagram.py --batch --output-dir ../output/sankey
 
 Author: AI Assistant
 Date: December 2025
@@ -24,17 +31,75 @@ Date: December 2025
 import argparse
 import sys
 import os
+import time
 from pathlib import Path
 import psycopg2
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import plotly.io as pio
-import getpass
+from plotly.offline import get_plotlyjs
+
+import budget_db
+from csv_cache import write_atomic
+from sankey_builder import check_flow, fold_long_tail
 
 # Set default plotly template
 pio.templates.default = "plotly_white"
 
+# Label of the node that holds the folded long tail of a parent
+OTHER_LABEL = "سایر / Other"
+
+# Batch rendering (--batch)
+BATCH_YEARS = list(range(1395, 1405))
+LANGUAGES = ('en', 'fa')
+PLOTLYJS_NAME = 'plotly.min.js'
+PNG_WIDTH = 1200
+PNG_HEIGHT = 800
+
+NODE_LABELS_FA = {
+    "Tax Revenue": "درآمدهای مالیاتی",
+    "Oil & Gas Revenue": "درآمد نفت و گاز",
+    "Other Revenue": "سایر درآمدها",
+    "Government Budget": "بودجه عمومی دولت",
+    "Current Expenses": "هزینه‌های جاری",
+    "Capital Investments": "تملک دارایی‌های سرمایه‌ای",
+    "Financial Operations": "تملک دارایی‌های مالی",
+    "Subsidy Spending": "یارانه‌ها"
+}
+
+TEXT = {
+    'en': {
+        'title': "Iran National Budget Flow",
+        'revenue': "Total Revenue",
+        'expenditure': "Total Expenditure",
+        'total': "Total",
+        'unit': "billion rials",
+        'sources': "Revenue Sources",
+        'spending': "Spending Categories",
+        'font': "Arial, sans-serif"
+    },
+    'fa': {
+        'title': "جریان بودجه ملی ایران",
+        'revenue': "کل درآمد",
+        'expenditure': "کل هزینه",
+        'total': "جمع",
+        'unit': "میلیارد ریال",
+        'sources': "منابع درآمدی",
+        'spending': "دسته‌های هزینه",
+        'font': "Vazir, Tahoma, Arial, sans-serif"
+    }
+}
+
+
+def write_bytes(path, payload):
+    """Write a file atomically."""
+    def write(tmp_path):
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+    write_atomic(path, write)
+
+
 class BudgetSankeyGenerator:
     def __init__(self, db_config):
         self.db_config = db_config
@@ -43,7 +108,7 @@ class BudgetSankeyGenerator:
     def connect_to_database(self):
         """Establish database connection"""
         try:
-            self.connection = psycopg2.connect(**self.db_config)
+            self.connection = budget_db.acquire(self.db_config)
             return True
         except psycopg2.OperationalError as e:
             print(f"❌ Database connection failed: {e}")
@@ -95,13 +160,15 @@ class BudgetSankeyGenerator:
             print(f"❌ Error retrieving data: {e}")
             return None
 
-    def create_sankey_data(self, df, year_label=""):
+    def create_sankey_data(self, df, year_label="", max_nodes=None, min_share=0.0):
         """
         Transform budget data into Sankey diagram format
 
         Args:
             df: DataFrame with budget data
             year_label: Label for the diagram title
+            max_nodes: Maximum nodes per column (see collapse_small_flows)
+            min_share: Minimum share of a flow in its parent's total
 
         Returns:
             Dictionary with Sankey diagram data
@@ -204,7 +271,7 @@ class BudgetSankeyGenerator:
             else:
                 link_colors.append("rgba(255, 182, 193, 0.4)")  # Light pink with transparency
 
-        return {
+        sankey_data = {
             'nodes': nodes,
             'node_colors': node_colors,
             'links': links,
@@ -214,21 +281,85 @@ class BudgetSankeyGenerator:
             'year_label': year_label
         }
 
+        if max_nodes is not None or min_share > 0:
+            sankey_data = self.collapse_small_flows(sankey_data, max_nodes, min_share)
+
+        return sankey_data
+
+    def collapse_small_flows(self, sankey_data, max_nodes=None, min_share=0.0):
+        """
+        Bound the node count by folding the long tail of each parent
+
+        Flows below min_share of their parent's total, and the smallest
+        flows of columns with more than max_nodes nodes, are merged into
+        one "سایر / Other" node per parent (see sankey_builder.fold_long_tail).
+        Folded nodes take their sub-flows with them, and every kept node
+        keeps its inflow and outflow.
+
+        Args:
+            sankey_data: Dictionary from create_sankey_data
+            max_nodes: Maximum nodes per column (None = no limit)
+            min_share: Minimum share of a flow in its parent's total
+
+        Returns:
+            Dictionary with Sankey diagram data (same keys)
+        """
+        links = sankey_data['links']
+        folded = fold_long_tail(
+            len(sankey_data['nodes']),
+            [link['source'] for link in links],
+            [link['target'] for link in links],
+            [link['value'] for link in links],
+            max_nodes=max_nodes,
+            min_share=min_share
+        )
+
+        # "Other" nodes take the color of their largest folded node
+        nodes = [sankey_data['nodes'][i] for i in folded.nodes] + [OTHER_LABEL] * len(folded.others)
+        node_colors = ([sankey_data['node_colors'][i] for i in folded.nodes] +
+                       [sankey_data['node_colors'][members[0]] for _, members in folded.others])
+
+        new_links = []
+        link_colors = []
+        for source, target, value, merged in folded.links:
+            new_links.append({
+                'source': source,
+                'target': target,
+                'value': value,
+                'label': f"{value:,.0f}"
+            })
+            link_colors.append(sankey_data['link_colors'][merged[0]])
+
+        return {
+            **sankey_data,
+            'nodes': nodes,
+            'node_colors': node_colors,
+            'links': new_links,
+            'link_colors': link_colors
+        }
+
     def hex_to_rgb(self, hex_color):
         """Convert hex color to RGB tuple for RGBA"""
         hex_color = hex_color.lstrip('#')
         return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
 
-    def create_sankey_diagram(self, sankey_data, output_file="sankey_diagram.html"):
+    def build_figure(self, sankey_data, language="en"):
         """
-        Create interactive Sankey diagram
+        Create the Sankey figure for one diagram
 
         Args:
             sankey_data: Dictionary with Sankey diagram data
-            output_file: Output filename
+            language: 'en' or 'fa' (labels, title and hover text)
+
+        Returns:
+            plotly Figure
         """
+        text = TEXT[language]
+
         # Extract data
         nodes = sankey_data['nodes']
+        if language == 'fa':
+            nodes = [NODE_LABELS_FA.get(node, node) for node in nodes]
         node_colors = sankey_data['node_colors']
         links = sankey_data['links']
         link_colors = sankey_data['link_colors']
@@ -242,23 +373,23 @@ class BudgetSankeyGenerator:
                 line=dict(color="black", width=0.5),
                 label=nodes,
                 color=node_colors,
-                hovertemplate='%{label}<br>Total: %{value:,.0f} billion rials<extra></extra>'
+                hovertemplate=f"%{{label}}<br>{text['total']}: %{{value:,.0f}} {text['unit']}<extra></extra>"
             ),
             link=dict(
                 source=[link['source'] for link in links],
                 target=[link['target'] for link in links],
                 value=[link['value'] for link in links],
                 color=link_colors,
-                hovertemplate='%{source.label} → %{target.label}<br>%{value:,.0f} billion rials<extra></extra>'
+                hovertemplate=f"%{{source.label}} → %{{target.label}}<br>%{{value:,.0f}} {text['unit']}<extra></extra>"
             )
         )])
 
         # Update layout
-        title_text = f"Iran National Budget Flow{year_label}"
+        title_text = f"{text['title']}{year_label}"
         if sankey_data['total_revenue'] and sankey_data['total_expenditure']:
             title_text += "<br>"
-            title_text += f"Total Revenue: {sankey_data['total_revenue']:,.0f} | "
-            title_text += f"Total Expenditure: {sankey_data['total_expenditure']:,.0f} billion rials"
+            title_text += f"{text['revenue']}: {sankey_data['total_revenue']:,.0f} | "
+            title_text += f"{text['expenditure']}: {sankey_data['total_expenditure']:,.0f} {text['unit']}"
 
         fig.update_layout(
             title=dict(
@@ -267,9 +398,9 @@ class BudgetSankeyGenerator:
                 y=0.95,
                 xanchor='center',
                 yanchor='top',
-                font=dict(size=16, family="Arial, sans-serif")
+                font=dict(size=16, family=text['font'])
             ),
-            font=dict(size=12, family="Arial, sans-serif"),
+            font=dict(size=12, family=text['font']),
             margin=dict(l=50, r=50, t=100, b=50),
             height=600,
             width=1000
@@ -277,7 +408,7 @@ class BudgetSankeyGenerator:
 
         # Add annotations for better readability
         fig.add_annotation(
-            text="Revenue Sources",
+            text=text['sources'],
             x=0.1, y=0.9,
             xref="paper", yref="paper",
             showarrow=False,
@@ -285,22 +416,125 @@ class BudgetSankeyGenerator:
         )
 
         fig.add_annotation(
-            text="Spending Categories",
+            text=text['spending'],
             x=0.85, y=0.9,
             xref="paper", yref="paper",
             showarrow=False,
             font=dict(size=14, color="black")
         )
 
+        return fig
+
+    def create_sankey_diagram(self, sankey_data, output_file="sankey_diagram.html", language="en"):
+        """
+        Create interactive Sankey diagram
+
+        Args:
+            sankey_data: Dictionary with Sankey diagram data
+            output_file: Output filename
+            language: 'en' or 'fa'
+        """
+        fig = self.build_figure(sankey_data, language)
+
         # Save as HTML file
         fig.write_html(output_file)
         print(f"✅ Sankey diagram saved to: {output_file}")
 
         # Also save as PNG for quick viewing
         png_file = output_file.replace('.html', '.png')
-        fig.write_image(png_file, width=1200, height=800)
+        fig.write_image(png_file, width=PNG_WIDTH, height=PNG_HEIGHT)
         print(f"✅ PNG snapshot saved to: {png_file}")
 
+    def render_batch(self, years=BATCH_YEARS, languages=LANGUAGES, output_dir="sankey_batch",
+                     png=True, max_nodes=None, min_share=0.0):
+        """
+        Render every year × language in one process
+
+        All years are read with one query. plotly.js is written once as
+        output_dir/plotly.min.js and every HTML file references it instead
+        of embedding the bundle. PNGs go through one Kaleido scope, so the
+        image renderer is started once for the whole batch.
+
+        Args:
+            years: Years to render (default: 1395-1404)
+            languages: Languages to render ('en', 'fa')
+            output_dir: Directory for sankey_{year}_{language}.html/.png
+            png: Also export PNG snapshots
+            max_nodes, min_share: Node budget (see collapse_small_flows)
+
+        Returns:
+            List of dicts with 'year', 'language', 'files', 'bytes', 'seconds'
+            and 'violations' (flow-conservation violations, see check_flow)
+        """
+        df_all = self.get_budget_data('all')
+        if df_all is None:
+            return []
+
+        os.makedirs(output_dir, exist_ok=True)
+        print(f"📁 Output directory: {output_dir}")
+
+        # plotly.js bundle, shared by every HTML file
+        bundle = get_plotlyjs().encode('utf-8')
+        write_bytes(os.path.join(output_dir, PLOTLYJS_NAME), bundle)
+        total_bytes = len(bundle)
+        print(f"  📦 {PLOTLYJS_NAME:<28} {len(bundle) / 1024:>10,.1f} KB")
+
+        scope = pio.kaleido.scope if png else None
+        if png and scope is None:
+            print("⚠️  PNG export skipped: kaleido is not installed")
+
+        results = []
+        batch_start = time.perf_counter()
+        for year in years:
+            df = df_all[df_all['year_persian'] == year]
+            if df.empty:
+                print(f"  ⏭️  {year}: no data")
+                continue
+            sankey_data = self.create_sankey_data(df, f" ({year})", max_nodes, min_share)
+            links = sankey_data['links']
+            violations = check_flow(
+                len(sankey_data['nodes']),
+                [link['source'] for link in links],
+                [link['target'] for link in links],
+                [link['value'] for link in links]
+            )
+            for violation in violations:
+                print(f"  ⚠️  {year} {sankey_data['nodes'][violation.node]}: inflow {violation.expected:,.0f} "
+                      f"!= outflow {violation.actual:,.0f} billion rials")
+
+            for language in languages:
+                start = time.perf_counter()
+                fig = self.build_figure(sankey_data, language)
+                base = os.path.join(output_dir, f"sankey_{year}_{language}")
+                files = {
+                    f"{base}.html": fig.to_html(full_html=True, include_plotlyjs=PLOTLYJS_NAME).encode('utf-8')
+                }
+                if scope is not None:
+                    files[f"{base}.png"] = scope.transform(
+                        fig.to_dict(), format='png', width=PNG_WIDTH, height=PNG_HEIGHT
+                    )
+                for path, payload in files.items():
+                    write_bytes(path, payload)
+                elapsed = time.perf_counter() - start
+
+                size = sum(len(payload) for payload in files.values())
+                total_bytes += size
+                results.append({
+                    'year': year,
+                    'language': language,
+                    'files': list(files),
+                    'bytes': size,
+                    'seconds': elapsed,
+                    'violations': len(violations)
+                })
+                print(f"  ✅ {os.path.basename(base):<28} {size / 1024:>10,.1f} KB  {elapsed:>6.2f}s")
+
+        elapsed = time.perf_counter() - batch_start
+        if results:
+            print(f"\n📊 {len(results)} figures, {total_bytes / 1024 / 1024:,.2f} MB written "
+                  f"in {elapsed:.1f}s ({elapsed / len(results):.2f}s per figure)")
+        return results
+
     def create_comparison_diagrams(self, output_file="budget_comparison.html"):
         """
         Create side-by-side Sankey diagrams for comparison
@@ -386,7 +620,8 @@ class BudgetSankeyGenerator:
     def close_connection(self):
         """Close database connection"""
         if self.connection:
-            self.connection.close()
+            budget_db.release(self.connection, self.db_config)
+            self.connection = None
 
 def main():
     parser = argparse.ArgumentParser(
@@ -397,6 +632,7 @@ Examples:
   python create_sankey_diagram.py --year 1404
   python create_sankey_diagram.py --year all --output budget_flows.html
   python create_sankey_diagram.py --compare --output comparison.html
+  python create_sankey_diagram.py --batch --languages en fa --output-dir ../output/sankey
         """
     )
 
@@ -413,6 +649,61 @@ Examples:
         help='Output filename (default: sankey_diagram.html or budget_comparison.html for --compare)'
     )
 
+    parser.add_argument(
+        '--max-nodes',
+        type=int,
+        help='Maximum nodes per column; smaller flows are folded into "سایر / Other"'
+    )
+
+    parser.add_argument(
+        '--min-share',
+        type=float,
+        default=0.0,
+        help='Fold flows below this share of their parent\'s total (e.g. 0.02)'
+    )
+
+    parser.add_argument(
+        '--language',
+        choices=LANGUAGES,
+        default='en',
+        help='Labels and titles (default: en)'
+    )
+
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Render every year x language in one process (see --years, --languages, --output-dir)'
+    )
+
+    parser.add_argument(
+        '--years',
+        type=int,
+        nargs='+',
+        default=BATCH_YEARS,
+        help='Years for --batch (default: 1395-1404)'
+    )
+
+    parser.add_argument(
+        '--languages',
+        nargs='+',
+        choices=LANGUAGES,
+        default=list(LANGUAGES),
+        help='Languages for --batch (default: en fa)'
+    )
+
+    parser.add_argument(
+        '--output-dir',
+        type=str,
+        default='sankey_batch',
+        help='Output directory for --batch (default: sankey_batch)'
+    )
+
+    parser.add_argument(
+        '--no-png',
+        action='store_true',
+        help='Skip PNG snapshots in --batch'
+    )
+
     parser.add_argument(
         '--compare',
         action='store_true',
@@ -421,15 +712,8 @@ Examples:
 
     args = parser.parse_args()
 
-    # Database configuration
-    import getpass
-    db_config = {
-        'host': 'localhost',
-        'database': 'iran_budget',
-        'user': getpass.getuser(),
-        'password': '',
-        'port': 5432
-    }
+    # Database configuration from DB_HOST/DB_NAME/DB_USER/... (see budget_db.py)
+    db_config = budget_db.db_config()
 
     generator = BudgetSankeyGenerator(db_config)
 
@@ -437,7 +721,14 @@ Examples:
         if not generator.connect_to_database():
             sys.exit(1)
 
-        if args.compare:
+        if args.batch:
+            results = generator.render_batch(
+                args.years, args.languages, args.output_dir,
+                png=not args.no_png, max_nodes=args.max_nodes, min_share=args.min_share
+            )
+            if not results:
+                sys.exit(1)
+        elif args.compare:
             # Create comparison diagram
             output_file = args.output or "budget_comparison.html"
             generator.create_comparison_diagrams(output_file)
@@ -448,10 +739,10 @@ Examples:
                 sys.exit(1)
 
             year_label = f" ({args.year})" if args.year != 'all' else " (All Years)"
-            sankey_data = generator.create_sankey_data(df, year_label)
+            sankey_data = generator.create_sankey_data(df, year_label, args.max_nodes, args.min_share)
 
             output_file = args.output or "sankey_diagram.html"
-            generator.create_sankey_diagram(sankey_data, output_file)
+            generator.create_sankey_diagram(sankey_data, output_file, args.language)
 
             # Print summary
             print(f"\n📊 Budget Summary{year_label}:")
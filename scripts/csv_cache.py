@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CSV Cache - Parse each unverified budget CSV once, load it columnar afterwards
+
+Each revenues{year}.csv / expenses{year}.csv is parsed once with
+numeric_ingest.read_budget_csv(), LEVEL1-LEVEL6 are stored as categoricals,
+and the frame is written to data/cache/ as Parquet (pickle if pyarrow is
+not installed).
+Cache entries are keyed by the source file's SHA-256 and mtime, so editing
+a CSV invalidates its entry automatically.
+
+Usage:
+    python csv_cache.py            # build/refresh the cache for every CSV
+    python csv_cache.py --clear    # delete all cache entries
+
+From another script:
+    from csv_cache import load_budget_csv
+    df_rev = load_budget_csv('revenues', 1400)
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+from numeric_ingest import UnparsedCells, read_budget_csv
+
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = 'parquet'
+except ImportError:
+    CACHE_FORMAT = 'pickle'
+
+RAW_DIR = '../data/raw/unverified'
+CACHE_DIR = '../data/cache/unverified'
+
+# Bump when parsing rules change so stale entries are rebuilt
+CACHE_VERSION = 2
+
+LEVEL_COLUMNS = [f'LEVEL{i}' for i in range(1, 7)]
+
+
+def parse_csv(path):
+    """
+    Parse a budget CSV with amounts cleaned and LEVEL columns categorical.
+
+    Args:
+        path (str): CSV file path
+
+    Returns:
+        tuple: (DataFrame, UnparsedCells)
+    """
+    report = UnparsedCells()
+    df = read_budget_csv(path, report=report)
+
+    for col in LEVEL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    return df, report
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Return the hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_paths(source, cache_dir):
+    stem = os.path.splitext(os.path.basename(source))[0]
+    extension = 'parquet' if CACHE_FORMAT == 'parquet' else 'pkl'
+    return (os.path.join(cache_dir, f'{stem}.{extension}'),
+            os.path.join(cache_dir, f'{stem}.meta.json'))
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_atomic(path, write):
+    """Write via a temp file + rename so readers never see a partial file."""
+    tmp_path = f'{path}.tmp{os.getpid()}'
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _write_meta(meta_path, meta):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+    write_atomic(meta_path, write)
+
+
+def _is_current(source, stat, meta, data_path):
+    """
+    Check a cache entry against its source.
+
+    A matching mtime/size pair is trusted without hashing; otherwise the
+    source is hashed and the entry is reused only if the content is unchanged.
+    Returns (is_current, sha256 or None).
+    """
+    if (meta is None or not os.path.exists(data_path)
+            or meta.get('version') != CACHE_VERSION
+            or meta.get('format') != CACHE_FORMAT):
+        return False, None
+
+    if meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('size') == stat.st_size:
+        return True, meta.get('sha256')
+
+    sha256 = file_sha256(source)
+    return sha256 == meta.get('sha256'), sha256
+
+
+def load_csv(path, cache_dir=CACHE_DIR, refresh=False):
+    """
+    Load a budget CSV through the columnar cache.
+
+    Args:
+        path (str): Source CSV path
+        cache_dir (str): Directory holding cache entries
+        refresh (bool): Rebuild the entry even if it is current
+
+    Returns:
+        DataFrame: Parsed rows (amounts cleaned, LEVEL columns categorical).
+            Unparseable amount cells are NaN and reported on every load.
+
+    Raises:
+        FileNotFoundError: If the source CSV does not exist
+    """
+    stat = os.stat(path)
+    data_path, meta_path = _cache_paths(path, cache_dir)
+    meta = _read_meta(meta_path)
+
+    sha256 = None
+    if not refresh:
+        current, sha256 = _is_current(path, stat, meta, data_path)
+        if current:
+            if meta.get('mtime_ns') != stat.st_mtime_ns:
+                # Touched but unchanged: remember the new mtime for next time
+                meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                _write_meta(meta_path, meta)
+            UnparsedCells.from_records(meta.get('unparsed', [])).print_summary(os.path.basename(path))
+            if CACHE_FORMAT == 'parquet':
+                return pd.read_parquet(data_path)
+            return pd.read_pickle(data_path)
+
+    df, report = parse_csv(path)
+    report.print_summary(os.path.basename(path))
+
+    os.makedirs(cache_dir, exist_ok=True)
+    if CACHE_FORMAT == 'parquet':
+        write_atomic(data_path, lambda tmp: df.to_parquet(tmp, index=False))
+    else:
+        write_atomic(data_path, lambda tmp: df.to_pickle(tmp))
+    _write_meta(meta_path, {
+        'source': os.path.abspath(path),
+        'sha256': sha256 or file_sha256(path),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'rows': len(df),
+        'unparsed': report.to_records(),
+        'format': CACHE_FORMAT,
+        'version': CACHE_VERSION,
+    })
+
+    return df
+
+
+def load_budget_csv(kind, year, raw_dir=RAW_DIR, cache_dir=CACHE_DIR, refresh=False):
+    """
+    Load revenues{year}.csv or expenses{year}.csv through the cache.
+
+    Args:
+        kind (str): 'revenues' or 'expenses'
+        year (int): Persian year, e.g. 1400
+
+    Returns:
+        DataFrame: Parsed rows
+    """
+    return load_csv(os.path.join(raw_dir, f'{kind}{year}.csv'), cache_dir, refresh)
+
+
+def load_year(year, raw_dir=RAW_DIR, cache_dir=CACHE_DIR):
+    """Load the (revenues, expenses) frames for one year."""
+    return (load_budget_csv('revenues', year, raw_dir, cache_dir),
+            load_budget_csv('expenses', year, raw_dir, cache_dir))
+
+
+def clear_cache(cache_dir=CACHE_DIR):
+    """Delete every cache entry; returns the number of files removed."""
+    removed = 0
+    for path in glob.glob(os.path.join(cache_dir, '*')):
+        os.remove(path)
+        removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the columnar cache of unverified budget CSVs")
+    parser.add_argument('--clear', action='store_true', help='Delete all cache entries')
+    parser.add_argument('--refresh', action='store_true', help='Rebuild entries even if current')
+    args = parser.parse_args()
+
+    if args.clear:
+        print(f"🗑️  Removed {clear_cache()} cache files from {CACHE_DIR}")
+        return
+
+    print("="*80)
+    print(f"BUILDING CSV CACHE ({CACHE_FORMAT})")
+    print("="*80)
+
+    for path in sorted(glob.glob(os.path.join(RAW_DIR, '*.csv'))):
+        start = time.perf_counter()
+        df = load_csv(path, refresh=args.refresh)
+        elapsed = time.perf_counter() - start
+        print(f"  {os.path.basename(path):<22} {len(df):>6} rows  {elapsed*1000:>8.1f} ms")
+
+    print(f"\n✅ Cache directory: {CACHE_DIR}")
+
+
+if __name__ == '__main__':
+    main()
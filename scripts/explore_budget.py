@@ -4,49 +4,25 @@
 Script to extract and analyze Iran Budget 1399 text
 """
 
-import re
-import codecs
+from rtf_text import RTF_PATH, KeywordIndex, iter_paragraphs
 
 def decode_rtf_persian(rtf_file_path):
     """
     Read RTF file and decode Persian text
     RTF uses hex codes like \'c8\'e6\'cf\'cc\'e5 for Persian
     and Unicode like \u1777 for Persian-Indic digits
+
+    The file is decoded paragraph by paragraph (see rtf_text), one
+    paragraph per line.
     """
-    # Try reading with latin-1 which is more permissive
-    with open(rtf_file_path, 'r', encoding='latin-1') as f:
-        content = f.read()
-    
-    # Decode Unicode escapes like \u1777 (Persian digits)
-    def decode_unicode(match):
-        code = int(match.group(1))
-        return chr(code)
-    
-    content = re.sub(r'\\u(\d+)', decode_unicode, content)
-    
-    # Decode hex escapes like \'c8 (Persian letters in MacRoman/Windows-1256)
-    # Try Windows-1256 encoding for Persian
-    def decode_hex(match):
-        hex_str = match.group(1)
-        try:
-            # Convert hex to bytes and decode as Windows-1256
-            byte_val = int(hex_str, 16)
-            return bytes([byte_val]).decode('windows-1256', errors='ignore')
-        except:
-            return ''
-    
-    content = re.sub(r"\\'([0-9a-fA-F]{2})", decode_hex, content)
-    
-    # Remove RTF formatting codes
-    content = re.sub(r'\\[a-z]+\d*\s?', ' ', content)
-    content = re.sub(r'[{}]', '', content)
-    content = re.sub(r'\s+', ' ', content)
-    
-    return content
+    return '\n'.join(paragraph.text for paragraph in iter_paragraphs(rtf_file_path))
 
-def extract_budget_sections(text):
+def extract_budget_sections(index):
     """
     Find key budget terms and their surrounding context
+
+    Args:
+        index (KeywordIndex): Index of the decoded paragraphs
     """
     
     keywords = [
@@ -64,26 +40,21 @@ def extract_budget_sections(text):
         'هزار میلیارد',
     ]
     
-    findings = {}
-    
-    for keyword in keywords:
-        # Find occurrences with context (500 chars before and after)
-        pattern = f'.{{0,500}}{re.escape(keyword)}.{{0,500}}'
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        if matches:
-            findings[keyword] = matches[:5]  # Keep first 5 matches
+    # Find occurrences with context (500 chars before and after), all keywords in one pass
+    hits = index.search(keywords, before=500, after=500, limit=5)  # Keep first 5 matches
     
-    return findings
+    return {keyword: [hit['context'] for hit in matches] for keyword, matches in hits.items()}
 
 def main():
     print("=" * 70)
     print("Iran Budget 1399 Text Analysis")
     print("=" * 70)
     
-    rtf_path = '1399_budget_text.rtfd/TXT.rtf'
+    rtf_path = RTF_PATH
     
     print("\n1. Reading and decoding RTF file...")
-    decoded_text = decode_rtf_persian(rtf_path)
+    index = KeywordIndex.from_rtf(rtf_path)
+    decoded_text = index.text
     
     # Save decoded text to a plain text file
     output_path = '1399_budget_decoded.txt'
@@ -99,7 +70,7 @@ def main():
     print("-" * 70)
     
     print("\n3. Searching for budget keywords...")
-    findings = extract_budget_sections(decoded_text)
+    findings = extract_budget_sections(index)
     
     for keyword, matches in findings.items():
         print(f"\n   📊 Found '{keyword}' ({len(matches)} occurrences shown):")
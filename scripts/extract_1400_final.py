@@ -5,20 +5,10 @@ Final comprehensive extraction for 1400 budget
 Extracts all key metrics requested by user
 """
 
-import pandas as pd
 import json
 
-def clean_number(s):
-    """Clean and convert number strings to float"""
-    if isinstance(s, (int, float)):
-        return s
-    if pd.isna(s):
-        return 0.0
-    s = str(s).replace(',', '').strip()
-    try:
-        return float(s)
-    except ValueError:
-        return 0.0
+from budget_classifier import load_category_rules, split_current_capital
+from csv_cache import load_year
 
 def main():
     print("="*80)
@@ -26,12 +16,11 @@ def main():
     print("="*80)
     
     # Load CSVs
-    df_rev = pd.read_csv('../data/raw/unverified/revenues1400.csv')
-    df_exp = pd.read_csv('../data/raw/unverified/expenses1400.csv')
+    df_rev, df_exp = load_year(1400)
     
-    # Clean the 1400 column
-    df_rev['amount'] = df_rev['1400'].apply(clean_number)
-    df_exp['amount'] = df_exp['1400'].apply(clean_number)
+    # The 1400 column is already cleaned to floats by the cache
+    df_rev['amount'] = df_rev['1400']
+    df_exp['amount'] = df_exp['1400']
     
     results = {
         "year": 1400,
@@ -49,37 +38,35 @@ def main():
     total_revenues = df_rev['amount'].sum()
     print(f"Total Revenues: {total_revenues:,.2f} billion rials")
     
+    # Every revenue category in one pass (category_rules.json)
+    rev_rules = load_category_rules('revenues')
+    rev_masks = rev_rules.masks(df_rev)
+    rev_totals = rev_rules.totals(df_rev, masks=rev_masks)
+    
     # Tax Revenue
-    tax_rows = df_rev[df_rev['TOOLTIP'].str.contains('درآمدهای مالیاتی', na=False)]
-    if not tax_rows.empty:
-        tax_revenue = tax_rows['amount'].sum()
+    if rev_masks['tax_headline'].any():
+        tax_revenue = rev_totals['tax_headline']
     else:
         # Sum all tax categories
-        tax_rows = df_rev[df_rev['LEVEL2'].str.contains('مالیات', na=False)]
-        tax_revenue = tax_rows['amount'].sum()
+        tax_revenue = rev_totals['tax']
     
     print(f"Tax Revenue: {tax_revenue:,.2f} billion rials")
     
     # Oil & Gas Revenue
-    oil_keywords = ['نفت', 'گاز', 'ميعانات', 'میعانات']
-    oil_rows = df_rev[df_rev['TOOLTIP'].apply(
-        lambda x: any(kw in str(x) for kw in oil_keywords)
-    )]
-    oil_revenue = oil_rows['amount'].sum()
+    oil_revenue = rev_totals['oil_gas']
     print(f"Oil & Gas Revenue: {oil_revenue:,.2f} billion rials")
     
     # Corporate tax
-    corp_tax = df_rev[df_rev['LEVEL3'].str.contains('مالیات شرکت', na=False)]['amount'].sum()
+    corp_tax = rev_totals['corporate_tax']
     
     # Individual income tax (حقوق = salaries/wages)
-    indiv_tax = df_rev[df_rev['TOOLTIP'].str.contains('حقوق', na=False) & 
-                       df_rev['TOOLTIP'].str.contains('مالیات', na=False)]['amount'].sum()
+    indiv_tax = rev_totals['individual_tax']
     
     # Payroll tax (might be under different names)
-    payroll_tax = df_rev[df_rev['TOOLTIP'].str.contains('حق بیمه|بیمه', na=False)]['amount'].sum()
+    payroll_tax = rev_totals['payroll_tax']
     
     # Social security (تامین اجتماعی)
-    social_sec = df_rev[df_rev['TOOLTIP'].str.contains('تأمین اجتماعی|تامین اجتماعی', na=False)]['amount'].sum()
+    social_sec = rev_totals['social_security']
     
     print(f"\nTax Breakdown:")
     print(f"  Corporate Tax: {corp_tax:,.2f} billion rials")
@@ -88,8 +75,7 @@ def main():
     print(f"  Social Security: {social_sec:,.2f} billion rials")
     
     # Subsidy targeting (هدفمند كردن يارانه ‌ها)
-    subsidy_rows = df_rev[df_rev['TOOLTIP'].str.contains('یارانه|يارانه', na=False)]
-    subsidy_revenue = subsidy_rows['amount'].sum()
+    subsidy_revenue = rev_totals['subsidy']
     print(f"\nSubsidy-related revenues: {subsidy_revenue:,.2f} billion rials")
     
     results['revenues'] = {
@@ -118,23 +104,11 @@ def main():
     # Current: جاری, operational
     # Capital: سرمایه, تملک, عمرانی
     
-    current_keywords = ['جاری', 'عملیاتی', 'هزینه‌ای']
-    capital_keywords = ['سرمایه', 'تملک', 'عمرانی']
-    
-    current_exp = 0
-    capital_exp = 0
-    
-    for idx, row in df_exp.iterrows():
-        text_to_search = f"{row.get('TOOLTIP', '')} {row.get('LEVEL2', '')} {row.get('LEVEL3', '')}"
-        
-        if any(kw in text_to_search for kw in current_keywords):
-            current_exp += row['amount']
-        elif any(kw in text_to_search for kw in capital_keywords):
-            capital_exp += row['amount']
+    current_exp, capital_exp = split_current_capital(df_exp)
     
     # If classification unclear, try by LEVEL2
     if current_exp == 0 or capital_exp == 0:
-        level2_summary = df_exp.groupby('LEVEL2')['amount'].sum()
+        level2_summary = df_exp.groupby('LEVEL2', observed=True)['amount'].sum()
         print(f"\nExpenditure by LEVEL2:")
         for cat, amount in level2_summary.head(10).items():
             print(f"  {cat}: {amount:,.2f} billion rials")
@@ -144,7 +118,7 @@ def main():
     print(f"Unclassified: {total_exp - current_exp - capital_exp:,.2f} billion rials")
     
     # Subsidy spending
-    subsidy_exp = df_exp[df_exp['TOOLTIP'].str.contains('یارانه|يارانه', na=False)]['amount'].sum()
+    subsidy_exp = load_category_rules('expenses').totals(df_exp)['subsidy']
     print(f"\nSubsidy Expenditure: {subsidy_exp:,.2f} billion rials")
     
     results['expenditures'] = {
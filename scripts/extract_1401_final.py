@@ -4,19 +4,10 @@
 Final comprehensive extraction for 1401 budget
 """
 
-import pandas as pd
 import json
 
-def clean_number(s):
-    if isinstance(s, (int, float)):
-        return s
-    if pd.isna(s):
-        return 0.0
-    s = str(s).replace(',', '').strip()
-    try:
-        return float(s)
-    except ValueError:
-        return 0.0
+from budget_classifier import load_category_rules, split_current_capital
+from csv_cache import load_year
 
 def main():
     print("="*80)
@@ -24,12 +15,11 @@ def main():
     print("="*80)
     
     # Load CSVs
-    df_rev = pd.read_csv('../data/raw/unverified/revenues1401.csv')
-    df_exp = pd.read_csv('../data/raw/unverified/expenses1401.csv')
+    df_rev, df_exp = load_year(1401)
     
-    # Clean the 1401 column
-    df_rev['amount'] = df_rev['1401'].apply(clean_number)
-    df_exp['amount'] = df_exp['1401'].apply(clean_number)
+    # The 1401 column is already cleaned to floats by the cache
+    df_rev['amount'] = df_rev['1401']
+    df_exp['amount'] = df_exp['1401']
     
     results = {
         "year": 1401,
@@ -66,25 +56,22 @@ def main():
     total_revenues = df_rev['amount'].sum()
     print(f"Total Revenues (CSV): {total_revenues:,.2f} billion rials")
     
+    # Every revenue category in one pass (category_rules.json)
+    rev_totals = load_category_rules('revenues').totals(df_rev)
+    
     # Tax Revenue
-    tax_rows = df_rev[df_rev['LEVEL2'].str.contains('مالیات', na=False)]
-    tax_revenue = tax_rows['amount'].sum()
+    tax_revenue = rev_totals['tax']
     print(f"Tax Revenue: {tax_revenue:,.2f} billion rials")
     
     # Oil & Gas
-    oil_keywords = ['نفت', 'گاز', 'ميعانات', 'میعانات']
-    oil_rows = df_rev[df_rev['TOOLTIP'].apply(
-        lambda x: any(kw in str(x) for kw in oil_keywords)
-    )]
-    oil_revenue = oil_rows['amount'].sum()
+    oil_revenue = rev_totals['oil_gas']
     print(f"Oil & Gas Revenue: {oil_revenue:,.2f} billion rials")
     
     # Tax breakdown
-    corp_tax = df_rev[df_rev['LEVEL3'].str.contains('مالیات شرکت', na=False)]['amount'].sum()
-    indiv_tax = df_rev[df_rev['TOOLTIP'].str.contains('حقوق', na=False) & 
-                       df_rev['TOOLTIP'].str.contains('مالیات', na=False)]['amount'].sum()
-    payroll_tax = df_rev[df_rev['TOOLTIP'].str.contains('حق بیمه|بیمه', na=False)]['amount'].sum()
-    social_sec = df_rev[df_rev['TOOLTIP'].str.contains('تأمین اجتماعی|تامین اجتماعی', na=False)]['amount'].sum()
+    corp_tax = rev_totals['corporate_tax']
+    indiv_tax = rev_totals['individual_tax']
+    payroll_tax = rev_totals['payroll_tax']
+    social_sec = rev_totals['social_security']
     
     print(f"\nTax Breakdown:")
     print(f"  Corporate: {corp_tax:,.2f}")
@@ -92,7 +79,7 @@ def main():
     print(f"  Payroll: {payroll_tax:,.2f}")
     print(f"  Social Security: {social_sec:,.2f}")
     
-    subsidy_revenue = df_rev[df_rev['TOOLTIP'].str.contains('یارانه|يارانه', na=False)]['amount'].sum()
+    subsidy_revenue = rev_totals['subsidy']
     print(f"\nSubsidy-related revenues: {subsidy_revenue:,.2f}")
     
     results['revenues'] = {
@@ -118,24 +105,13 @@ def main():
     print(f"Total Expenditures (CSV): {total_exp:,.2f} billion rials")
     
     # Current vs Capital
-    current_keywords = ['جاری', 'عملیاتی', 'هزینه‌ای']
-    capital_keywords = ['سرمایه', 'تملک', 'عمرانی']
-    
-    current_exp = 0
-    capital_exp = 0
-    
-    for idx, row in df_exp.iterrows():
-        text_to_search = f"{row.get('TOOLTIP', '')} {row.get('LEVEL2', '')} {row.get('LEVEL3', '')}"
-        if any(kw in text_to_search for kw in current_keywords):
-            current_exp += row['amount']
-        elif any(kw in text_to_search for kw in capital_keywords):
-            capital_exp += row['amount']
+    current_exp, capital_exp = split_current_capital(df_exp)
     
     print(f"Current Expenditure: {current_exp:,.2f}")
     print(f"Capital Expenditure: {capital_exp:,.2f}")
     print(f"Unclassified: {total_exp - current_exp - capital_exp:,.2f}")
     
-    subsidy_exp = df_exp[df_exp['TOOLTIP'].str.contains('یارانه|يارانه', na=False)]['amount'].sum()
+    subsidy_exp = load_category_rules('expenses').totals(df_exp)['subsidy']
     print(f"\nSubsidy Expenditure: {subsidy_exp:,.2f}")
     
     results['expenditures'] = {
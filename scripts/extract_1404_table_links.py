@@ -2,9 +2,12 @@
 # -*- coding: utf-8 -*-
 """
 Extract all table image links from 1404 Part 2 HTML
+
+The page is parsed incrementally by law_html_index; run
+`python law_html_index.py --tables` for every saved year at once.
 """
 
-import re
+from law_html_index import parse_page
 
 html_file = '../data/raw/نسخه چاپی قانون بودجه سال 1404 كل كشور (بخش دوم).html'
 
@@ -12,23 +15,20 @@ print("="*80)
 print("EXTRACTING TABLE LINKS FROM 1404 BUDGET (PART 2)")
 print("="*80)
 
-with open(html_file, 'r', encoding='utf-8') as f:
-    content = f.read()
-
-# Find all links to GIF images with table descriptions
-pattern = r'<a href="(https://qavanin\.ir/[^"]+\.gif)"[^>]*>([^<]+جدول[^<]+)</a>'
-matches = re.findall(pattern, content)
+# Links to GIF images with table descriptions
+tables = parse_page(html_file)['tables']
 
-print(f"\nFound {len(matches)} table links:\n")
+print(f"\nFound {len(tables)} table links:\n")
 
 table_5_found = False
 
-for i, (url, description) in enumerate(matches, 1):
+for i, table in enumerate(tables, 1):
+    description = table['title']
     print(f"{i}. {description}")
-    print(f"   URL: {url}")
+    print(f"   URL: {table['url']}")
     
     # Check if this is Table 5
-    if 'جدول' in description and ('۵' in description or '5' in description or 'شماره 5' in description):
+    if table['number'] == 5:
         if 'درآمد' in description or 'منابع' in description:
             print("   ⭐ THIS LOOKS LIKE TABLE 5 (REVENUES)!")
             table_5_found = True
@@ -3,22 +3,25 @@
 """
 Extract budget data for ALL years: 1395-1404
 Create comprehensive multi-year dataset
+
+Usage:
+    python extract_all_years_1395_1404.py [--jobs N]
+
+Years are extracted in parallel across a process pool; output is printed
+and saved in year order regardless of which worker finishes first.
 """
 
-import pandas as pd
+import argparse
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
 import json
 import os
 
-def clean_number(s):
-    if isinstance(s, (int, float)):
-        return s
-    if pd.isna(s):
-        return 0.0
-    s = str(s).replace(',', '').strip()
-    try:
-        return float(s)
-    except ValueError:
-        return 0.0
+from budget_classifier import load_category_rules, split_current_capital
+from csv_cache import load_csv
 
 def analyze_year(year):
     """Analyze budget data for a single year"""
@@ -38,52 +41,32 @@ def analyze_year(year):
         print(f"⚠️  Expense file not found: {exp_file}")
         return None
     
-    df_rev = pd.read_csv(rev_file)
-    df_exp = pd.read_csv(exp_file)
+    df_rev = load_csv(rev_file)
+    df_exp = load_csv(exp_file)
     
-    # Clean year column
+    # Year column is already cleaned to floats by the cache
     year_col = str(year)
-    df_rev['amount'] = df_rev[year_col].apply(clean_number)
-    df_exp['amount'] = df_exp[year_col].apply(clean_number)
+    df_rev['amount'] = df_rev[year_col]
+    df_exp['amount'] = df_exp[year_col]
     
     # REVENUES
     total_revenues = df_rev['amount'].sum()
     
-    # Tax revenue
-    tax_rows = df_rev[df_rev['LEVEL2'].str.contains('مالیات', na=False)]
-    tax_revenue = tax_rows['amount'].sum()
-    
-    # Oil & Gas
-    oil_keywords = ['نفت', 'گاز', 'ميعانات', 'میعانات']
-    oil_rows = df_rev[df_rev['TOOLTIP'].apply(
-        lambda x: any(kw in str(x) for kw in oil_keywords)
-    )]
-    oil_revenue = oil_rows['amount'].sum()
-    
-    # Tax breakdown
-    corp_tax = df_rev[df_rev['LEVEL3'].str.contains('مالیات شرکت', na=False)]['amount'].sum()
-    indiv_tax = df_rev[df_rev['TOOLTIP'].str.contains('حقوق', na=False) & 
-                       df_rev['TOOLTIP'].str.contains('مالیات', na=False)]['amount'].sum()
+    # Tax, oil/gas and tax breakdown in one pass (category_rules.json)
+    rev_totals = load_category_rules('revenues').totals(df_rev)
+    tax_revenue = rev_totals['tax']
+    oil_revenue = rev_totals['oil_gas']
+    corp_tax = rev_totals['corporate_tax']
+    indiv_tax = rev_totals['individual_tax']
     
     # EXPENDITURES
     total_exp = df_exp['amount'].sum()
     
     # Current vs Capital (approximate)
-    current_keywords = ['جاری', 'عملیاتی', 'هزینه‌ای']
-    capital_keywords = ['سرمایه', 'تملک', 'عمرانی']
-    
-    current_exp = 0
-    capital_exp = 0
-    
-    for idx, row in df_exp.iterrows():
-        text_to_search = f"{row.get('TOOLTIP', '')} {row.get('LEVEL2', '')} {row.get('LEVEL3', '')}"
-        if any(kw in text_to_search for kw in current_keywords):
-            current_exp += row['amount']
-        elif any(kw in text_to_search for kw in capital_keywords):
-            capital_exp += row['amount']
+    current_exp, capital_exp = split_current_capital(df_exp)
     
     # Subsidy expenditure
-    subsidy_exp = df_exp[df_exp['TOOLTIP'].str.contains('یارانه|يارانه', na=False)]['amount'].sum()
+    subsidy_exp = load_category_rules('expenses').totals(df_exp)['subsidy']
     
     # Balance
     balance = total_revenues - total_exp
@@ -130,17 +113,56 @@ def analyze_year(year):
         }
     }
 
-def main():
+YEARS = [1395, 1396, 1397, 1398, 1399, 1400, 1401, 1402, 1403]
+
+def run_year(year):
+    """Analyze one year, capturing its log so parallel output stays ordered"""
+    buffer = io.StringIO()
+    start = time.perf_counter()
+    with redirect_stdout(buffer):
+        result = analyze_year(year)
+    return year, result, buffer.getvalue(), time.perf_counter() - start
+
+def extract_years(years, jobs=None):
+    """
+    Run analyze_year for every year, in parallel when jobs != 1
+
+    Returns:
+        list of (year, result, log, seconds) tuples in the order of `years`
+    """
+    if jobs == 1 or len(years) <= 1:
+        return [run_year(year) for year in years]
+
+    # executor.map yields results in submission order -> deterministic output
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(run_year, years))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract budget data for all years (1395-1404)")
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=os.cpu_count(),
+        help='Number of worker processes (default: CPU count, 1 = sequential)'
+    )
+    args = parser.parse_args(argv)
+    jobs = max(1, args.jobs or 1)
+    
     print("="*80)
     print("EXTRACTING ALL YEARS: 1395-1404")
+    print(f"Workers: {jobs}")
     print("="*80)
     
-    years = [1395, 1396, 1397, 1398, 1399, 1400, 1401, 1402, 1403]
-    
     all_data = {}
+    timings = {}
     
-    for year in years:
-        result = analyze_year(year)
+    wall_start = time.perf_counter()
+    outcomes = extract_years(YEARS, jobs)
+    wall_time = time.perf_counter() - wall_start
+    
+    for year, result, log, seconds in outcomes:
+        print(log, end='')
+        timings[year] = seconds
         if result:
             all_data[year] = result
             
@@ -170,7 +192,7 @@ def main():
     # Summary
     print("\n📊 SUMMARY:")
     print("-"*80)
-    print(f"{'Year':<6} {'Revenues':>18} {'Expenditures':>18} {'Balance':>18} {'Status':<10}")
+    print(f"{'Year':<6} {'Revenues':>18} {'Expenditures':>18} {'Balance':>18} {'Status':<10} {'Time (s)':>9}")
     print("-"*80)
     
     for year in sorted(all_data.keys()):
@@ -180,8 +202,13 @@ def main():
         bal = data['balance']['surplus_deficit']
         status = data['balance']['status']
         
-        print(f"{year:<6} {rev:>18,.0f} {exp:>18,.0f} {bal:>18,.0f} {status:<10}")
+        elapsed = f"{timings[year]:>9.2f}" if year in timings else f"{'-':>9}"
+        
+        print(f"{year:<6} {rev:>18,.0f} {exp:>18,.0f} {bal:>18,.0f} {status:<10} {elapsed}")
     
+    print("-"*80)
+    print(f"Extraction wall clock: {wall_time:.2f}s "
+          f"(sum of per-year times: {sum(timings.values()):.2f}s, {jobs} worker(s))")
     print("="*80)
 
 if __name__ == "__main__":
@@ -7,51 +7,55 @@ Extract key budget metrics from Iran Budget 1399
 import re
 import json
 
+from numeric_ingest import TEXT_TRANSLATION
+from rtf_text import KeywordIndex, decode_rtf
+
 def load_decoded_text():
-    """Load the decoded budget text"""
-    with open('1399_budget_decoded.txt', 'r', encoding='utf-8') as f:
-        return f.read()
+    """Decode the budget RTF (see rtf_text)"""
+    return decode_rtf()
 
-def find_numbers_with_context(text, keyword, context_chars=300):
+def find_numbers_with_context(text, keywords, context_chars=300):
     """
-    Find all occurrences of a keyword and extract nearby numbers
+    Find all occurrences of the keywords and extract nearby numbers
+
+    All keywords are found in one pass over the text (see rtf_text.KeywordIndex).
+
+    Returns:
+        dict: {keyword: [result]} for keywords that occur
     """
-    results = []
+    results = {}
     
     # Find keyword occurrences
-    pattern = f'.{{{0},{context_chars}}}{re.escape(keyword)}.{{{0},{context_chars}}}'
-    matches = re.finditer(pattern, text, re.IGNORECASE)
+    findings = KeywordIndex.from_text(text).search(keywords, before=context_chars, after=context_chars)
     
-    for match in matches:
-        context = match.group()
-        
-        # Extract numbers in various formats
-        # Format 1: (000 /000 /371 /534 /266 /20) - Persian budget format
-        nums1 = re.findall(r'\([\d\s/]+\)', context)
-        
-        # Format 2: ۱۲۳۴۵ - Persian-Indic numerals
-        persian_nums = re.findall(r'[۰-۹]+', context)
-        
-        # Format 3: 123456 - Arabic numerals
-        arabic_nums = re.findall(r'\d[\d\s,/]*\d', context)
-        
-        results.append({
-            'keyword': keyword,
-            'context': context.strip(),
-            'numbers_parentheses': nums1,
-            'numbers_persian': persian_nums,
-            'numbers_arabic': arabic_nums
-        })
+    for keyword, hits in findings.items():
+        results[keyword] = []
+        for hit in hits:
+            context = hit['context']
+            
+            # Extract numbers in various formats
+            # Format 1: (000 /000 /371 /534 /266 /20) - Persian budget format
+            nums1 = hit['numbers']
+            
+            # Format 2: ۱۲۳۴۵ - Persian-Indic numerals
+            persian_nums = re.findall(r'[۰-۹]+', context)
+            
+            # Format 3: 123456 - Arabic numerals
+            arabic_nums = re.findall(r'\d[\d\s,/]*\d', context)
+            
+            results[keyword].append({
+                'keyword': keyword,
+                'context': context.strip(),
+                'numbers_parentheses': nums1,
+                'numbers_persian': persian_nums,
+                'numbers_arabic': arabic_nums
+            })
     
     return results
 
 def convert_persian_to_arabic(persian_num):
     """Convert Persian-Indic digits to Arabic numerals"""
-    persian_digits = '۰۱۲۳۴۵۶۷۸۹'
-    arabic_digits = '0123456789'
-    
-    trans_table = str.maketrans(persian_digits, arabic_digits)
-    return persian_num.translate(trans_table)
+    return persian_num.translate(TEXT_TRANSLATION)
 
 def parse_budget_number(num_str):
     """
@@ -83,12 +87,15 @@ def extract_budget_metrics(text):
     print("Searching for budget metrics...\n")
     print("=" * 80)
     
+    found = find_numbers_with_context(
+        text, [keyword for keyword_list in keywords.values() for keyword in keyword_list], context_chars=400)
+    
     for metric_name, keyword_list in keywords.items():
         print(f"\n📊 {metric_name.upper().replace('_', ' ')}")
         print("-" * 80)
         
         for keyword in keyword_list:
-            results = find_numbers_with_context(text, keyword, context_chars=400)
+            results = found.get(keyword, [])
             
             if results:
                 print(f"\n   Keyword: '{keyword}' - Found {len(results)} occurrences")
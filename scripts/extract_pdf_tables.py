@@ -5,50 +5,29 @@ Extract tables from Iran Budget PDF using pdfplumber
 """
 
 try:
-    import pdfplumber
     import json
+    import os
+    import sys
     import pandas as pd
+    from pdf_extract import PDF_FILES, extract_tables, page_count
     
-    def extract_tables_from_pdf(pdf_path, output_dir='.'):
-        """Extract all tables from PDF"""
+    def extract_tables_from_pdf(pdf_path, output_dir='.', jobs=None):
+        """Extract all tables from PDF (every page, sharded across processes)"""
         
         print("=" * 80)
         print(f"Extracting tables from: {pdf_path}")
         print("=" * 80)
         
-        all_tables = []
+        print(f"\nTotal pages: {page_count(pdf_path)}\n")
         
-        with pdfplumber.open(pdf_path) as pdf:
-            print(f"\nTotal pages: {len(pdf.pages)}\n")
-            
-            # Check first 50 pages for tables (budget tables are usually at the beginning)
-            max_pages = min(50, len(pdf.pages))
-            
-            for page_num, page in enumerate(pdf.pages[:max_pages], 1):
-                print(f"Processing page {page_num}/{max_pages}...", end='')
-                
-                # Extract tables from page
-                tables = page.extract_tables()
-                
-                if tables:
-                    print(f" Found {len(tables)} table(s)")
-                    
-                    for table_num, table in enumerate(tables, 1):
-                        if table and len(table) > 0:
-                            print(f"  Table {table_num}: {len(table)} rows x {len(table[0]) if table[0] else 0} cols")
-                            
-                            all_tables.append({
-                                'page': page_num,
-                                'table_num': table_num,
-                                'rows': len(table),
-                                'cols': len(table[0]) if table and table[0] else 0,
-                                'data': table
-                            })
-                            
-                            # Show first few rows
-                            print(f"  First row: {table[0][:3] if table[0] else 'Empty'}")
-                else:
-                    print(" No tables")
+        all_tables = extract_tables(pdf_path, jobs=jobs)
+        
+        for table_info in all_tables:
+            table = table_info['data']
+            print(f"Page {table_info['page']}: Table {table_info['table_num']}: "
+                  f"{table_info['rows']} rows x {table_info['cols']} cols")
+            # Show first few rows
+            print(f"  First row: {table[0][:3] if table[0] else 'Empty'}")
         
         print(f"\n" + "=" * 80)
         print(f"Total tables found: {len(all_tables)}")
@@ -74,8 +53,15 @@ try:
         return all_tables
     
     if __name__ == '__main__':
-        pdf_file = '1399.pdf'
-        tables = extract_tables_from_pdf(pdf_file)
+        # Default: the budget law PDFs in data/raw, one output folder each
+        pdf_files = sys.argv[1:] or PDF_FILES
+        for pdf_file in pdf_files:
+            output_dir = os.path.join('../output/pdf_tables', os.path.splitext(os.path.basename(pdf_file))[0])
+            os.makedirs(output_dir, exist_ok=True)
+            try:
+                tables = extract_tables_from_pdf(pdf_file, output_dir)
+            except Exception as e:
+                print(f"❌ Could not extract {pdf_file}: {e}")
         
         print("\n" + "=" * 80)
         print("NEXT STEPS:")
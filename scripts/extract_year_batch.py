@@ -4,20 +4,11 @@
 Batch extract budget data for years 1402 and 1403
 """
 
-import pandas as pd
 import json
 import re
 
-def clean_number(s):
-    if isinstance(s, (int, float)):
-        return s
-    if pd.isna(s):
-        return 0.0
-    s = str(s).replace(',', '').strip()
-    try:
-        return float(s)
-    except ValueError:
-        return 0.0
+from budget_classifier import load_category_rules, split_current_capital
+from csv_cache import load_year
 
 def extract_year(year):
     print("="*80)
@@ -26,15 +17,14 @@ def extract_year(year):
     
     # Load CSVs
     try:
-        df_rev = pd.read_csv(f'../data/raw/unverified/revenues{year}.csv')
-        df_exp = pd.read_csv(f'../data/raw/unverified/expenses{year}.csv')
+        df_rev, df_exp = load_year(year)
     except FileNotFoundError:
         print(f"❌ CSV files not found for year {year}")
         return None
     
-    # Clean the year column
-    df_rev['amount'] = df_rev[str(year)].apply(clean_number)
-    df_exp['amount'] = df_exp[str(year)].apply(clean_number)
+    # Year column is already cleaned to floats by the cache
+    df_rev['amount'] = df_rev[str(year)]
+    df_exp['amount'] = df_exp[str(year)]
     
     results = {
         "year": year,
@@ -49,24 +39,15 @@ def extract_year(year):
     total_revenues = df_rev['amount'].sum()
     print(f"Total Revenues (CSV): {total_revenues:,.2f} billion rials")
     
-    # Tax Revenue
-    tax_rows = df_rev[df_rev['LEVEL2'].str.contains('مالیات', na=False)]
-    tax_revenue = tax_rows['amount'].sum()
-    
-    # Oil & Gas
-    oil_keywords = ['نفت', 'گاز', 'ميعانات', 'میعانات']
-    oil_rows = df_rev[df_rev['TOOLTIP'].apply(
-        lambda x: any(kw in str(x) for kw in oil_keywords)
-    )]
-    oil_revenue = oil_rows['amount'].sum()
-    
-    # Tax breakdown
-    corp_tax = df_rev[df_rev['LEVEL3'].str.contains('مالیات شرکت', na=False)]['amount'].sum()
-    indiv_tax = df_rev[df_rev['TOOLTIP'].str.contains('حقوق', na=False) & 
-                       df_rev['TOOLTIP'].str.contains('مالیات', na=False)]['amount'].sum()
-    payroll_tax = df_rev[df_rev['TOOLTIP'].str.contains('حق بیمه|بیمه', na=False)]['amount'].sum()
+    # Tax, oil/gas, tax breakdown and subsidies in one pass (category_rules.json)
+    rev_totals = load_category_rules('revenues').totals(df_rev)
+    tax_revenue = rev_totals['tax']
+    oil_revenue = rev_totals['oil_gas']
+    corp_tax = rev_totals['corporate_tax']
+    indiv_tax = rev_totals['individual_tax']
+    payroll_tax = rev_totals['payroll_tax']
     
-    subsidy_revenue = df_rev[df_rev['TOOLTIP'].str.contains('یارانه|يارانه', na=False)]['amount'].sum()
+    subsidy_revenue = rev_totals['subsidy']
     
     print(f"  Tax Revenue: {tax_revenue:,.2f}")
     print(f"  Oil/Gas: {oil_revenue:,.2f}")
@@ -95,20 +76,9 @@ def extract_year(year):
     print(f"Total Expenditures (CSV): {total_exp:,.2f} billion rials")
     
     # Current vs Capital
-    current_keywords = ['جاری', 'عملیاتی', 'هزینه‌ای']
-    capital_keywords = ['سرمایه', 'تملک', 'عمرانی']
-    
-    current_exp = 0
-    capital_exp = 0
-    
-    for idx, row in df_exp.iterrows():
-        text_to_search = f"{row.get('TOOLTIP', '')} {row.get('LEVEL2', '')} {row.get('LEVEL3', '')}"
-        if any(kw in text_to_search for kw in current_keywords):
-            current_exp += row['amount']
-        elif any(kw in text_to_search for kw in capital_keywords):
-            capital_exp += row['amount']
+    current_exp, capital_exp = split_current_capital(df_exp)
     
-    subsidy_exp = df_exp[df_exp['TOOLTIP'].str.contains('یارانه|يارانه', na=False)]['amount'].sum()
+    subsidy_exp = load_category_rules('expenses').totals(df_exp)['subsidy']
     
     print(f"  Current Exp: {current_exp:,.2f}")
     print(f"  Capital Exp: {capital_exp:,.2f}")
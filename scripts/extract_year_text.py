@@ -4,9 +4,10 @@
 Generic script to extract budget data from text files
 """
 
-import re
 import json
 
+from rtf_text import PAREN_NUMBER, KeywordIndex
+
 def extract_budget_from_text(text_file, year):
     """
     Extract key budget numbers from Persian text file
@@ -26,8 +27,7 @@ def extract_budget_from_text(text_file, year):
     }
     
     # Find budget numbers in format: (000/000/000/000/000/20)
-    pattern = r'\([\d\s/]+\)'
-    numbers = re.findall(pattern, text)
+    numbers = PAREN_NUMBER.findall(text)
     
     print(f"\nFound {len(numbers)} numbers in parentheses format")
     
@@ -46,20 +46,17 @@ def extract_budget_from_text(text_file, year):
     
     findings = {}
     
-    for keyword in keywords:
-        pattern = f'.{{0,300}}{keyword}.{{0,500}}'
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        
-        if matches:
-            findings[keyword] = []
-            for match in matches[:3]:  # First 3 occurrences
-                # Extract numbers from this match
-                nums = re.findall(r'\([\d\s/]+\)', match)
-                if nums:
-                    findings[keyword].append({
-                        'context': ' '.join(match.split())[:200],
-                        'numbers': nums
-                    })
+    # All keywords in one pass; numbers come from the context windows only
+    hits = KeywordIndex.from_text(text).search(keywords, before=300, after=500, limit=3)  # First 3 occurrences
+    
+    for keyword, matches in hits.items():
+        findings[keyword] = []
+        for match in matches:
+            if match['numbers']:
+                findings[keyword].append({
+                    'context': ' '.join(match['context'].split())[:200],
+                    'numbers': match['numbers']
+                })
     
     # Display findings
     print("\n📊 KEY FINDINGS:")
@@ -4,21 +4,25 @@
 Find budget tables in the decoded text
 """
 
-import re
+from rtf_text import KeywordIndex
 
-def find_tables():
+def find_tables(text=None):
     """Find all table references in the budget document"""
     
-    with open('1399_budget_decoded.txt', 'r', encoding='utf-8') as f:
-        text = f.read()
+    index = KeywordIndex.from_rtf() if text is None else KeywordIndex.from_text(text)
+    text = index.text
+    
+    # One pass over the text for all three searches
+    hits = {}
+    for hit in index.finditer(['جدول', 'منابع عمومي', 'هزينه‌ها']):
+        hits.setdefault(hit.keyword, []).append(hit)
     
     print("=" * 80)
     print("SEARCHING FOR BUDGET TABLES")
     print("=" * 80)
     
     # Find all mentions of "جدول" (table)
-    table_pattern = r'.{0,300}جدول.{0,500}'
-    matches = re.findall(table_pattern, text)
+    matches = [text[max(0, hit.start - 300):hit.end + 500] for hit in hits.get('جدول', [])]
     
     print(f"\nFound {len(matches)} table references\n")
     
@@ -35,8 +39,7 @@ def find_tables():
     print("=" * 80)
     
     # Search for "منابع عمومي" (general resources/revenues)
-    revenue_pattern = r'.{0,200}منابع عمومي.{0,500}'
-    revenue_matches = re.findall(revenue_pattern, text)
+    revenue_matches = [text[max(0, hit.start - 200):hit.end + 500] for hit in hits.get('منابع عمومي', [])]
     
     print(f"\nFound {len(revenue_matches)} 'منابع عمومي' references:\n")
     for i, match in enumerate(revenue_matches[:5], 1):
@@ -45,8 +48,7 @@ def find_tables():
         print()
     
     # Search for expenditure "هزينه" 
-    exp_pattern = r'.{0,200}هزينه‌ها.{0,500}'
-    exp_matches = re.findall(exp_pattern, text, re.IGNORECASE)
+    exp_matches = [text[max(0, hit.start - 200):hit.end + 500] for hit in hits.get('هزينه‌ها', [])]
     
     print(f"\nFound {len(exp_matches)} 'هزينه' references:\n")
     for i, match in enumerate(exp_matches[:5], 1):
@@ -6,7 +6,10 @@ Imports 10 years of Iranian budget data from JSON into PostgreSQL database.
 Run this script after creating the database schema with create_schema.sql
 
 Usage:
-    python import_data.py
+    python import_data.py [DATABASE] [--bulk]
+
+    --bulk  Stage all years with COPY FROM STDIN and upsert each target
+            table in one set-based statement instead of row-by-row INSERTs
 
 Requirements:
     - PostgreSQL database 'iran_budget' must exist
@@ -17,6 +20,8 @@ Author: AI Assistant
 Date: December 2025
 """
 
+import argparse
+import io
 import json
 import os
 import sys
@@ -25,7 +30,9 @@ import psycopg2
 from psycopg2 import sql
 import logging
 from decimal import Decimal
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterable, Sequence
+
+import budget_db
 
 # Configure logging
 logging.basicConfig(
@@ -38,6 +45,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def copy_text_value(value: Any) -> str:
+    """Format one value for COPY ... FROM STDIN (text format)"""
+    if value is None or (isinstance(value, float) and value != value):  # None / NaN
+        return r'\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return (str(value)
+            .replace('\\', '\\\\')
+            .replace('\t', '\\t')
+            .replace('\n', '\\n')
+            .replace('\r', '\\r'))
+
 class BudgetDataImporter:
     def __init__(self, db_config: Dict[str, str]):
         self.db_config = db_config
@@ -48,7 +67,7 @@ class BudgetDataImporter:
         """Establish database connection"""
         try:
             logger.info("Connecting to PostgreSQL database...")
-            self.connection = psycopg2.connect(**self.db_config)
+            self.connection = budget_db.acquire(self.db_config)
             self.connection.autocommit = False  # We'll manage transactions
             logger.info("✅ Database connection established")
 
@@ -107,6 +126,60 @@ class BudgetDataImporter:
         logger.info("✅ Data structure validation passed")
         return True
 
+    # -----------------------------------------------------------------
+    # Row builders (shared by the per-year INSERTs and the bulk COPY path)
+    # -----------------------------------------------------------------
+
+    @staticmethod
+    def year_values(year_data: Dict[str, Any]) -> tuple:
+        """(year_persian, year_gregorian, currency, data_source)"""
+        return (
+            year_data['year'],
+            year_data.get('year_gregorian', ''),
+            year_data.get('currency', 'billion rials'),
+            year_data.get('source', '')
+        )
+
+    @staticmethod
+    def revenue_values(revenues: Dict[str, Any]) -> tuple:
+        """(total, tax_total, oil_gas, other, tax_corporate, tax_individual, tax_payroll, tax_social_security)"""
+        tax_breakdown = revenues.get('tax_breakdown', {})
+
+        # Calculate 'other' revenue if not provided
+        other_revenue = revenues.get('other')
+        if other_revenue is None and 'total' in revenues and 'tax_total' in revenues and 'oil_gas' in revenues:
+            other_revenue = revenues['total'] - revenues['tax_total'] - revenues['oil_gas']
+
+        return (
+            revenues.get('total'),
+            revenues.get('tax_total'),
+            revenues.get('oil_gas'),
+            other_revenue,
+            tax_breakdown.get('corporate'),
+            tax_breakdown.get('individual'),
+            tax_breakdown.get('payroll'),
+            tax_breakdown.get('social_security')
+        )
+
+    @staticmethod
+    def expenditure_values(expenditures: Dict[str, Any]) -> tuple:
+        """(total, current_exp, capital_exp, unclassified, subsidy_spending)"""
+        return (
+            expenditures.get('total'),
+            expenditures.get('current'),
+            expenditures.get('capital'),
+            expenditures.get('unclassified'),
+            expenditures.get('subsidy_spending')
+        )
+
+    @staticmethod
+    def balance_values(balance: Dict[str, Any]) -> tuple:
+        """(surplus_deficit, status)"""
+        return (
+            balance.get('surplus_deficit'),
+            balance.get('status')
+        )
+
     def insert_year_data(self, year_data: Dict[str, Any]) -> int:
         """Insert year metadata and return year_id"""
         query = """
@@ -121,20 +194,13 @@ class BudgetDataImporter:
         """
 
         with self.connection.cursor() as cursor:
-            cursor.execute(query, (
-                year_data['year'],
-                year_data.get('year_gregorian', ''),
-                year_data.get('currency', 'billion rials'),
-                year_data.get('source', '')
-            ))
+            cursor.execute(query, self.year_values(year_data))
             year_id = cursor.fetchone()[0]
             logger.debug(f"Inserted/updated year {year_data['year']} with ID {year_id}")
             return year_id
 
     def insert_revenue_data(self, year_id: int, revenues: Dict[str, Any]):
         """Insert revenue data for a year"""
-        tax_breakdown = revenues.get('tax_breakdown', {})
-
         query = """
         INSERT INTO revenues (
             year_id, total, tax_total, oil_gas, other,
@@ -152,23 +218,8 @@ class BudgetDataImporter:
             updated_at = CURRENT_TIMESTAMP;
         """
 
-        # Calculate 'other' revenue if not provided
-        other_revenue = revenues.get('other')
-        if other_revenue is None and 'total' in revenues and 'tax_total' in revenues and 'oil_gas' in revenues:
-            other_revenue = revenues['total'] - revenues['tax_total'] - revenues['oil_gas']
-
         with self.connection.cursor() as cursor:
-            cursor.execute(query, (
-                year_id,
-                revenues.get('total'),
-                revenues.get('tax_total'),
-                revenues.get('oil_gas'),
-                other_revenue,
-                tax_breakdown.get('corporate'),
-                tax_breakdown.get('individual'),
-                tax_breakdown.get('payroll'),
-                tax_breakdown.get('social_security')
-            ))
+            cursor.execute(query, (year_id,) + self.revenue_values(revenues))
 
     def insert_expenditure_data(self, year_id: int, expenditures: Dict[str, Any]):
         """Insert expenditure data for a year"""
@@ -186,14 +237,7 @@ class BudgetDataImporter:
         """
 
         with self.connection.cursor() as cursor:
-            cursor.execute(query, (
-                year_id,
-                expenditures.get('total'),
-                expenditures.get('current'),
-                expenditures.get('capital'),
-                expenditures.get('unclassified'),
-                expenditures.get('subsidy_spending')
-            ))
+            cursor.execute(query, (year_id,) + self.expenditure_values(expenditures))
 
     def insert_balance_data(self, year_id: int, balance: Dict[str, Any]):
         """Insert balance data for a year"""
@@ -207,11 +251,7 @@ class BudgetDataImporter:
         """
 
         with self.connection.cursor() as cursor:
-            cursor.execute(query, (
-                year_id,
-                balance.get('surplus_deficit'),
-                balance.get('status')
-            ))
+            cursor.execute(query, (year_id,) + self.balance_values(balance))
 
     def validate_totals(self) -> bool:
         """Validate that revenue and expenditure totals match expectations"""
@@ -260,6 +300,27 @@ class BudgetDataImporter:
             logger.warning(f"⚠️  Found {issues_found} data integrity issues")
             return False
 
+    def refresh_materialized_views(self) -> bool:
+        """Refresh the mv_* rollups (create_materialized_views.sql) if installed"""
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute("SELECT to_regproc('refresh_budget_views') IS NOT NULL;")
+                installed = cursor.fetchone()[0]
+                if installed:
+                    # CONCURRENTLY: the API keeps reading the old rows meanwhile
+                    cursor.execute("SELECT refresh_budget_views();")
+            self.connection.commit()
+        except psycopg2.Error as e:
+            logger.error(f"❌ Materialized view refresh failed: {e}")
+            self.connection.rollback()
+            return False
+
+        if installed:
+            logger.info("✅ Materialized views refreshed")
+        else:
+            logger.info("Materialized views not installed; skipping refresh")
+        return True
+
     def import_all_data(self, data: Dict[str, Any]) -> bool:
         """Import all budget data"""
         try:
@@ -292,6 +353,10 @@ class BudgetDataImporter:
             self.connection.commit()
             logger.info(f"✅ Successfully imported {years_processed} years")
 
+            # Refresh materialized rollups so API readers see the new data
+            if not self.refresh_materialized_views():
+                return False
+
             # Validate data integrity
             return self.validate_totals()
 
@@ -300,6 +365,157 @@ class BudgetDataImporter:
             self.connection.rollback()
             return False
 
+    def copy_rows(self, cursor, table: str, columns: Sequence[str],
+                  rows: Iterable[Sequence[Any]]) -> int:
+        """
+        Load rows into a table with a single COPY FROM STDIN.
+
+        Works for any table, so staging tables for yearly aggregates and
+        line-item detail share the same path.
+
+        Returns:
+            Number of rows copied
+        """
+        buffer = io.StringIO()
+        count = 0
+        for row in rows:
+            buffer.write('\t'.join(copy_text_value(value) for value in row))
+            buffer.write('\n')
+            count += 1
+        buffer.seek(0)
+
+        copy_query = sql.SQL("COPY {} ({}) FROM STDIN").format(
+            sql.Identifier(table),
+            sql.SQL(', ').join(sql.Identifier(column) for column in columns)
+        )
+        cursor.copy_expert(copy_query.as_string(cursor), buffer)
+        return count
+
+    def bulk_import_all_data(self, data: Dict[str, Any]) -> bool:
+        """
+        Import all budget data in one round of COPYs plus one set-based
+        upsert per target table (years, revenues, expenditures, budget_balance)
+        """
+        staging_ddl = """
+        CREATE TEMP TABLE stage_years (
+            year_persian INTEGER, year_gregorian VARCHAR(20),
+            currency VARCHAR(50), data_source TEXT
+        ) ON COMMIT DROP;
+        CREATE TEMP TABLE stage_revenues (
+            year_persian INTEGER, total DECIMAL(20, 3), tax_total DECIMAL(20, 3),
+            oil_gas DECIMAL(20, 3), other DECIMAL(20, 3),
+            tax_corporate DECIMAL(20, 3), tax_individual DECIMAL(20, 3),
+            tax_payroll DECIMAL(20, 3), tax_social_security DECIMAL(20, 3)
+        ) ON COMMIT DROP;
+        CREATE TEMP TABLE stage_expenditures (
+            year_persian INTEGER, total DECIMAL(20, 3), current_exp DECIMAL(20, 3),
+            capital_exp DECIMAL(20, 3), unclassified DECIMAL(20, 3),
+            subsidy_spending DECIMAL(20, 3)
+        ) ON COMMIT DROP;
+        CREATE TEMP TABLE stage_budget_balance (
+            year_persian INTEGER, surplus_deficit DECIMAL(20, 3), status VARCHAR(20)
+        ) ON COMMIT DROP;
+        """
+
+        upserts = [
+            ('years', """
+            INSERT INTO years (year_persian, year_gregorian, currency, data_source)
+            SELECT year_persian, year_gregorian, currency, data_source FROM stage_years
+            ON CONFLICT (year_persian) DO UPDATE SET
+                year_gregorian = EXCLUDED.year_gregorian,
+                currency = EXCLUDED.currency,
+                data_source = EXCLUDED.data_source,
+                updated_at = CURRENT_TIMESTAMP;
+            """),
+            ('revenues', """
+            INSERT INTO revenues (
+                year_id, total, tax_total, oil_gas, other,
+                tax_corporate, tax_individual, tax_payroll, tax_social_security
+            )
+            SELECT y.year_id, s.total, s.tax_total, s.oil_gas, s.other,
+                   s.tax_corporate, s.tax_individual, s.tax_payroll, s.tax_social_security
+            FROM stage_revenues s JOIN years y ON y.year_persian = s.year_persian
+            ON CONFLICT (year_id) DO UPDATE SET
+                total = EXCLUDED.total,
+                tax_total = EXCLUDED.tax_total,
+                oil_gas = EXCLUDED.oil_gas,
+                other = EXCLUDED.other,
+                tax_corporate = EXCLUDED.tax_corporate,
+                tax_individual = EXCLUDED.tax_individual,
+                tax_payroll = EXCLUDED.tax_payroll,
+                tax_social_security = EXCLUDED.tax_social_security,
+                updated_at = CURRENT_TIMESTAMP;
+            """),
+            ('expenditures', """
+            INSERT INTO expenditures (
+                year_id, total, current_exp, capital_exp, unclassified, subsidy_spending
+            )
+            SELECT y.year_id, s.total, s.current_exp, s.capital_exp, s.unclassified, s.subsidy_spending
+            FROM stage_expenditures s JOIN years y ON y.year_persian = s.year_persian
+            ON CONFLICT (year_id) DO UPDATE SET
+                total = EXCLUDED.total,
+                current_exp = EXCLUDED.current_exp,
+                capital_exp = EXCLUDED.capital_exp,
+                unclassified = EXCLUDED.unclassified,
+                subsidy_spending = EXCLUDED.subsidy_spending,
+                updated_at = CURRENT_TIMESTAMP;
+            """),
+            ('budget_balance', """
+            INSERT INTO budget_balance (year_id, surplus_deficit, status)
+            SELECT y.year_id, s.surplus_deficit, s.status
+            FROM stage_budget_balance s JOIN years y ON y.year_persian = s.year_persian
+            ON CONFLICT (year_id) DO UPDATE SET
+                surplus_deficit = EXCLUDED.surplus_deficit,
+                status = EXCLUDED.status,
+                updated_at = CURRENT_TIMESTAMP;
+            """),
+        ]
+
+        try:
+            years = [year_data for _, year_data in sorted(data.items())]
+            logger.info(f"Bulk import: staging {len(years)} years with COPY...")
+
+            with self.connection.cursor() as cursor:
+                cursor.execute(staging_ddl)
+
+                self.copy_rows(cursor, 'stage_years',
+                               ['year_persian', 'year_gregorian', 'currency', 'data_source'],
+                               (self.year_values(y) for y in years))
+                self.copy_rows(cursor, 'stage_revenues',
+                               ['year_persian', 'total', 'tax_total', 'oil_gas', 'other',
+                                'tax_corporate', 'tax_individual', 'tax_payroll', 'tax_social_security'],
+                               ((y['year'],) + self.revenue_values(y['revenues'])
+                                for y in years if 'revenues' in y))
+                self.copy_rows(cursor, 'stage_expenditures',
+                               ['year_persian', 'total', 'current_exp', 'capital_exp',
+                                'unclassified', 'subsidy_spending'],
+                               ((y['year'],) + self.expenditure_values(y['expenditures'])
+                                for y in years if 'expenditures' in y))
+                self.copy_rows(cursor, 'stage_budget_balance',
+                               ['year_persian', 'surplus_deficit', 'status'],
+                               ((y['year'],) + self.balance_values(y['balance'])
+                                for y in years if 'balance' in y))
+
+                for table, query in upserts:
+                    cursor.execute(query)
+                    logger.info(f"  {table}: {cursor.rowcount} rows upserted")
+
+            # Commit all changes (also drops the staging tables)
+            self.connection.commit()
+            logger.info(f"✅ Successfully bulk-imported {len(years)} years")
+
+            # Refresh materialized rollups so API readers see the new data
+            if not self.refresh_materialized_views():
+                return False
+
+            # Validate data integrity
+            return self.validate_totals()
+
+        except Exception as e:
+            logger.error(f"❌ Bulk import failed: {e}")
+            self.connection.rollback()
+            return False
+
     def get_import_summary(self) -> Dict[str, Any]:
         """Get summary statistics of imported data"""
         queries = {
@@ -327,27 +543,23 @@ class BudgetDataImporter:
     def close_connection(self):
         """Close database connection"""
         if self.connection:
-            self.connection.close()
+            budget_db.release(self.connection, self.db_config)
+            self.connection = None
             logger.info("Database connection closed")
 
 def main():
     """Main import function"""
+    parser = argparse.ArgumentParser(description="Import Iran budget data into PostgreSQL")
+    parser.add_argument('database', nargs='?', help='Database name (default: $DB_NAME or iran_budget)')
+    parser.add_argument('--bulk', action='store_true',
+                        help='Stage all years with COPY and upsert each table in one statement')
+    args = parser.parse_args()
+
     print("🗄️  Iran Budget Database Import Tool")
     print("=" * 50)
 
-    # Database configuration - adjust as needed
-    import getpass
-    db_config = {
-        'host': 'localhost',
-        'database': 'iran_budget',
-        'user': getpass.getuser(),  # Use current system user
-        'password': '',  # set password if required
-        'port': 5432
-    }
-
-    # Allow command line override of database name
-    if len(sys.argv) > 1:
-        db_config['database'] = sys.argv[1]
+    # Database configuration from DB_HOST/DB_NAME/DB_USER/... (see budget_db.py)
+    db_config = budget_db.db_config(database=args.database)
 
     importer = BudgetDataImporter(db_config)
 
@@ -363,7 +575,10 @@ def main():
             sys.exit(1)
 
         # Step 3: Import data
-        success = importer.import_all_data(data)
+        if args.bulk:
+            success = importer.bulk_import_all_data(data)
+        else:
+            success = importer.import_all_data(data)
 
         if success:
             # Step 4: Show summary
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Iran Budget Line Item Import Script
+
+Loads every row of data/raw/unverified/{revenues,expenses}{year}.csv into
+budget_line_items, with the LEVEL1-LEVEL6 hierarchy in budget_levels.
+Run after create_schema.sql, create_line_items_schema.sql and import_data.py
+(line items reference the years table).
+
+Files are streamed one at a time: each CSV is read through csv_cache,
+COPYed into a staging table, and dropped before the next one is read.
+The hierarchy is then upserted and the fact rows inserted with set-based SQL.
+Re-running replaces the rows of every (year, kind) that was loaded.
+Subtotal rows are loaded too but flagged is_subtotal (budget_tree.subtotal_mask),
+so budget_level_totals sums each amount once.
+
+Usage:
+    python import_line_items.py [DATABASE] [--years 1400 1401 ...]
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import psycopg2
+
+import budget_db
+from budget_tree import row_paths, subtotal_mask
+from csv_cache import LEVEL_COLUMNS, RAW_DIR, load_csv
+from import_data import BudgetDataImporter, logger
+from numeric_ingest import DIGIT_TRANSLATION
+
+CSV_PATTERN = re.compile(r'^(revenues|expenses)(\d{4})\.csv$')
+KINDS = {'revenues': 'revenue', 'expenses': 'expense'}
+
+BUDGET_ROW = re.compile(r'ردیف شماره\s*(\d+)')
+
+STAGE_COLUMNS = [
+    'year_persian', 'kind', 'line_no',
+    'level1', 'level2', 'level3', 'level4', 'level5', 'level6',
+    'level_depth', 'tooltip', 'source', 'budget_row', 'source_url',
+    'sidebar1', 'sidebar2', 'sidebar3', 'amount', 'more_info', 'is_subtotal',
+]
+
+STAGING_DDL = """
+CREATE TEMP TABLE stage_line_items (
+    year_persian INTEGER, kind VARCHAR(10), line_no INTEGER,
+    level1 TEXT, level2 TEXT, level3 TEXT, level4 TEXT, level5 TEXT, level6 TEXT,
+    level_depth SMALLINT, tooltip TEXT, source TEXT, budget_row BIGINT, source_url TEXT,
+    sidebar1 DECIMAL(20, 3), sidebar2 DECIMAL(20, 3), sidebar3 DECIMAL(20, 3),
+    amount DECIMAL(20, 3), more_info TEXT, is_subtotal BOOLEAN,
+    -- Leading non-NULL levels, as budget_tree.row_paths
+    path TEXT[] GENERATED ALWAYS AS (
+        (ARRAY[level1, level2, level3, level4, level5, level6])[1:COALESCE(
+            array_position(ARRAY[level1, level2, level3, level4, level5, level6], NULL) - 1, 6)]
+    ) STORED
+) ON COMMIT DROP;
+"""
+
+# Parents are inserted before children so parent_id always resolves
+INSERT_LEVELS = """
+INSERT INTO budget_levels (parent_id, depth, name, path)
+SELECT DISTINCT p.level_id, %(depth)s, s.path[%(depth)s], s.path[1:%(depth)s]
+FROM stage_line_items s
+LEFT JOIN budget_levels p ON p.path = s.path[1:%(depth)s - 1]
+WHERE cardinality(s.path) >= %(depth)s
+ON CONFLICT (path) DO NOTHING;
+"""
+
+DELETE_LOADED = """
+DELETE FROM budget_line_items li
+USING (SELECT DISTINCT year_persian, kind FROM stage_line_items) s, years y
+WHERE y.year_persian = s.year_persian
+  AND li.year_id = y.year_id
+  AND li.kind = s.kind;
+"""
+
+INSERT_LINE_ITEMS = """
+INSERT INTO budget_line_items (
+    year_id, kind, line_no, level_id, level_depth, tooltip, source, budget_row,
+    source_url, sidebar1, sidebar2, sidebar3, amount, more_info, is_subtotal
+)
+SELECT y.year_id, s.kind, s.line_no, l.level_id, s.level_depth, s.tooltip, s.source,
+       s.budget_row, s.source_url, s.sidebar1, s.sidebar2, s.sidebar3, s.amount, s.more_info,
+       s.is_subtotal
+FROM stage_line_items s
+JOIN years y ON y.year_persian = s.year_persian
+LEFT JOIN budget_levels l ON l.path = s.path;
+"""
+
+
+def find_budget_csvs(raw_dir: str = RAW_DIR,
+                     years: Optional[List[int]] = None) -> List[Tuple[str, str, int]]:
+    """Return (path, kind, year) for every revenues/expenses CSV in raw_dir"""
+    found = []
+    for path in sorted(glob.glob(os.path.join(raw_dir, '*.csv'))):
+        match = CSV_PATTERN.match(os.path.basename(path))
+        if not match:
+            continue
+        year = int(match.group(2))
+        if years and year not in years:
+            continue
+        found.append((path, KINDS[match.group(1)], year))
+    return found
+
+
+def text_column(df: pd.DataFrame, column: str) -> pd.Series:
+    """Column as stripped strings with blanks as None (missing columns all None)"""
+    if column not in df.columns:
+        return pd.Series(None, index=df.index, dtype=object)
+    values = df[column].astype(object)
+    text = values.where(values.notna(), None).map(
+        lambda value: str(value).strip() if value is not None else None)
+    return text.where(text != '', None)
+
+
+def line_item_rows(df: pd.DataFrame, kind: str, year: int) -> Iterator[Tuple[Any, ...]]:
+    """
+    Yield staging rows (in STAGE_COLUMNS order) for one parsed CSV.
+
+    Args:
+        df: Output of csv_cache.load_csv()
+        kind: 'revenue' or 'expense'
+        year: Persian year; its column holds the amounts
+
+    Returns:
+        Iterator of tuples ready for copy_rows()
+    """
+    amount_col = str(year)
+    levels = [text_column(df, col) for col in LEVEL_COLUMNS]
+    source = text_column(df, 'SOURCE')
+    budget_row = (source.dropna().str.translate(DIGIT_TRANSLATION)
+                  .str.extract(BUDGET_ROW, expand=False)
+                  .reindex(df.index))
+
+    def numbers(column):
+        if column not in df.columns:
+            return pd.Series(None, index=df.index, dtype=object)
+        return df[column].astype(object).where(df[column].notna(), None)
+
+    def depths():
+        if 'LEVEL' not in df.columns:
+            return pd.Series(None, index=df.index, dtype=object)
+        values = pd.to_numeric(df['LEVEL'], errors='coerce')
+        return values.astype('Int64').astype(object).where(values.notna(), None)
+
+    columns = [
+        *levels,
+        depths(),
+        text_column(df, 'TOOLTIP'),
+        source,
+        budget_row.astype(object).where(budget_row.notna(), None),
+        text_column(df, 'SOURCE URL'),
+        numbers('SIDEBAR1'),
+        numbers('SIDEBAR2'),
+        numbers('SIDEBAR3'),
+        numbers(amount_col),
+        text_column(df, 'MORE INFO'),
+        subtotal_mask(df, row_paths(df)),
+    ]
+
+    for line_no, values in enumerate(zip(*columns), start=1):
+        yield (year, kind, line_no) + values
+
+
+class LineItemImporter(BudgetDataImporter):
+    """Loads raw budget CSV rows; reuses the connection and COPY helpers"""
+
+    def import_line_items(self, files: List[Tuple[str, str, int]]) -> bool:
+        """
+        Stage every file with COPY, then upsert the hierarchy and replace the
+        line items of each loaded (year, kind) in one transaction.
+        """
+        expected: Dict[Tuple[int, str], Tuple[int, float, float]] = {}
+
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(STAGING_DDL)
+
+                for path, kind, year in files:
+                    df = load_csv(path)
+                    if 'LEVEL1' not in df.columns or str(year) not in df.columns:
+                        logger.warning(f"⚠️  Skipping {os.path.basename(path)}: no LEVEL1/{year} columns")
+                        continue
+
+                    copied = self.copy_rows(cursor, 'stage_line_items', STAGE_COLUMNS,
+                                            line_item_rows(df, kind, year))
+                    amounts = pd.to_numeric(df[str(year)], errors='coerce')
+                    leaves = ~pd.Series(subtotal_mask(df, row_paths(df)), index=df.index, dtype=bool)
+                    expected[(year, kind)] = (copied, float(amounts.sum()), float(amounts[leaves].sum()))
+                    logger.info(f"  {os.path.basename(path):<20} {copied:>6} rows staged")
+                    del df
+
+                if not expected:
+                    logger.error("❌ No line item CSVs found")
+                    self.connection.rollback()
+                    return False
+
+                cursor.execute("""
+                    SELECT DISTINCT s.year_persian FROM stage_line_items s
+                    LEFT JOIN years y ON y.year_persian = s.year_persian
+                    WHERE y.year_id IS NULL ORDER BY 1;
+                """)
+                missing = [row[0] for row in cursor.fetchall()]
+                if missing:
+                    logger.warning(f"⚠️  Years not in the years table (run import_data.py first): {missing}")
+
+                cursor.execute("SELECT COUNT(*) FROM stage_line_items WHERE cardinality(path) = 0;")
+                no_level = cursor.fetchone()[0]
+                if no_level:
+                    logger.info(f"  {no_level} rows have no LEVEL values (file totals); loaded without a level")
+                cursor.execute("SELECT COUNT(*) FROM stage_line_items WHERE is_subtotal;")
+                logger.info(f"  {cursor.fetchone()[0]} subtotal rows flagged (excluded from budget_level_totals)")
+
+                levels_added = 0
+                for depth in range(1, len(LEVEL_COLUMNS) + 1):
+                    cursor.execute(INSERT_LEVELS, {'depth': depth})
+                    levels_added += cursor.rowcount
+                logger.info(f"  budget_levels: {levels_added} new nodes")
+
+                cursor.execute(DELETE_LOADED)
+                logger.info(f"  budget_line_items: {cursor.rowcount} old rows replaced")
+                cursor.execute(INSERT_LINE_ITEMS)
+                logger.info(f"  budget_line_items: {cursor.rowcount} rows inserted")
+
+            # Commit all changes (also drops the staging table)
+            self.connection.commit()
+
+        except Exception as e:
+            logger.error(f"❌ Line item import failed: {e}")
+            self.connection.rollback()
+            return False
+
+        return self.validate_line_items(expected, skip_years=set(missing))
+
+    def validate_line_items(self, expected: Dict[Tuple[int, str], Tuple[int, float, float]],
+                            skip_years=frozenset()) -> bool:
+        """
+        Compare row counts and amount sums per (year, kind) with the CSVs:
+        all rows against the raw column sum, non-subtotal rows against the
+        BudgetTree leaf total that budget_level_totals should add up to.
+        """
+        logger.info("Validating line items against the source CSVs...")
+
+        with self.connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT y.year_persian, li.kind, COUNT(*), COALESCE(SUM(li.amount), 0),
+                       COALESCE(SUM(li.amount) FILTER (WHERE NOT li.is_subtotal), 0)
+                FROM budget_line_items li JOIN years y ON y.year_id = li.year_id
+                GROUP BY y.year_persian, li.kind;
+            """)
+            loaded = {(year, kind): (count, float(total), float(leaves))
+                      for year, kind, count, total, leaves in cursor.fetchall()}
+
+        ok = True
+        for (year, kind), (rows, total, leaf_total) in sorted(expected.items()):
+            if year in skip_years:
+                continue
+            count, db_total, db_leaves = loaded.get((year, kind), (0, 0.0, 0.0))
+            if count != rows or abs(db_total - total) > 0.01:
+                logger.error(f"❌ {kind} {year}: {count}/{rows} rows, "
+                             f"{db_total:,.2f} vs CSV {total:,.2f}")
+                ok = False
+            elif abs(db_leaves - leaf_total) > 0.01:
+                logger.error(f"❌ {kind} {year}: line items (no subtotals) "
+                             f"{db_leaves:,.2f} vs CSV {leaf_total:,.2f}")
+                ok = False
+
+        if ok:
+            logger.info("✅ Line item totals match the source CSVs")
+        return ok
+
+
+def main():
+    """Main import function"""
+    parser = argparse.ArgumentParser(description="Import raw budget CSV line items into PostgreSQL")
+    parser.add_argument('database', nargs='?', help='Database name (default: $DB_NAME or iran_budget)')
+    parser.add_argument('--years', type=int, nargs='+', help='Only load these years')
+    parser.add_argument('--raw-dir', default=RAW_DIR, help=f'CSV directory (default: {RAW_DIR})')
+    args = parser.parse_args()
+
+    print("🗄️  Iran Budget Line Item Import")
+    print("=" * 50)
+
+    files = find_budget_csvs(args.raw_dir, args.years)
+    if not files:
+        logger.error(f"❌ No revenues/expenses CSVs in {args.raw_dir}")
+        sys.exit(1)
+
+    # Database configuration from DB_HOST/DB_NAME/DB_USER/... (see budget_db.py)
+    db_config = budget_db.db_config(database=args.database)
+
+    importer = LineItemImporter(db_config)
+
+    try:
+        if not importer.connect_to_database():
+            sys.exit(1)
+
+        logger.info(f"Loading {len(files)} CSV files...")
+        if not importer.import_line_items(files):
+            sys.exit(1)
+
+        print("\n🎉 Line item import completed successfully!")
+
+    except psycopg2.Error as e:
+        logger.error(f"❌ Database error: {e}")
+        sys.exit(1)
+    finally:
+        importer.close_connection()
+
+
+if __name__ == "__main__":
+    main()
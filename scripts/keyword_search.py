@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Keyword Search - Single-pass multi-keyword matcher for budget law texts
+
+The text scripts used to build one `.{0,300}keyword.{0,500}` regex per
+keyword and run each over the whole document. KeywordSearch compiles all
+keywords into one Aho-Corasick automaton and finds every hit of every
+keyword in a single pass.
+
+A keyword may contain `.*` gaps ('هزینه.*جاری'). Each literal part is
+matched by the automaton, and a hit needs the parts in order with at most
+max_gap characters between them. An unbounded gap would span the whole
+document. Matching uses rtf_text.fold (yeh/kaf variants, digit forms,
+case and whitespace); neither a part nor a gap crosses a line break.
+
+Scripts search through rtf_text.KeywordIndex, which runs this automaton
+for finditer()/search() and adds context windows and budget numbers:
+
+    from rtf_text import KeywordIndex
+    findings = KeywordIndex.from_text(text).search(['منابع عمومی', 'هزینه.*جاری'], limit=3)
+"""
+
+from collections import deque, namedtuple
+
+from rtf_text import fold
+
+GAP = '.*'
+MAX_GAP = 60
+
+Hit = namedtuple('Hit', ['keyword', 'start', 'end'])
+
+
+class KeywordSearch:
+    """
+    Aho-Corasick automaton over the literal parts of a keyword list.
+
+    Usage:
+        engine = KeywordSearch(['جدول', 'منابع عمومي'])
+        for hit in engine.finditer(text):
+            print(hit.keyword, hit.start, hit.end)
+    """
+
+    def __init__(self, keywords, max_gap=None):
+        self.keywords = list(dict.fromkeys(keywords))
+        self.max_gap = MAX_GAP if max_gap is None else max_gap
+
+        # Literal parts of every keyword, e.g. 'هزینه.*جاری' -> ['هزینه', 'جاری']
+        self.parts = {}
+        for keyword in self.keywords:
+            parts = [fold(part) for part in keyword.split(GAP)]
+            if not all(parts):
+                raise ValueError(f"Keyword {keyword!r} has an empty part")
+            self.parts[keyword] = parts
+
+        # Trie: per state a dict char -> state; outputs are (keyword, part index)
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for keyword, parts in self.parts.items():
+            for index, part in enumerate(parts):
+                state = 0
+                for char in part:
+                    nxt = self.goto[state].get(char)
+                    if nxt is None:
+                        nxt = len(self.goto)
+                        self.goto[state][char] = nxt
+                        self.goto.append({})
+                        self.fail.append(0)
+                        self.out.append([])
+                    state = nxt
+                self.out[state].append((keyword, index))
+
+        # Failure links, breadth first; outputs of the fallback state are inherited
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(char, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def finditer(self, text):
+        """
+        Every keyword hit in text, in one pass.
+
+        Yields:
+            Hit: (keyword, start, end) in text positions, ordered by end
+        """
+        return self.finditer_folded(fold(text))
+
+    def finditer_folded(self, folded):
+        """finditer() over text that is already fold()ed (KeywordIndex keeps it)."""
+        goto, fail, out = self.goto, self.fail, self.out
+        parts = self.parts
+        max_gap = self.max_gap
+        # Gapped keywords: keyword -> [(start of the match, end of part i)]
+        progress = {keyword: [None] * len(p) for keyword, p in parts.items() if len(p) > 1}
+
+        state = 0
+        for position, char in enumerate(folded):
+            if char == '\n':
+                # Paragraph break: neither a part nor a gap continues past it
+                state = 0
+                for chain in progress.values():
+                    chain[:] = [None] * len(chain)
+                continue
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not out[state]:
+                continue
+            end = position + 1
+            for keyword, index in out[state]:
+                part_start = end - len(parts[keyword][index])
+                chain = progress.get(keyword)
+                if chain is None:
+                    yield Hit(keyword, part_start, end)
+                    continue
+                if index == 0:
+                    chain[0] = (part_start, end)
+                    continue
+                previous = chain[index - 1]
+                if previous is None or previous[1] > part_start or part_start - previous[1] > max_gap:
+                    continue
+                if index == len(chain) - 1:
+                    yield Hit(keyword, previous[0], end)
+                    chain[:] = [None] * len(chain)
+                else:
+                    chain[index] = (previous[0], end)
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Law HTML Index - Per-year index of the saved qavanin.ir budget law pages
+
+data/raw holds "print version" pages saved from qavanin.ir for the budget
+laws of 1400-1405 ("نسخه چاپی قانون بودجه سال 1404 كل كشور (بخش دوم).html").
+Each page is fed to an incremental HTML parser in fixed-size chunks, so
+a large saved page is never held in memory as one string. One pass
+collects:
+
+- table links: <a href="....gif"> whose text names a table, with the
+  table number ("جدول شماره (5)")
+- articles: text blocks starting with ماده / تبصره / بند, with the
+  blocks that follow them
+- inline numbers: parenthesized amounts "(000 /000 /371)" and the table
+  numbers each article refers to
+
+Pages are grouped by the budget year in their title into
+data/processed/budget_law_html_index.json. Every page entry keeps the
+page's SHA-256, and unchanged pages are reused on the next run. Indexing
+only some pages (page.html on the command line) replaces just their
+entries; the other years in the saved index are kept.
+
+Usage:
+    python law_html_index.py                    # index every saved page
+    python law_html_index.py --year 1404 --tables
+    python law_html_index.py page.html --rebuild
+
+From another script:
+    from law_html_index import parse_page
+    page = parse_page('../data/raw/نسخه چاپی قانون بودجه سال 1404 كل كشور (بخش دوم).html')
+    for table in page['tables']:
+        print(table['number'], table['url'])
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+from html.parser import HTMLParser
+
+from csv_cache import file_sha256, write_atomic
+from rtf_text import PAREN_NUMBER, normalize
+
+RAW_DIR = '../data/raw'
+PAGE_PATTERN = 'نسخه چاپی*.html'
+INDEX_PATH = '../data/processed/budget_law_html_index.json'
+INDEX_VERSION = 1
+CHUNK_SIZE = 64 * 1024
+
+# Elements that end a block of text
+BLOCK_TAGS = {
+    'p', 'div', 'br', 'li', 'tr', 'td', 'th', 'table', 'section', 'article',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'hr',
+}
+SKIP_TAGS = {'script', 'style', 'noscript', 'template'}
+
+# Matched against normalize()d text (Persian digits -> ASCII, ي -> ی)
+YEAR = re.compile(r'سال\s*(1[34][0-9]{2})')
+PART = re.compile(r'\((بخش [^)]+)\)')
+# The keyword must end there (optionally with the ezafe hamza): "بندر عباس" and
+# "بند‌های" are not articles
+ARTICLE_START = re.compile(r'(ماده|تبصره|بند)\u0654?(?![\w\u200c])\s*[-–(]?\s*([0-9]+|[^\s:.\-–)]+)?')
+TABLE_REF = re.compile(r'جدول\s*(?:شماره)?\s*[(\s]*([0-9]{1,3})(?![0-9])')
+WHITESPACE = re.compile(r'\s+')
+
+
+class LawPageParser(HTMLParser):
+    """
+    Incremental parser for one saved qavanin page.
+
+    Usage:
+        parser = LawPageParser()
+        for chunk in chunks:
+            parser.feed(chunk)
+        parser.close()
+        parser.title, parser.tables, parser.articles
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ''
+        self.tables = []
+        self.articles = []
+        self._skip = 0
+        self._in_title = False
+        self._text = []
+        self._link = None   # [href, text parts] of the open <a>
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        elif tag == 'title':
+            self._in_title = True
+        elif tag == 'a':
+            href = dict(attrs).get('href') or ''
+            if href.lower().split('?')[0].endswith('.gif'):
+                self._link = [href, []]
+        if tag in BLOCK_TAGS:
+            self._end_block()
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self._end_block()
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag == 'title':
+            self._in_title = False
+        elif tag == 'a' and self._link:
+            self._add_table_link(*self._link)
+            self._link = None
+        if tag in BLOCK_TAGS:
+            self._end_block()
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        if self._in_title:
+            self.title += data
+            return
+        if self._link:
+            self._link[1].append(data)
+        self._text.append(data)
+
+    def close(self):
+        super().close()
+        self._end_block()
+
+    def _add_table_link(self, url, parts):
+        text = WHITESPACE.sub(' ', ''.join(parts)).strip()
+        folded = normalize(text)
+        if 'جدول' not in folded:
+            return
+        match = TABLE_REF.search(folded)
+        self.tables.append({
+            'number': int(match.group(1)) if match else None,
+            'title': text,
+            'url': url,
+        })
+
+    def _end_block(self):
+        text = WHITESPACE.sub(' ', ''.join(self._text)).strip()
+        self._text.clear()
+        if not text:
+            return
+        folded = normalize(text)
+        start = ARTICLE_START.match(folded)
+        if start or not self.articles:
+            self.articles.append({
+                'heading': ' '.join(text.split()[:2]) if start else '',
+                'text': text,
+                'numbers': [],
+                'table_refs': [],
+            })
+        else:
+            self.articles[-1]['text'] += '\n' + text
+        article = self.articles[-1]
+        # Amounts only; "(5)" after a table word is a table number
+        article['numbers'].extend(number for number in PAREN_NUMBER.findall(text) if '/' in number)
+        for match in TABLE_REF.finditer(folded):
+            number = int(match.group(1))
+            if number not in article['table_refs']:
+                article['table_refs'].append(number)
+
+
+def parse_page(html_path, chunk_size=CHUNK_SIZE):
+    """
+    Parse one saved page incrementally.
+
+    Args:
+        html_path (str): Saved HTML page
+        chunk_size (int): Characters fed to the parser at a time
+
+    Returns:
+        dict: 'file', 'title', 'year', 'part', 'tables' and 'articles'
+    """
+    parser = LawPageParser()
+    with open(html_path, 'r', encoding='utf-8', errors='replace') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            parser.feed(chunk)
+    parser.close()
+
+    name = os.path.basename(html_path)
+    title = WHITESPACE.sub(' ', parser.title).strip()
+    heading = normalize(title or name)
+    year = YEAR.search(heading) or YEAR.search(normalize(name))
+    part = PART.search(heading)
+    return {
+        'file': name,
+        'title': title,
+        'year': int(year.group(1)) if year else None,
+        'part': part.group(1) if part else None,
+        'tables': parser.tables,
+        'articles': parser.articles,
+    }
+
+
+def load_index(path=INDEX_PATH):
+    """Saved index, or an empty one if missing, unreadable or outdated."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {'version': INDEX_VERSION, 'years': {}}
+    if index.get('version') != INDEX_VERSION:
+        return {'version': INDEX_VERSION, 'years': {}}
+    return index
+
+
+def save_index(index, path=INDEX_PATH):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_atomic(path, write)
+
+
+def build_index(html_paths=None, path=INDEX_PATH, rebuild=False, verbose=True):
+    """
+    Parse saved pages and group the results by budget year.
+
+    Pages whose SHA-256 matches the saved index are not parsed again. When
+    html_paths is given, only those pages' entries are replaced and every
+    other page of the saved index is kept; the default full scan keeps
+    only the pages still in data/raw.
+
+    Args:
+        html_paths (list, optional): Pages (default: every saved print page in data/raw)
+        path (str): Index JSON file
+        rebuild (bool): Parse every page even if unchanged
+        verbose (bool): Print one line per page
+
+    Returns:
+        dict: {'version', 'years': {year: {'pages': [page, ...]}}}
+    """
+    full_scan = html_paths is None
+    if full_scan:
+        html_paths = sorted(glob.glob(os.path.join(RAW_DIR, PAGE_PATTERN)))
+
+    previous = {}
+    for year in load_index(path)['years'].values():
+        for page in year['pages']:
+            previous[page['file']] = page
+
+    pages = {} if full_scan else dict(previous)
+    for html_path in html_paths:
+        sha = file_sha256(html_path)
+        page = previous.get(os.path.basename(html_path))
+        if page and page.get('sha256') == sha and not rebuild:
+            status = 'current'
+        else:
+            start = time.perf_counter()
+            page = {**parse_page(html_path), 'sha256': sha}
+            status = f'{time.perf_counter() - start:.2f}s'
+        pages[page['file']] = page
+        if verbose:
+            key = str(page['year']) if page['year'] else 'unknown'
+            print(f"  {key:<8} {len(page['tables']):>4} tables {len(page['articles']):>5} articles  "
+                  f"{status:<8} {page['file']}")
+
+    years = {}
+    for name in sorted(pages):
+        page = pages[name]
+        key = str(page['year']) if page['year'] else 'unknown'
+        years.setdefault(key, {'pages': []})['pages'].append(page)
+
+    index = {'version': INDEX_VERSION, 'years': dict(sorted(years.items()))}
+    save_index(index, path)
+    return index
+
+
+def year_tables(index, year):
+    """Table links of every page of one year, in page order."""
+    pages = index['years'].get(str(year), {}).get('pages', [])
+    return [table for page in pages for table in page['tables']]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index the saved qavanin.ir budget law pages")
+    parser.add_argument('pages', nargs='*', help='HTML pages (default: every saved print page in data/raw)')
+    parser.add_argument('--output', default=INDEX_PATH, help=f'Index file (default: {INDEX_PATH})')
+    parser.add_argument('--rebuild', action='store_true', help='Parse pages even if unchanged')
+    parser.add_argument('--year', type=int, help='Only print this year')
+    parser.add_argument('--tables', action='store_true', help='List the table links')
+    args = parser.parse_args(argv)
+
+    print("="*80)
+    print("BUDGET LAW HTML INDEX")
+    print("="*80)
+
+    if not args.pages and not glob.glob(os.path.join(RAW_DIR, PAGE_PATTERN)):
+        print(f"⚠️  No saved pages matching '{PAGE_PATTERN}' in {RAW_DIR}")
+        return 1
+
+    index = build_index(args.pages or None, args.output, args.rebuild)
+
+    print("-"*80)
+    for year, entry in index['years'].items():
+        if args.year and year != str(args.year):
+            continue
+        articles = sum(len(page['articles']) for page in entry['pages'])
+        numbers = sum(len(article['numbers']) for page in entry['pages'] for article in page['articles'])
+        tables = year_tables(index, year)
+        print(f"📅 {year}: {len(entry['pages'])} pages, {len(tables)} table links, "
+              f"{articles} articles, {numbers} amounts")
+        if args.tables:
+            for table in tables:
+                print(f"     {table['number'] if table['number'] is not None else '?':>3}  "
+                      f"{table['title'][:60]}  {table['url']}")
+
+    print("="*80)
+    print(f"✅ Saved {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
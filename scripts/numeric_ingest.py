@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Numeric Ingest - Shared number parsing for budget CSVs and tables
+Replaces the clean_number() copies that were applied cell by cell
+
+Amount columns are parsed by the CSV reader itself (thousands=','), and only
+columns that still come back as text go through a vectorized string path
+that understands:
+    - Persian (۰-۹) and Arabic-Indic (٠-٩) digits
+    - Arabic thousands (٬) and decimal (٫) separators
+    - Parenthesized negatives: (1,234.5) -> -1234.5
+Empty cells become 0.0. Cells that still cannot be parsed become NaN and
+are collected into one report instead of silently turning into 0.0.
+"""
+
+import numbers
+import re
+
+import pandas as pd
+
+# Year columns ('1399') and sidebar breakdowns hold the amounts
+AMOUNT_COLUMN = re.compile(r'^(\d{4}|SIDEBAR\d+)$')
+
+# Persian ۰-۹ and Arabic-Indic ٠-٩ digits -> ASCII
+DIGITS = {
+    **{chr(0x06F0 + i): str(i) for i in range(10)},
+    **{chr(0x0660 + i): str(i) for i in range(10)},
+}
+
+# Digits plus the Arabic yeh/kaf variants -> Persian letters. One character
+# for one, so offsets in translated text match the original.
+TEXT_TRANSLATION = str.maketrans({
+    **DIGITS,
+    'ي': 'ی',
+    'ى': 'ی',
+    'ك': 'ک',
+})
+
+DIGIT_TRANSLATION = str.maketrans({
+    **DIGITS,
+    '\u066C': '',    # Arabic thousands separator ٬
+    '\u066B': '.',   # Arabic decimal separator ٫
+    '\u2212': '-',   # Unicode minus sign
+    '\u200C': '',    # Zero-width non-joiner left over from copy/paste
+    ',': '',
+})
+
+PAREN_NEGATIVE = re.compile(r'^\((.*)\)$')
+
+
+class UnparsedCells:
+    """
+    Bulk report of cells that could not be parsed as numbers.
+
+    Usage:
+        report = UnparsedCells()
+        values = parse_numeric(df['1399'], report=report, column='1399')
+        report.print_summary('expenses1399.csv')
+    """
+
+    def __init__(self):
+        self.cells = []  # (column, row index, raw value)
+
+    @classmethod
+    def from_records(cls, records):
+        """Rebuild a report from to_records() output (e.g. cached metadata)."""
+        report = cls()
+        report.cells = [(r['column'], r['row'], r['value']) for r in records]
+        return report
+
+    def add(self, column, series):
+        for index, raw in series.items():
+            self.cells.append((column, index, raw))
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __bool__(self):
+        return bool(self.cells)
+
+    def to_records(self):
+        """Return the cells as JSON-serializable dicts."""
+        return [{'column': str(column),
+                 'row': int(index) if isinstance(index, numbers.Integral) else str(index),
+                 'value': str(raw)} for column, index, raw in self.cells]
+
+    def print_summary(self, source='', limit=10):
+        """Print one grouped warning for all unparseable cells."""
+        if not self.cells:
+            return
+        where = f" in {source}" if source else ""
+        print(f"⚠️  {len(self.cells)} unparseable numeric cell(s){where}:")
+        for column, index, raw in self.cells[:limit]:
+            print(f"   column {column!s:<12} row {index!s:>6}: {raw!r}")
+        if len(self.cells) > limit:
+            print(f"   ... and {len(self.cells) - limit} more")
+
+
+def normalize_number_text(series):
+    """
+    Vectorized text normalization: Persian/Arabic digits and separators to
+    ASCII, thousands separators dropped, (x) rewritten as -x.
+
+    Args:
+        series (Series): Raw cell values
+
+    Returns:
+        Series: Normalized strings (NaN preserved)
+    """
+    text = series.astype('string').str.strip()
+    text = text.str.translate(DIGIT_TRANSLATION)
+    text = text.str.replace(PAREN_NEGATIVE, r'-\1', regex=True)
+    return text.str.replace(r'\s+', '', regex=True)
+
+
+def parse_numeric(series, report=None, column=None):
+    """
+    Parse a column of numbers in one vectorized pass.
+
+    Args:
+        series (Series): Raw values (numbers or strings)
+        report (UnparsedCells, optional): Collects cells that fail to parse
+        column (str, optional): Column name recorded in the report
+
+    Returns:
+        Series: float64 values; empty cells 0.0, unparseable cells NaN
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float).fillna(0.0)
+
+    text = normalize_number_text(series)
+    empty = text.isna() | (text == '')
+    values = pd.to_numeric(text.where(~empty), errors='coerce').astype(float)
+
+    unparsed = values.isna() & ~empty
+    if report is not None and unparsed.any():
+        report.add(column if column is not None else series.name, series[unparsed])
+
+    return values.mask(empty, 0.0)
+
+
+def parse_number(value, default=0.0):
+    """
+    Parse a single cell (e.g. one Excel value) with the same rules.
+
+    Args:
+        value: Number, string or NaN
+        default (float): Returned for empty or unparseable values
+
+    Returns:
+        float: Parsed number
+    """
+    if isinstance(value, (int, float)) and not pd.isna(value):
+        return float(value)
+    parsed = parse_numeric(pd.Series([value], dtype=object)).iloc[0]
+    return default if pd.isna(parsed) else float(parsed)
+
+
+def read_budget_csv(path, report=None, amount_column=AMOUNT_COLUMN):
+    """
+    Read a budget CSV with amount columns parsed to float.
+
+    The reader's own thousands/decimal handling covers ordinary cells; only
+    columns left as text fall back to parse_numeric().
+
+    Args:
+        path (str): CSV file path
+        report (UnparsedCells, optional): Collects unparseable cells
+        amount_column (re.Pattern): Matches names of amount columns
+
+    Returns:
+        DataFrame: Rows with amount columns as float64
+    """
+    df = pd.read_csv(path, thousands=',', decimal='.')
+
+    for col in df.columns:
+        if amount_column.match(str(col)):
+            df[col] = parse_numeric(df[col], report=report, column=col)
+
+    return df
@@ -6,35 +6,21 @@ Improved OCR with image preprocessing
 
 import os
 import subprocess
-from PIL import Image, ImageEnhance, ImageFilter
+from PIL import Image
 import pytesseract
 
+import ocr_batch
+
 def preprocess_image(image_path, output_path):
     """Preprocess image for better OCR"""
-    img = Image.open(image_path)
-    
-    # Convert to RGB if needed
-    if img.mode != 'RGB':
-        img = img.convert('RGB')
-    
-    # Resize to 2x for better OCR
-    width, height = img.size
-    img = img.resize((width * 2, height * 2), Image.Resampling.LANCZOS)
-    
-    # Convert to grayscale
-    img = img.convert('L')
-    
-    # Enhance contrast
-    enhancer = ImageEnhance.Contrast(img)
-    img = enhancer.enhance(2.0)
-    
-    # Sharpen
-    img = img.filter(ImageFilter.SHARPEN)
-    
+    # Same steps as the batch runner (2x upscale, contrast 2.0, sharpen),
+    # reused from the image cache when table5.gif has not changed
+    img = ocr_batch.preprocessed_image(image_path)
+
     # Save preprocessed image
     img.save(output_path)
     print(f"✅ Preprocessed image saved: {output_path}")
-    
+
     return output_path
 
 def ocr_with_pytesseract(image_path):
@@ -3,44 +3,43 @@
 """
 OCR extraction for 1404 budget tables
 Extracts data from GIF images to CSV format
+
+The priority tables are OCRed together on ocr_batch's process pool;
+unchanged images reuse their saved output.
 """
 
 import os
-import subprocess
 import re
 from PIL import Image
+import pytesseract
+
+from ocr_batch import run_batch
+
+# First look at the tables: no upscale or enhancement, --psm 6 (uniform block of text)
+RAW_OCR_SETTINGS = {'scale': 1, 'contrast': 1.0, 'sharpen': False, 'lang': 'fas+eng', 'psm': 6}
 
 def check_tesseract():
     """Check if Tesseract OCR is installed"""
     try:
-        result = subprocess.run(['tesseract', '--version'], 
-                              capture_output=True, text=True)
+        version = pytesseract.get_tesseract_version()
         print("✅ Tesseract installed:")
-        print(result.stdout.split('\n')[0])
+        print(f"tesseract {version}")
         return True
-    except FileNotFoundError:
+    except pytesseract.TesseractNotFoundError:
         print("❌ Tesseract NOT installed")
         print("\nInstall with:")
         print("  macOS: brew install tesseract tesseract-lang")
         print("  Ubuntu: sudo apt-get install tesseract-ocr tesseract-ocr-fas")
         return False
 
-def ocr_image(image_path, lang='fas+eng'):
-    """Run OCR on an image file"""
+def ocr_images(image_paths, output_dir='../data/processed', lang='fas+eng'):
+    """Run OCR on several image files in parallel; returns {path: text}"""
     try:
-        # Run tesseract
-        result = subprocess.run([
-            'tesseract', 
-            image_path, 
-            'stdout',
-            '-l', lang,
-            '--psm', '6'  # Assume uniform block of text
-        ], capture_output=True, text=True, encoding='utf-8')
-        
-        return result.stdout
+        return run_batch(image_paths, output_dir=output_dir,
+                         settings={**RAW_OCR_SETTINGS, 'lang': lang}, verbose=False)
     except Exception as e:
         print(f"Error running OCR: {e}")
-        return None
+        return {}
 
 def preview_table(gif_path):
     """Preview table dimensions and basic info"""
@@ -72,13 +71,18 @@ def main():
     print("PREVIEWING KEY TABLES")
     print("="*80)
     
+    found = []
     for table_name in priority_tables:
         table_path = os.path.join(gif_dir, table_name)
         if os.path.exists(table_path):
             preview_table(table_path)
+            found.append(table_path)
         else:
             print(f"⚠️  {table_name} not found")
     
+    # All priority tables in one parallel batch
+    texts = ocr_images(found)
+    
     print("\n" + "="*80)
     print("RUNNING OCR ON TABLE 5 (REVENUES)")
     print("="*80)
@@ -86,7 +90,7 @@ def main():
     table5_path = os.path.join(gif_dir, 'table5.gif')
     if os.path.exists(table5_path):
         print("\nExtracting text from table5.gif...")
-        text = ocr_image(table5_path)
+        text = texts.get(table5_path)
         
         if text:
             # Save raw OCR output
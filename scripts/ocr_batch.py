@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR Batch - Preprocess and OCR the 1404 table GIFs on a process pool
+
+Each image is upscaled, converted to grayscale, contrast-enhanced and
+sharpened by ocr_preprocess (NumPy engine by default), then passed to
+Tesseract (fas+eng). Preprocessed images are kept in ocr_image_cache,
+so only new images or new preprocessing settings pay for that step.
+Images are handled by a bounded pool of worker processes, each running
+Tesseract single-threaded so workers do not compete for cores.
+
+Every output text file is written atomically and recorded in
+ocr_manifest.json with the source image's SHA-256 and the preprocessing
+and OCR settings. An image is skipped when its output exists and the
+manifest entry still matches, so after tweaking --scale or --contrast
+every image is re-OCRed, and a plain re-run OCRs nothing.
+
+Usage:
+    python ocr_batch.py                                # all GIFs in data/raw/1404gifs
+    python ocr_batch.py --scale 3 --contrast 2.5 --sharpness 2.0
+    python ocr_batch.py ../data/raw/1404gifs/table5.gif --force --jobs 2
+
+From another script:
+    from ocr_batch import run_batch
+    texts = run_batch(['../data/raw/1404gifs/table1.gif'], output_dir='../data/processed')
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pytesseract
+
+from csv_cache import file_sha256, write_atomic
+from ocr_image_cache import ImageCache
+from ocr_preprocess import PREPROCESS_DEFAULTS, preprocess
+
+GIF_DIR = '../data/raw/1404gifs'
+OUTPUT_DIR = '../data/processed/ocr_1404'
+MANIFEST_NAME = 'ocr_manifest.json'
+OUTPUT_SUFFIX = '_ocr.txt'
+
+# Preprocessing of ocr_1404_improved.py; extract_1404_summary_tables.py
+# uses scale=3, contrast=2.5, sharpness=2.0, sharpen=False
+DEFAULT_SETTINGS = {
+    **PREPROCESS_DEFAULTS,
+    'lang': 'fas+eng',
+    'psm': 6,            # Assume uniform block of text
+}
+
+
+def settings_key(settings):
+    """Short stable hash of preprocessing/OCR settings and the Tesseract version."""
+    payload = json.dumps({'settings': settings, 'tesseract': str(pytesseract.get_tesseract_version())},
+                         sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+
+def preprocess_image(image_path, settings=None, timings=None):
+    """
+    Load an image and prepare it for OCR (see ocr_preprocess).
+
+    Args:
+        image_path (str): Image file path
+        settings (dict, optional): See DEFAULT_SETTINGS
+        timings (dict, optional): Filled with seconds per preprocessing step
+
+    Returns:
+        PIL.Image: Grayscale, upscaled and enhanced image
+    """
+    return preprocess(image_path, {**DEFAULT_SETTINGS, **(settings or {})}, timings)
+
+
+def preprocessed_image(image_path, settings=None, cache=None):
+    """
+    preprocess_image() through the preprocessed image cache.
+
+    Args:
+        image_path (str): Image file path
+        settings (dict, optional): See DEFAULT_SETTINGS
+        cache (ImageCache or False, optional): Cache to use (default:
+            ImageCache()); False disables caching
+
+    Returns:
+        PIL.Image: Preprocessed image
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    if cache is False:
+        return preprocess_image(image_path, settings)
+
+    cache = cache or ImageCache()
+    source_sha = file_sha256(image_path)
+    img = cache.get(source_sha, settings)
+    if img is None:
+        img = preprocess_image(image_path, settings)
+        cache.put(source_sha, settings, img)
+    return img
+
+
+def ocr_image(image_path, settings=None, cache=None):
+    """Preprocess one image (cached) and return its OCR text."""
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    img = preprocessed_image(image_path, settings, cache)
+    return pytesseract.image_to_string(img, lang=settings['lang'], config=f"--psm {settings['psm']}")
+
+
+def output_path(image_path, output_dir=OUTPUT_DIR):
+    """OCR text file of an image, e.g. table5.gif -> table5_ocr.txt."""
+    stem = os.path.splitext(os.path.basename(image_path))[0]
+    return os.path.join(output_dir, stem + OUTPUT_SUFFIX)
+
+
+def load_manifest(output_dir=OUTPUT_DIR):
+    """{output file name: {'source_sha256', 'settings_key'}} of earlier runs."""
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, output_dir=OUTPUT_DIR):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    write_atomic(os.path.join(output_dir, MANIFEST_NAME), write)
+
+
+def init_worker():
+    """ProcessPoolExecutor initializer: one Tesseract thread per worker, the pool provides the parallelism."""
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+
+
+def _ocr_task(args):
+    image_path, out_path, settings, cache = args
+    start = time.perf_counter()
+    text = ocr_image(image_path, settings, cache)
+
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    write_atomic(out_path, write)
+    return image_path, time.perf_counter() - start
+
+
+def run_batch(image_paths=None, output_dir=OUTPUT_DIR, settings=None, jobs=None, force=False, verbose=True,
+              cache=None):
+    """
+    OCR many images in parallel, skipping those whose output is current.
+
+    Args:
+        image_paths (list, optional): Images (default: every GIF in data/raw/1404gifs)
+        output_dir (str): Directory for {name}_ocr.txt files and the manifest
+        settings (dict, optional): Overrides of DEFAULT_SETTINGS
+        jobs (int, optional): Worker processes (default: CPU count)
+        force (bool): OCR every image even if its output is current
+        verbose (bool): Print one line per image
+        cache (ImageCache or False, optional): Preprocessed image cache
+            (default: ImageCache()); False disables it
+
+    Returns:
+        dict: {image path: OCR text} for every requested image
+    """
+    if image_paths is None:
+        image_paths = sorted(glob.glob(os.path.join(GIF_DIR, '*.gif')))
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    jobs = jobs or os.cpu_count() or 1
+    key = settings_key(settings)
+    if cache is None:
+        cache = ImageCache()
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir)
+
+    tasks = []
+    for image_path in image_paths:
+        out_path = output_path(image_path, output_dir)
+        expected = {'source_sha256': file_sha256(image_path), 'settings_key': key}
+        name = os.path.basename(out_path)
+        if not force and os.path.exists(out_path) and manifest.get(name) == expected:
+            if verbose:
+                print(f"  ⏭️  {os.path.basename(image_path):<20} current")
+            continue
+        manifest.pop(name, None)
+        tasks.append(((image_path, out_path, settings, cache), name, expected))
+
+    failed = 0
+    if tasks:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks)), initializer=init_worker) as executor:
+            futures = {executor.submit(_ocr_task, task): (task, name, expected)
+                       for task, name, expected in tasks}
+            for future in as_completed(futures):
+                (image_path, _, _, _), name, expected = futures[future]
+                try:
+                    _, elapsed = future.result()
+                except Exception as e:
+                    print(f"  ❌ {os.path.basename(image_path):<20} {e}")
+                    failed += 1
+                    continue
+                manifest[name] = expected
+                if verbose:
+                    print(f"  ✅ {os.path.basename(image_path):<20} {elapsed:>6.1f}s")
+
+    save_manifest(manifest, output_dir)
+    if cache and tasks:
+        cache.evict()
+    if failed:
+        raise RuntimeError(f"OCR failed for {failed} of {len(image_paths)} images")
+
+    texts = {}
+    for image_path in image_paths:
+        with open(output_path(image_path, output_dir), 'r', encoding='utf-8') as f:
+            texts[image_path] = f.read()
+    return texts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OCR the 1404 table GIFs in parallel")
+    parser.add_argument('images', nargs='*', help='Images (default: every GIF in data/raw/1404gifs)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help=f'Output directory (default: {OUTPUT_DIR})')
+    parser.add_argument('--engine', choices=('numpy', 'pil'), default=DEFAULT_SETTINGS['engine'],
+                        help='Preprocessing engine')
+    parser.add_argument('--scale', type=int, default=DEFAULT_SETTINGS['scale'], help='Upscale factor')
+    parser.add_argument('--contrast', type=float, default=DEFAULT_SETTINGS['contrast'], help='Contrast factor')
+    parser.add_argument('--sharpness', type=float, default=DEFAULT_SETTINGS['sharpness'],
+                        help='Sharpness factor (default: off)')
+    parser.add_argument('--no-sharpen', action='store_true', help='Skip the SHARPEN filter')
+    parser.add_argument('--threshold-block', type=int, help='Adaptive threshold window (default: off)')
+    parser.add_argument('--threshold-offset', type=float, default=DEFAULT_SETTINGS['threshold_offset'],
+                        help='Adaptive threshold offset')
+    parser.add_argument('--lang', default=DEFAULT_SETTINGS['lang'], help='Tesseract languages')
+    parser.add_argument('--psm', type=int, default=DEFAULT_SETTINGS['psm'], help='Tesseract page segmentation mode')
+    parser.add_argument('--force', action='store_true', help='Re-OCR images whose output is current')
+    parser.add_argument('--no-image-cache', action='store_true',
+                        help='Preprocess every image instead of using the image cache')
+    args = parser.parse_args(argv)
+
+    settings = {
+        'engine': args.engine,
+        'scale': args.scale,
+        'contrast': args.contrast,
+        'sharpness': args.sharpness,
+        'sharpen': not args.no_sharpen,
+        'threshold_block': args.threshold_block,
+        'threshold_offset': args.threshold_offset,
+        'lang': args.lang,
+        'psm': args.psm,
+    }
+
+    print("="*80)
+    print(f"1404 TABLE OCR ({args.jobs} jobs)")
+    print("="*80)
+
+    start = time.perf_counter()
+    try:
+        texts = run_batch(args.images or None, args.output_dir, settings, args.jobs, args.force,
+                          cache=False if args.no_image_cache else None)
+    except (RuntimeError, pytesseract.TesseractNotFoundError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    print("="*80)
+    print(f"✅ {len(texts)} images in {time.perf_counter() - start:.1f}s -> {args.output_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR Image Cache - Content-addressed cache of preprocessed OCR images
+
+The ocr_preprocess pass (upscale/grayscale/contrast/sharpen/threshold)
+is stored as a PNG keyed by (source image SHA-256, preprocessing settings,
+Pillow version). Changing only Tesseract options (lang, psm) reuses the
+cached images, so OCR experiments pay only for Tesseract.
+
+Layout: data/cache/ocr_images/{sha256[:16]}-{settings}.png
+The cache is bounded by size; evict() removes least recently used images
+(by mtime, refreshed on every hit) until it fits.
+
+Usage:
+    python ocr_image_cache.py            # show cache size
+    python ocr_image_cache.py --clear    # delete all entries
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+
+import PIL
+from PIL import Image
+
+from csv_cache import write_atomic
+from ocr_preprocess import PREPROCESS_DEFAULTS
+
+CACHE_DIR = '../data/cache/ocr_images'
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+# Settings that change the preprocessed pixels; anything else (Tesseract
+# lang/psm) is ignored when keying
+PREPROCESS_SETTINGS = tuple(PREPROCESS_DEFAULTS)
+
+
+def preprocess_key(settings=None):
+    """Short stable hash of the preprocessing settings and the Pillow version."""
+    relevant = {name: (settings or {}).get(name) for name in PREPROCESS_SETTINGS}
+    payload = json.dumps({'settings': relevant, 'pillow': PIL.__version__}, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+
+class ImageCache:
+    """
+    Size-bounded on-disk cache of preprocessed images.
+
+    Usage:
+        cache = ImageCache()
+        sha = file_sha256(image_path)
+        img = cache.get(sha, settings)
+        if img is None:
+            img = preprocess_image(image_path, settings)
+            cache.put(sha, settings, img)
+        cache.evict()
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def path(self, source_sha, settings=None):
+        """PNG file of an entry (may not exist yet)."""
+        return os.path.join(self.cache_dir, f'{source_sha[:16]}-{preprocess_key(settings)}.png')
+
+    def get(self, source_sha, settings=None):
+        """
+        Look up a preprocessed image.
+
+        Returns:
+            PIL.Image or None: Fully loaded image on a hit
+        """
+        path = self.path(source_sha, settings)
+        try:
+            with Image.open(path) as img:
+                img.load()
+        except (OSError, ValueError):
+            return None
+        os.utime(path)  # mark as recently used for eviction
+        return img
+
+    def put(self, source_sha, settings, img):
+        """
+        Store a preprocessed image.
+
+        Returns:
+            str: Path of the cached PNG
+        """
+        path = self.path(source_sha, settings)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        write_atomic(path, lambda tmp_path: img.save(tmp_path, format='PNG'))
+        return path
+
+    def entries(self):
+        """(path, size, mtime) of every cached image."""
+        found = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return found
+        for name in names:
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            found.append((path, stat.st_size, stat.st_mtime))
+        return found
+
+    def size(self):
+        """Total bytes on disk."""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """
+        Delete least recently used images until the cache fits max_bytes.
+
+        Returns:
+            int: Number of files removed
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        """Delete every entry."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the preprocessed OCR image cache")
+    parser.add_argument('--clear', action='store_true', help='Delete all cache entries')
+    args = parser.parse_args()
+
+    cache = ImageCache()
+    if args.clear:
+        cache.clear()
+        print(f"🗑️  Cleared {CACHE_DIR}")
+        return
+
+    entries = cache.entries()
+    total = sum(size for _, size, _ in entries)
+    print(f"📦 {len(entries)} images, {total / 1024 / 1024:.1f} MB "
+          f"(limit {MAX_CACHE_BYTES / 1024 / 1024:.0f} MB) in {CACHE_DIR}")
+
+
+if __name__ == '__main__':
+    main()
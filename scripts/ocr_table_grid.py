@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR Table Grid - Table-structure-aware OCR for the 1404 table GIFs
+
+Instead of one flat `--psm 6` pass over the whole image, the ruling lines
+of the table are detected on the preprocessed image, cells spanning a
+missing line segment are merged (row/column spans), blank cells are
+skipped, and each remaining cell is OCRed on its own (`--psm 7`) on a
+process pool. The result keeps the table's shape:
+
+    grid = ocr_table('../data/raw/1404gifs/table5.gif')    # one column per grid column
+    rows = budget_rows(grid)                                # indexed by row code (110102, ...)
+
+Columns are numbered in reading order (right to left), so col_1 is the
+rightmost column - the row code column of the budget tables.
+
+Some summary tables (table2, table4) only rule their rows and outer frame.
+When no vertical rules are found inside the frame, the columns are split
+at whitespace gutters instead: runs of pixel columns with no ink in any
+row, at least GUTTER_SHARE of the table width wide.
+
+Usage:
+    python ocr_table_grid.py ../data/raw/1404gifs/table5.gif   # writes {name}_grid.csv
+    python ocr_table_grid.py --benchmark                       # grid vs flat OCR on every GIF
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytesseract
+from PIL import Image
+
+from extract_1404_summary_tables import extract_numbers_from_text
+from numeric_ingest import DIGIT_TRANSLATION, normalize_number_text, parse_numeric
+from ocr_batch import DEFAULT_SETTINGS, GIF_DIR, OUTPUT_DIR, init_worker, ocr_image, preprocessed_image
+
+# Pixels darker than this count as ink / ruling line
+DARK_LEVEL = 128
+# A horizontal line covers at least this share of the longest one; a
+# vertical line at least this share of the table height
+ROW_LINE_SHARE = 0.5
+COLUMN_LINE_SHARE = 0.3
+# A line segment between two cells must be this dark to separate them
+SEGMENT_SHARE = 0.6
+# Cells with less ink than this share of their area are blank
+MIN_INK_SHARE = 0.002
+# Without vertical rules, a blank vertical band at least this share of the
+# table width separates two columns (word gaps are far narrower)
+GUTTER_SHARE = 0.05
+
+CELL_CONFIG = '--psm 7'  # Treat the image as a single text line
+CELLS_PER_TASK = 16
+
+ROW_CODE = r'\d{5,6}'
+
+# Known values for measuring recall in the benchmark: the hand-entered
+# Table 5 workbook (code, title, total) and the codes that table5.gif covers
+GROUND_TRUTH = {
+    'table5.gif': {
+        'xlsx': '../data/processed/1404-table5.xlsx',
+        'first_code': 100000,
+        'last_code': 110202,
+    },
+}
+
+
+def _line_centers(indices, max_gap):
+    """Group sorted pixel indices into lines; return each line's (start, end)."""
+    lines = []
+    for index in indices:
+        if lines and index - lines[-1][1] <= max_gap:
+            lines[-1][1] = index
+        else:
+            lines.append([index, index])
+    return [(start, end) for start, end in lines]
+
+
+def _body_ink(dark, rows):
+    """Ink per pixel column inside the rows, leaving out the row lines themselves."""
+    ink = np.zeros(dark.shape[1], dtype=int)
+    for (_, upper), (lower, _) in zip(rows, rows[1:]):
+        ink += dark[upper + 1:lower].sum(axis=0)
+    return ink
+
+
+def gutter_columns(dark, rows, frame, max_gap):
+    """
+    Column separators of a table with no vertical rules inside its frame.
+
+    Args:
+        dark (ndarray): Boolean ink mask
+        rows (list): Row lines from detect_grid()
+        frame (tuple): (left, right) frame lines as (start, end) ranges
+        max_gap (int): Pixels next to the frame to ignore (line blur)
+
+    Returns:
+        list: (start, end) of every blank band between two inked columns,
+            left-to-right
+    """
+    left, right = frame[0][1] + 1 + max_gap, frame[1][0] - max_gap
+    inked = np.flatnonzero(_body_ink(dark, rows)[left:right]) + left
+    if len(inked) < 2:
+        return []
+    min_width = GUTTER_SHARE * (right - left)
+    gaps = np.flatnonzero(np.diff(inked) > min_width)
+    return [(int(inked[k]) + 1, int(inked[k + 1]) - 1) for k in gaps]
+
+
+def detect_grid(gray, scale=1):
+    """
+    Find the ruling lines of a table.
+
+    Args:
+        gray (ndarray): uint8 grayscale image
+        scale (int): Upscale factor of the image (line gaps grow with it)
+
+    Returns:
+        tuple: (row lines, column lines), each a list of (start, end)
+            pixel ranges, top-to-bottom and left-to-right; when only the
+            frame is ruled, whitespace gutters stand in for the column lines
+    """
+    dark = gray < DARK_LEVEL
+    max_gap = 2 * scale + 1
+
+    row_profile = dark.sum(axis=1)
+    rows = _line_centers(np.flatnonzero(row_profile >= ROW_LINE_SHARE * row_profile.max()), max_gap)
+    if len(rows) < 2:
+        return rows, []
+
+    top, bottom = rows[0][0], rows[-1][1]
+    column_profile = dark[top:bottom + 1].sum(axis=0)
+    columns = _line_centers(np.flatnonzero(column_profile >= COLUMN_LINE_SHARE * (bottom - top)), max_gap)
+    if len(columns) == 2:
+        columns = [columns[0], *gutter_columns(dark, rows, columns, max_gap), columns[1]]
+    return rows, columns
+
+
+def _segment_closed(dark, line, span, axis):
+    """True if the ruling line is drawn along span (between two cells)."""
+    start, end = line
+    lo, hi = span
+    if hi <= lo:
+        return True
+    if axis == 0:   # horizontal line: rows start..end, columns lo..hi
+        segment = dark[start:end + 1, lo:hi]
+    else:           # vertical line: columns start..end, rows lo..hi
+        segment = dark[lo:hi, start:end + 1].T
+    return segment.mean(axis=1).max() >= SEGMENT_SHARE
+
+
+def grid_regions(gray, rows, columns):
+    """
+    Merge grid cells that are not separated by a drawn line segment.
+
+    Whitespace gutters (column lines with no ink at all) always separate.
+
+    Args:
+        gray (ndarray): uint8 grayscale image
+        rows, columns (list): Line ranges from detect_grid()
+
+    Returns:
+        list: (row, column, row span, column span, box) per merged region,
+            where column 0 is the rightmost column and box is
+            (left, top, right, bottom) inside the ruling lines
+    """
+    dark = gray < DARK_LEVEL
+    n_rows, n_cols = len(rows) - 1, len(columns) - 1
+
+    def cell_x(j):   # column j counted from the right
+        k = n_cols - 1 - j
+        return columns[k][1] + 1, columns[k + 1][0]
+
+    def cell_y(i):
+        return rows[i][1] + 1, rows[i + 1][0]
+
+    def open_below(i, j):
+        return not _segment_closed(dark, rows[i + 1], cell_x(j), axis=0)
+
+    ink = _body_ink(dark, rows)
+    gutters = {k for k, (start, end) in enumerate(columns) if not ink[start:end + 1].any()}
+
+    def open_left(i, j):
+        k = n_cols - 1 - j
+        return k not in gutters and not _segment_closed(dark, columns[k], cell_y(i), axis=1)
+
+    owner = {}
+    regions = []
+    for i in range(n_rows):
+        for j in range(n_cols):
+            if (i, j) in owner:
+                continue
+            # Grow right-to-left along the row, then downwards while every
+            # cell of the row span is open below
+            col_span = 1
+            while j + col_span < n_cols and open_left(i, j + col_span - 1) \
+                    and (i, j + col_span) not in owner:
+                col_span += 1
+            row_span = 1
+            while i + row_span < n_rows and all(open_below(i + row_span - 1, j + c) for c in range(col_span)):
+                row_span += 1
+            for di in range(row_span):
+                for dj in range(col_span):
+                    owner[(i + di, j + dj)] = len(regions)
+
+            left = cell_x(j + col_span - 1)[0]
+            right = cell_x(j)[1]
+            top = cell_y(i)[0]
+            bottom = cell_y(i + row_span - 1)[1]
+            regions.append((i, j, row_span, col_span, (left, top, right, bottom)))
+    return regions
+
+
+def _crop(gray, box, margin):
+    left, top, right, bottom = box
+    return gray[top + margin:bottom - margin, left + margin:right - margin]
+
+
+def _ocr_cells(args):
+    crops, lang = args
+    return [pytesseract.image_to_string(Image.fromarray(crop), lang=lang, config=CELL_CONFIG).strip()
+            for crop in crops]
+
+
+def ocr_table(image_path, settings=None, jobs=None, cache=None, timings=None):
+    """
+    OCR a table image cell by cell.
+
+    Args:
+        image_path (str): Image file path
+        settings (dict, optional): Preprocessing/OCR settings (see ocr_batch)
+        jobs (int, optional): Worker processes (default: CPU count)
+        cache (ImageCache or False, optional): Preprocessed image cache
+        timings (dict, optional): Filled with seconds for 'preprocess',
+            'grid' and 'ocr'
+
+    Returns:
+        DataFrame: Cell text, one row per grid row and columns col_1..col_N
+            in reading order; a merged cell's text is in its first
+            (top-right) cell. attrs holds the cell counts.
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    jobs = jobs or os.cpu_count() or 1
+    timings = {} if timings is None else timings
+
+    start = time.perf_counter()
+    gray = np.asarray(preprocessed_image(image_path, settings, cache))
+    timings['preprocess'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rows, columns = detect_grid(gray, settings['scale'])
+    if len(rows) < 2 or len(columns) < 2:
+        raise ValueError(f"No table grid found in {image_path}")
+    regions = grid_regions(gray, rows, columns)
+
+    margin = 2 * settings['scale']
+    dark = gray < DARK_LEVEL
+    cells = []
+    for i, j, _, _, box in regions:
+        crop = _crop(gray, box, margin)
+        if crop.size and _crop(dark, box, margin).mean() >= MIN_INK_SHARE:
+            cells.append(((i, j), crop))
+    timings['grid'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    crops = [crop for _, crop in cells]
+    chunks = [(crops[k:k + CELLS_PER_TASK], settings['lang'])
+              for k in range(0, len(crops), CELLS_PER_TASK)]
+    if jobs == 1 or len(chunks) <= 1:
+        texts = [text for chunk in chunks for text in _ocr_cells(chunk)]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker) as executor:
+            texts = [text for chunk in executor.map(_ocr_cells, chunks) for text in chunk]
+    timings['ocr'] = time.perf_counter() - start
+
+    n_rows, n_cols = len(rows) - 1, len(columns) - 1
+    table = [[''] * n_cols for _ in range(n_rows)]
+    for ((i, j), _), text in zip(cells, texts):
+        table[i][j] = text
+
+    grid = pd.DataFrame(table, columns=[f'col_{j + 1}' for j in range(n_cols)])
+    grid.attrs = {'image': image_path, 'regions': len(regions), 'cells_ocred': len(cells)}
+    return grid
+
+
+def budget_rows(grid, report=None):
+    """
+    Keep the rows whose first column is a budget row code and parse the
+    amount columns.
+
+    Args:
+        grid (DataFrame): ocr_table() output
+        report (UnparsedCells, optional): Collects amount cells that fail to parse
+
+    Returns:
+        DataFrame: Indexed by row_code (int); 'title' from col_2, amounts
+            (float, NaN if unreadable) from col_3 onwards
+    """
+    codes = normalize_number_text(grid['col_1'])
+    is_code = codes.str.fullmatch(ROW_CODE).fillna(False).astype(bool)
+    rows = grid[is_code]
+
+    out = pd.DataFrame({'row_code': codes[is_code].astype(int)}, index=rows.index)
+    if 'col_2' in rows:
+        out['title'] = rows['col_2']
+    for column in rows.columns[2:]:
+        out[column] = parse_numeric(rows[column], report=report, column=column)
+    return out.set_index('row_code')
+
+
+def grid_numbers(grid):
+    """Every number read from the grid's cells (for recall comparisons)."""
+    values = pd.concat([parse_numeric(grid[column]) for column in grid.columns])
+    return {int(value) for value in values.dropna() if value >= 100}
+
+
+def flat_numbers(text):
+    """Numbers from flat OCR text, read the way extract_1404_summary_tables does."""
+    return {int(number.translate(DIGIT_TRANSLATION)) for number in extract_numbers_from_text(text)}
+
+
+def load_ground_truth(image_name):
+    """Known totals for an image as {row code: amount}, or None."""
+    spec = GROUND_TRUTH.get(image_name)
+    if not spec or not os.path.exists(spec['xlsx']):
+        return None
+    sheet = pd.read_excel(spec['xlsx'], header=None)
+    sheet = sheet[pd.to_numeric(sheet[0], errors='coerce').notna()]
+    codes = sheet[0].astype(int).tolist()
+    first, last = codes.index(spec['first_code']), codes.index(spec['last_code'])
+    truth = {}
+    for code, amount in zip(codes[first:last + 1], sheet[2].iloc[first:last + 1]):
+        if pd.notna(amount):
+            truth[code] = int(round(float(amount)))
+    return truth
+
+
+def benchmark(image_paths, settings=None, jobs=None):
+    """
+    Compare flat (--psm 6 + regex) and grid OCR on throughput and recall.
+
+    Preprocessed images come from the image cache for both methods, so the
+    timings compare the OCR strategies only.
+    """
+    print(f"  {'image':<16} {'flat s':>7} {'grid s':>7} {'flat #':>7} {'grid #':>7} "
+          f"{'cells':>6} {'flat rec':>9} {'grid rec':>9} {'aligned':>8}")
+    totals = {'flat': 0.0, 'grid': 0.0}
+    for image_path in image_paths:
+        name = os.path.basename(image_path)
+        preprocessed_image(image_path, settings)  # warm the image cache
+
+        start = time.perf_counter()
+        flat = flat_numbers(ocr_image(image_path, settings))
+        flat_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        try:
+            grid = ocr_table(image_path, settings, jobs)
+        except ValueError as e:
+            print(f"  {name:<16} ❌ {e}")
+            continue
+        grid_time = time.perf_counter() - start
+        found = grid_numbers(grid)
+        totals['flat'] += flat_time
+        totals['grid'] += grid_time
+
+        recall = ['', '', '']
+        truth = load_ground_truth(name)
+        if truth:
+            values = set(truth.values())
+            rows = budget_rows(grid)
+            total_column = rows.columns[-1] if len(rows.columns) > 1 else None
+            aligned = sum(1 for code, amount in truth.items()
+                          if total_column and code in rows.index
+                          and (rows.loc[[code], total_column] == amount).any())
+            recall = [f"{len(values & flat) / len(values):.0%}",
+                      f"{len(values & found) / len(values):.0%}",
+                      f"{aligned / len(truth):.0%}"]
+
+        print(f"  {name:<16} {flat_time:>7.1f} {grid_time:>7.1f} {len(flat):>7} {len(found):>7} "
+              f"{grid.attrs['cells_ocred']:>6} {recall[0]:>9} {recall[1]:>9} {recall[2]:>8}")
+
+    count = len(image_paths)
+    print("-"*80)
+    print(f"  flat: {totals['flat']:.1f}s ({count / totals['flat']:.2f} images/s)   "
+          f"grid: {totals['grid']:.1f}s ({count / totals['grid']:.2f} images/s)"
+          if totals['flat'] and totals['grid'] else "  no images processed")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grid-aware OCR of the 1404 table GIFs")
+    parser.add_argument('images', nargs='*', help='Images (default: every GIF in data/raw/1404gifs)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help=f'Output directory (default: {OUTPUT_DIR})')
+    parser.add_argument('--benchmark', action='store_true', help='Compare with flat OCR instead of writing CSVs')
+    args = parser.parse_args(argv)
+
+    images = args.images or sorted(glob.glob(os.path.join(GIF_DIR, '*.gif')))
+
+    print("="*80)
+    print(f"GRID OCR OF 1404 TABLES ({args.jobs} jobs)")
+    print("="*80)
+
+    try:
+        if args.benchmark:
+            benchmark(images, jobs=args.jobs)
+            print("="*80)
+            return 0
+
+        os.makedirs(args.output_dir, exist_ok=True)
+        for image_path in images:
+            timings = {}
+            try:
+                grid = ocr_table(image_path, jobs=args.jobs, timings=timings)
+            except ValueError as e:
+                print(f"  ❌ {e}")
+                continue
+            stem = os.path.splitext(os.path.basename(image_path))[0]
+            output_file = os.path.join(args.output_dir, f'{stem}_grid.csv')
+            grid.to_csv(output_file, index=False, encoding='utf-8-sig')
+            print(f"  ✅ {os.path.basename(image_path):<16} {grid.shape[0]:>3}x{grid.shape[1]:<3} "
+                  f"{grid.attrs['cells_ocred']:>4} cells  {sum(timings.values()):>6.1f}s  -> {output_file}")
+    except pytesseract.TesseractNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+
+    print("="*80)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
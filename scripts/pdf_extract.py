@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF Extract - Page-sharded pdfplumber table and text extraction
+
+Splits a PDF's pages into contiguous ranges and extracts each range in a
+worker process that opens the PDF itself (pdfplumber objects cannot be
+shared between processes). Results are merged back in page order; tables
+come out in the tables_extracted.json shape:
+    [{'page': 12, 'table_num': 1, 'rows': 40, 'cols': 6, 'data': [[...], ...]}, ...]
+
+Every page result goes through pdf_page_cache, so only pages that are not
+cached yet (for this PDF content and these settings) reach pdfplumber.
+
+Usage:
+    python pdf_extract.py                       # the budget law PDFs in data/raw
+    python pdf_extract.py ../data/raw/1402.pdf --jobs 4
+    python pdf_extract.py --no-cache            # ignore and skip the page cache
+
+From another script:
+    from pdf_extract import extract_tables, extract_text
+    tables = extract_tables('../data/raw/1402.pdf', jobs=4)
+    texts = extract_text('../data/raw/1402.pdf')   # [(page, text), ...]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pdfplumber
+
+from csv_cache import file_sha256
+from pdf_page_cache import PageCache
+
+RAW_DIR = '../data/raw'
+OUTPUT_DIR = '../output/pdf_tables'
+
+PDF_FILES = [
+    os.path.join(RAW_DIR, name)
+    for name in ('1399.pdf', '1401.pdf', '1402.pdf', 'state-companies.pdf')
+]
+
+# Ranges per worker: more, smaller shards even out pages of uneven cost
+SHARDS_PER_JOB = 4
+
+
+def page_count(pdf_path):
+    """Number of pages in a PDF."""
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def page_ranges(pages, jobs, shards_per_job=SHARDS_PER_JOB):
+    """
+    Split a sorted list of 1-based page numbers into contiguous shards.
+
+    Args:
+        pages (list): Page numbers to process
+        jobs (int): Worker processes
+        shards_per_job (int): Shards handed to each worker on average
+
+    Returns:
+        list: Lists of page numbers, in page order
+    """
+    if not pages:
+        return []
+    shard_count = max(1, min(len(pages), jobs * shards_per_job))
+    size = -(-len(pages) // shard_count)  # ceil division
+    return [pages[i:i + size] for i in range(0, len(pages), size)]
+
+
+def extract_page_tables(page, table_settings=None):
+    """All tables of one pdfplumber page (empty ones kept for numbering)."""
+    return page.extract_tables(table_settings or {})
+
+
+def extract_page_text(page, text_settings=None):
+    """Text of one pdfplumber page ('' for pages without text)."""
+    return page.extract_text(**(text_settings or {})) or ''
+
+
+EXTRACTORS = {
+    'tables': extract_page_tables,
+    'text': extract_page_text,
+}
+
+
+def _extract_pages(pdf, pages, kind, settings=None):
+    extract = EXTRACTORS[kind]
+    results = []
+    for page_num in pages:
+        page = pdf.pages[page_num - 1]
+        results.append((page_num, extract(page, settings)))
+        page.flush_cache()  # keep memory flat on long documents
+    return results
+
+
+def extract_page_range(pdf_path, pages, kind='tables', settings=None):
+    """
+    Open the PDF and extract tables or text from the given pages.
+
+    Args:
+        pdf_path (str): PDF file path
+        pages (list): 1-based page numbers
+        kind (str): 'tables' or 'text'
+        settings (dict, optional): pdfplumber table/text settings
+
+    Returns:
+        list: (page number, result) pairs in page order
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        return _extract_pages(pdf, pages, kind, settings)
+
+
+# Worker processes keep each PDF open across shards instead of re-parsing
+# the document structure for every range; closed when the pool shuts down
+_worker_pdfs = {}
+
+
+def _extract_shard(args):
+    pdf_path, pages, kind, settings = args
+    if pdf_path not in _worker_pdfs:
+        _worker_pdfs[pdf_path] = pdfplumber.open(pdf_path)
+    return _extract_pages(_worker_pdfs[pdf_path], pages, kind, settings)
+
+
+def extract_pages(pdf_path, kind='tables', pages=None, jobs=None, settings=None, cache=None):
+    """
+    Extract one kind of result for many pages, using the page cache and
+    worker processes for the pages that are not cached.
+
+    Args:
+        pdf_path (str): PDF file path
+        kind (str): 'tables' or 'text'
+        pages (list, optional): 1-based pages to read (default: all)
+        jobs (int, optional): Worker processes (default: CPU count)
+        settings (dict, optional): pdfplumber table/text settings
+        cache (PageCache or False, optional): Cache to use (default:
+            PageCache()); False disables caching
+
+    Returns:
+        list: (page number, result) pairs in page order
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if cache is None:
+        cache = PageCache()
+    pdf_sha = file_sha256(pdf_path) if cache else None
+
+    if pages is None:
+        total = cache.get_page_count(pdf_sha) if cache else None
+        if total is None:
+            total = page_count(pdf_path)
+            if cache:
+                cache.put_page_count(pdf_sha, total)
+        pages = list(range(1, total + 1))
+    else:
+        pages = sorted(set(pages))
+
+    results = {}
+    if cache:
+        for page_num in pages:
+            hit, value = cache.get(pdf_sha, page_num, kind, settings)
+            if hit:
+                results[page_num] = value
+    missing = [page_num for page_num in pages if page_num not in results]
+
+    shards = page_ranges(missing, jobs)
+    if len(shards) <= 1 or jobs == 1:
+        extracted = extract_page_range(pdf_path, missing, kind, settings) if missing else []
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            # map() yields in submission order, so pages stay in order
+            tasks = [(pdf_path, shard, kind, settings) for shard in shards]
+            extracted = [pair for shard in executor.map(_extract_shard, tasks) for pair in shard]
+
+    for page_num, value in extracted:
+        results[page_num] = value
+        if cache:
+            cache.put(pdf_sha, page_num, kind, value, settings)
+    if cache and extracted:
+        cache.evict()
+
+    return [(page_num, results[page_num]) for page_num in pages]
+
+
+def table_records(page_results):
+    """Flatten (page, tables) pairs into tables_extracted.json records."""
+    records = []
+    for page_num, tables in page_results:
+        for table_num, table in enumerate(tables, 1):
+            if not table:
+                continue
+            records.append({
+                'page': page_num,
+                'table_num': table_num,
+                'rows': len(table),
+                'cols': len(table[0]) if table and table[0] else 0,
+                'data': table,
+            })
+    return records
+
+
+def extract_tables(pdf_path, jobs=None, pages=None, table_settings=None, cache=None):
+    """
+    Extract every table from a PDF.
+
+    Args:
+        pdf_path (str): PDF file path
+        jobs (int, optional): Worker processes (default: CPU count)
+        pages (list, optional): 1-based pages to read (default: all)
+        table_settings (dict, optional): pdfplumber table settings
+        cache (PageCache or False, optional): See extract_pages()
+
+    Returns:
+        list: Table records in page order
+    """
+    return table_records(extract_pages(pdf_path, 'tables', pages, jobs, table_settings, cache))
+
+
+def extract_text(pdf_path, jobs=None, pages=None, text_settings=None, cache=None):
+    """
+    Extract the text of every page of a PDF.
+
+    Returns:
+        list: (page number, text) pairs in page order
+    """
+    return extract_pages(pdf_path, 'text', pages, jobs, text_settings, cache)
+
+
+def save_tables(tables, output_file):
+    """Write table records as tables_extracted.json."""
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(tables, f, ensure_ascii=False, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract tables from budget PDFs in parallel")
+    parser.add_argument('pdfs', nargs='*', default=PDF_FILES, help='PDF files (default: budget law PDFs)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help=f'Output directory (default: {OUTPUT_DIR})')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the page cache')
+    args = parser.parse_args(argv)
+
+    print("="*80)
+    print(f"EXTRACTING PDF TABLES ({args.jobs} jobs)")
+    print("="*80)
+
+    cache = False if args.no_cache else PageCache()
+    failed = 0
+    for pdf_path in args.pdfs:
+        name = os.path.splitext(os.path.basename(pdf_path))[0]
+        start = time.perf_counter()
+        try:
+            tables = extract_tables(pdf_path, jobs=args.jobs, cache=cache)
+        except Exception as e:
+            print(f"❌ {pdf_path}: {e}")
+            failed += 1
+            continue
+
+        output_file = os.path.join(args.output_dir, name, 'tables_extracted.json')
+        save_tables(tables, output_file)
+        elapsed = time.perf_counter() - start
+        print(f"  {os.path.basename(pdf_path):<24} {len(tables):>5} tables  {elapsed:>7.1f}s  -> {output_file}")
+
+    print("="*80)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
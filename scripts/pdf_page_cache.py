@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF Page Cache - Persistent per-page cache of pdfplumber text and tables
+
+Entries are keyed by (PDF SHA-256, page number, kind, extraction settings),
+where the settings key also covers the pdfplumber version. Editing a PDF
+or changing table settings therefore never serves stale results, and
+re-running a script after changing only its table-selection logic skips
+pdfplumber entirely.
+
+Layout: data/cache/pdf_pages/{sha256[:16]}/{page:04d}-{kind}-{settings}.json
+The cache is bounded by size; evict() removes least recently used entries
+(by mtime, refreshed on every hit) until it fits.
+
+Usage:
+    python pdf_page_cache.py            # show cache size
+    python pdf_page_cache.py --clear    # delete all entries
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+
+import pdfplumber
+
+from csv_cache import write_atomic
+
+CACHE_DIR = '../data/cache/pdf_pages'
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+KINDS = ('text', 'tables')
+
+
+def settings_key(settings=None):
+    """Short stable hash of extraction settings and the pdfplumber version."""
+    payload = json.dumps({'settings': settings or {}, 'pdfplumber': pdfplumber.__version__},
+                         sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+
+class PageCache:
+    """
+    Size-bounded on-disk cache of per-page extraction results.
+
+    Usage:
+        cache = PageCache()
+        sha = file_sha256(pdf_path)
+        hit, tables = cache.get(sha, 12, 'tables')
+        if not hit:
+            tables = page.extract_tables()
+            cache.put(sha, 12, 'tables', tables)
+        cache.evict()
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def _pdf_dir(self, pdf_sha):
+        return os.path.join(self.cache_dir, pdf_sha[:16])
+
+    def _entry_path(self, pdf_sha, page_num, kind, settings):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown kind {kind!r}; expected one of {KINDS}")
+        return os.path.join(self._pdf_dir(pdf_sha),
+                            f'{page_num:04d}-{kind}-{settings_key(settings)}.json')
+
+    def _read(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return False, None
+        os.utime(path)  # mark as recently used for eviction
+        return True, value
+
+    def _write(self, path, value):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        def write(tmp_path):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(value, f, ensure_ascii=False)
+        write_atomic(path, write)
+
+    def get(self, pdf_sha, page_num, kind, settings=None):
+        """
+        Look up one page.
+
+        Returns:
+            tuple: (hit, value); value is None on a miss
+        """
+        return self._read(self._entry_path(pdf_sha, page_num, kind, settings))
+
+    def put(self, pdf_sha, page_num, kind, value, settings=None):
+        """Store one page's extracted text or tables."""
+        self._write(self._entry_path(pdf_sha, page_num, kind, settings), value)
+
+    def get_page_count(self, pdf_sha):
+        """Cached page count of a PDF, or None."""
+        hit, meta = self._read(os.path.join(self._pdf_dir(pdf_sha), 'meta.json'))
+        return meta.get('pages') if hit else None
+
+    def put_page_count(self, pdf_sha, pages):
+        self._write(os.path.join(self._pdf_dir(pdf_sha), 'meta.json'), {'pages': pages})
+
+    def entries(self):
+        """(path, size, mtime) of every cached file."""
+        found = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                found.append((path, stat.st_size, stat.st_mtime))
+        return found
+
+    def size(self):
+        """Total bytes on disk."""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """
+        Delete least recently used entries until the cache fits max_bytes.
+
+        Returns:
+            int: Number of files removed
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        """Delete every entry."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the PDF page cache")
+    parser.add_argument('--clear', action='store_true', help='Delete all cache entries')
+    args = parser.parse_args()
+
+    cache = PageCache()
+    if args.clear:
+        cache.clear()
+        print(f"🗑️  Cleared {CACHE_DIR}")
+        return
+
+    entries = cache.entries()
+    total = sum(size for _, size, _ in entries)
+    print(f"📦 {len(entries)} entries, {total / 1024 / 1024:.1f} MB "
+          f"(limit {MAX_CACHE_BYTES / 1024 / 1024:.0f} MB) in {CACHE_DIR}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF Table Index - Page index of table numbers and titles in the budget PDFs
+
+One pass over a PDF's page text records, for every page, the table numbers
+it refers to ("جدول شماره (5) این قانون") and the table headings it
+starts ("جدول منابع", a line that opens with the table word without a
+number). The index is saved next to the PDF as
+{name}.table_index.json and rebuilt only when the PDF's SHA-256 changes,
+so finding Table 5 in 1402.pdf is a lookup instead of a full scan. The
+PDF's mtime/size at the last hash check go to an untracked stamp under
+data/cache/table_index/, so lookups never rewrite the committed index.
+
+pdfplumber returns these PDFs' Persian text in visual order ("لودج" for
+"جدول"), and 1399.pdf uses Arabic presentation forms; lines are
+normalized to logical order before matching.
+
+Usage:
+    python pdf_table_index.py                          # index every PDF in data/raw
+    python pdf_table_index.py ../data/raw/1402.pdf --find 5
+
+From another script:
+    from pdf_table_index import find_table
+    pages = find_table('../data/raw/1402.pdf', 5)      # [2, 3, 4, 6, ...]
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import unicodedata
+
+from csv_cache import file_sha256, write_atomic
+from numeric_ingest import TEXT_TRANSLATION
+from pdf_extract import extract_text
+
+RAW_DIR = '../data/raw'
+INDEX_SUFFIX = '.table_index.json'
+INDEX_VERSION = 1
+STAMP_DIR = '../data/cache/table_index'
+
+TABLE_WORD = 'جدول'
+VISUAL_TABLE_WORD = TABLE_WORD[::-1]
+
+CHAR_MAP = {**TEXT_TRANSLATION, ord('ـ'): None}  # also drop tatweel
+DIGIT_RUN = re.compile(r'[0-9][0-9,./%]*')
+
+# "جدول شماره (5)", "جدول شماره 5", "جدول (5)"; row codes such as
+# "جدول 210109" are not table numbers
+TABLE_REF = re.compile(r'جدول\s*(?:ش\s*م\s*ا\s*ر\s*ه)?[\s()]*([0-9]{1,2})(?![0-9,])')
+
+
+def logical_line(line):
+    """
+    Normalize one line of extracted text for matching.
+
+    Lines that carry the table word in visual order are reversed, with
+    digit runs restored to reading order. Brackets are left alone: the
+    PDFs disagree on whether they are mirrored, so matching ignores them.
+    """
+    line = unicodedata.normalize('NFKC', line).translate(CHAR_MAP)
+    if TABLE_WORD in line or VISUAL_TABLE_WORD not in line:
+        return line
+    line = line[::-1]
+    return DIGIT_RUN.sub(lambda match: match.group(0)[::-1], line)
+
+
+def index_page(text):
+    """
+    Table references and headings on one page.
+
+    Returns:
+        dict: {'numbers': [5, 9], 'titles': ['جدول منابع']}; empty lists
+            when the page does not mention a table
+    """
+    numbers = []
+    titles = []
+    for raw_line in (text or '').split('\n'):
+        line = logical_line(raw_line).strip()
+        if TABLE_WORD not in line:
+            continue
+        for match in TABLE_REF.finditer(line):
+            number = int(match.group(1))
+            if number not in numbers:
+                numbers.append(number)
+        if line.startswith(TABLE_WORD) and not TABLE_REF.match(line):
+            titles.append(line)
+    return {'numbers': numbers, 'titles': titles}
+
+
+def build_index(pdf_path, jobs=None, cache=None):
+    """
+    Index every page of a PDF in one pass over its (cached) page text.
+
+    Args:
+        pdf_path (str): PDF file path
+        jobs (int, optional): Worker processes for uncached pages
+        cache (PageCache or False, optional): See pdf_extract.extract_pages()
+
+    Returns:
+        dict: Index with 'pages' (page -> numbers/titles) and 'tables'
+            (table number -> pages)
+    """
+    pages = {}
+    tables = {}
+    page_total = 0
+    for page_num, text in extract_text(pdf_path, jobs=jobs, cache=cache):
+        page_total += 1
+        entry = index_page(text)
+        if not entry['numbers'] and not entry['titles']:
+            continue
+        pages[str(page_num)] = entry
+        for number in entry['numbers']:
+            tables.setdefault(str(number), []).append(page_num)
+
+    return {
+        'version': INDEX_VERSION,
+        'pdf': os.path.basename(pdf_path),
+        'sha256': file_sha256(pdf_path),
+        'page_count': page_total,
+        'pages': pages,
+        'tables': dict(sorted(tables.items(), key=lambda item: int(item[0]))),
+    }
+
+
+def index_path(pdf_path):
+    """Where the index of a PDF is stored (next to the PDF)."""
+    return os.path.splitext(pdf_path)[0] + INDEX_SUFFIX
+
+
+def save_index(index, path):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+    write_atomic(path, write)
+
+
+def stamp_path(pdf_path, stamp_dir=STAMP_DIR):
+    """Untracked record of the PDF's mtime/size when its hash last matched."""
+    name = os.path.splitext(os.path.basename(pdf_path))[0]
+    return os.path.join(stamp_dir, f'{name}.stamp.json')
+
+
+def _read_stamp(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_stamp(path, sha256, stat):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    stamp = {'sha256': sha256, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(stamp, f)
+    write_atomic(path, write)
+
+
+def load_index(pdf_path, rebuild=False, jobs=None, cache=None):
+    """
+    Return the saved index of a PDF, building it if missing or stale.
+
+    A matching mtime/size pair in the stamp file is trusted without hashing
+    the PDF (as in csv_cache); otherwise the PDF is hashed and the index is
+    rebuilt only if the content changed. Only a rebuild writes the index
+    file itself.
+
+    Args:
+        pdf_path (str): PDF file path
+        rebuild (bool): Ignore the saved index
+        jobs (int, optional): Worker processes when building
+        cache (PageCache or False, optional): Page cache when building
+
+    Returns:
+        dict: See build_index()
+    """
+    path = index_path(pdf_path)
+    stamp_file = stamp_path(pdf_path)
+    if not rebuild and os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = None
+        if index and index.get('version') == INDEX_VERSION:
+            stat = os.stat(pdf_path)
+            stamp = _read_stamp(stamp_file)
+            if (stamp.get('sha256') == index.get('sha256')
+                    and stamp.get('mtime_ns') == stat.st_mtime_ns and stamp.get('size') == stat.st_size):
+                return index
+            if index.get('sha256') == file_sha256(pdf_path):
+                # New checkout or touched but unchanged: remember the mtime for next time
+                _write_stamp(stamp_file, index['sha256'], stat)
+                return index
+
+    index = build_index(pdf_path, jobs=jobs, cache=cache)
+    save_index(index, path)
+    _write_stamp(stamp_file, index['sha256'], os.stat(pdf_path))
+    return index
+
+
+def find_table(pdf_path, number):
+    """Pages of a PDF that refer to table `number`, in page order."""
+    return load_index(pdf_path)['tables'].get(str(int(number)), [])
+
+
+def table_pages(pdf_path):
+    """Pages of a PDF that mention any table, in page order."""
+    return sorted(int(page) for page in load_index(pdf_path)['pages'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the table index of budget PDFs")
+    parser.add_argument('pdfs', nargs='*', help='PDF files (default: every PDF in data/raw)')
+    parser.add_argument('--find', type=int, metavar='N', help='Print the pages that refer to table N')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild even if the saved index is current')
+    parser.add_argument('-j', '--jobs', type=int, help='Worker processes (default: CPU count)')
+    args = parser.parse_args(argv)
+
+    pdfs = args.pdfs or sorted(glob.glob(os.path.join(RAW_DIR, '*.pdf')))
+
+    print("="*80)
+    print("PDF TABLE INDEX")
+    print("="*80)
+
+    failed = 0
+    for pdf_path in pdfs:
+        try:
+            index = load_index(pdf_path, rebuild=args.rebuild, jobs=args.jobs)
+        except Exception as e:
+            print(f"❌ {pdf_path}: {e}")
+            failed += 1
+            continue
+
+        name = os.path.basename(pdf_path)
+        if args.find is not None:
+            pages = index['tables'].get(str(args.find), [])
+            print(f"  {name:<24} table {args.find}: {', '.join(map(str, pages)) or 'not found'}")
+        else:
+            print(f"  {name:<24} {index['page_count']:>4} pages  {len(index['pages']):>4} with tables  "
+                  f"{len(index['tables']):>3} table numbers  -> {index_path(pdf_path)}")
+
+    print("="*80)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
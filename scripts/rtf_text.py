@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RTF Text - Streaming paragraph decoder and keyword index for the 1399 budget text
+
+The 1399 budget law is only available as a Cocoa RTF export
+(data/raw/1399_budget_text.rtfd/TXT.rtf, 1.5 MB). iter_paragraphs() reads
+it in fixed-size byte chunks and runs a small tokenizer over each chunk,
+yielding one Paragraph (RTF byte offsets + decoded text) at a time:
+
+- \\'xx bytes are decoded as Windows-1256 (the fonts are fcharset178),
+  \\uN as Unicode, honouring \\ucN fallback skipping
+- font/colour tables, \\* destinations and attachments are skipped
+- \\par, \\row, "\\" + newline and U+2028 end a paragraph; \\cell and
+  \\tab become spaces, runs of whitespace collapse to one space
+
+KeywordIndex joins the paragraphs (of the RTF, or of any text split on
+newlines) and replaces the old `.{0,300}keyword.{0,500}` regex per keyword:
+
+- find()/contexts() look up one keyword through a trigram -> paragraph
+  posting list, so only the few paragraphs holding all its trigrams are
+  scanned
+- finditer()/search() find every hit of a whole keyword list in a single
+  pass with keyword_search's Aho-Corasick automaton; a keyword may contain
+  `.*` gaps ('هزینه.*جاری')
+
+Matching ignores the Arabic / Persian yeh and kaf variants, Persian vs
+ASCII digits, case and the kind of whitespace; matches never cross a
+paragraph break. Contexts are returned from the original text, with the
+parenthesized budget numbers "(000 /000 /371 /534)" found in them.
+
+Usage:
+    python rtf_text.py                                  # decode and print statistics
+    python rtf_text.py جدول 'منابع عمومي' --limit 5     # keyword contexts
+    python rtf_text.py 'هزینه.*جاری' --file ../data/raw/1400_text.txt
+
+From another script:
+    from rtf_text import KeywordIndex
+    index = KeywordIndex.from_rtf()
+    for hit in index.contexts('منابع عمومي', before=200, after=500):
+        print(hit['offset'], hit['context'])
+    findings = KeywordIndex.from_text(text).search(['منابع عمومی', 'هزینه.*جاری'], limit=3)
+"""
+
+import argparse
+import re
+import sys
+import time
+from bisect import bisect_right
+from collections import namedtuple
+
+from numeric_ingest import TEXT_TRANSLATION
+
+RTF_PATH = '../data/raw/1399_budget_text.rtfd/TXT.rtf'
+CHUNK_SIZE = 64 * 1024
+
+# Longest token that may straddle a chunk boundary (control word + parameter)
+_TAIL_BYTES = 64
+
+TOKEN = re.compile(
+    rb"\\'([0-9a-fA-F]{2})"            # 1: hex byte
+    rb"|\\([a-zA-Z]{1,32})(-?\d+)? ?"  # 2, 3: control word and parameter
+    rb"|\\([\s\S])"                    # 4: control symbol
+    rb"|([{}])"                        # 5: group
+    rb"|[\r\n]+"                       # raw line breaks carry no text
+    rb"|([^\\{}\r\n]+)"                # 6: plain text
+)
+
+# Groups whose content is not document text
+SKIP_DESTINATIONS = {
+    b'fonttbl', b'colortbl', b'stylesheet', b'info', b'pict', b'header', b'footer',
+    b'NeXTGraphic',
+}
+PARAGRAPH_WORDS = {b'par', b'row', b'sect', b'page'}
+SPACE_WORDS = {b'cell', b'tab', b'line'}
+SYMBOLS = {b'~': ' ', b'_': '-', b'\\': '\\', b'{': '{', b'}': '}'}
+LINE_SEPARATOR = '\u2028'
+
+# bytes -> text for \'xx escapes; bytes undefined in cp1256 decode to ''
+CP1256 = [bytes([b]).decode('windows-1256', errors='ignore') for b in range(256)]
+
+
+WHITESPACE = re.compile(r'\s+')
+
+# Budget amounts as printed in the law texts: (000 /000 /371 /534 /266 /20)
+PAREN_NUMBER = re.compile(r'\([\d\s/]+\)')
+
+# Other whitespace matches a space; newlines stay, they separate paragraphs
+SPACE_MAP = str.maketrans({char: ' ' for char in '\t\r\f\v\u00a0\u2028'})
+
+Paragraph = namedtuple('Paragraph', ['start', 'end', 'text'])
+
+
+def normalize(text):
+    """Fold yeh/kaf variants, digits and case; the result has the same length as text."""
+    text = text.translate(TEXT_TRANSLATION)
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # Some characters lower to two ('İ' -> 'i̇'); leave those unchanged so
+    # offsets into the folded text stay offsets into text
+    return ''.join(char if len(char.lower()) != 1 else char.lower() for char in text)
+
+
+def fold(text):
+    """Matching form used for keyword search (normalize + whitespace); same length as text."""
+    return normalize(text).translate(SPACE_MAP)
+
+
+def _tokens(f, chunk_size):
+    """(absolute offset, match) for every token, reading f chunk by chunk."""
+    base = 0
+    buf = b''
+    eof = False
+    while not eof:
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf += chunk
+        safe_end = len(buf) if eof else len(buf) - _TAIL_BYTES
+        consumed = 0
+        for match in TOKEN.finditer(buf):
+            if match.end() > safe_end:
+                break
+            yield base + match.start(), match
+            consumed = match.end()
+        if eof:
+            consumed = len(buf)
+        base += consumed
+        buf = buf[consumed:]
+
+
+def iter_paragraphs(rtf_path=RTF_PATH, chunk_size=CHUNK_SIZE):
+    """
+    Decode an RTF file paragraph by paragraph without loading it whole.
+
+    Args:
+        rtf_path (str): RTF file path
+        chunk_size (int): Bytes read per chunk
+
+    Yields:
+        Paragraph: (start, end, text) with the RTF byte range of the
+            paragraph's first and last text token; empty paragraphs are
+            skipped
+    """
+    # Saved (uc fallback count, skipping) of each enclosing group
+    stack = []
+    uc = 1
+    skipping = False
+    pending_skip = 0      # fallback characters still to drop after \uN
+
+    parts = []
+    start = end = None
+
+    def flush():
+        text = WHITESPACE.sub(' ', ''.join(parts)).strip()
+        parts.clear()
+        return Paragraph(start, end, text) if text else None
+
+    def emit(text, offset, length):
+        nonlocal start, end
+        if start is None:
+            start = offset
+        end = offset + length
+        parts.append(text)
+
+    with open(rtf_path, 'rb') as f:
+        for offset, match in _tokens(f, chunk_size):
+            hex_byte, word, param, symbol, brace, text = match.groups()
+
+            if brace is not None:
+                if brace == b'{':
+                    stack.append((uc, skipping))
+                elif stack:
+                    uc, skipping = stack.pop()
+                pending_skip = 0
+                continue
+
+            if word is not None:
+                if word in SKIP_DESTINATIONS:
+                    skipping = True
+                    continue
+                if skipping:
+                    continue
+                if word == b'uc':
+                    uc = int(param or 1)
+                elif word == b'u':
+                    code = int(param or 0)
+                    if code < 0:
+                        code += 0x10000
+                    pending_skip = uc
+                    char = chr(code)
+                    if char == LINE_SEPARATOR:
+                        paragraph = flush()
+                        if paragraph:
+                            yield paragraph
+                        start = None
+                    else:
+                        emit(char, offset, match.end() - match.start())
+                elif word in PARAGRAPH_WORDS:
+                    paragraph = flush()
+                    if paragraph:
+                        yield paragraph
+                    start = None
+                elif word in SPACE_WORDS:
+                    parts.append(' ')
+                continue
+
+            if symbol is not None:
+                if symbol == b'*':
+                    skipping = True
+                elif skipping:
+                    continue
+                elif symbol in (b'\n', b'\r'):
+                    paragraph = flush()
+                    if paragraph:
+                        yield paragraph
+                    start = None
+                elif symbol in SYMBOLS:
+                    if pending_skip:
+                        pending_skip -= 1
+                    else:
+                        emit(SYMBOLS[symbol], offset, 2)
+                continue
+
+            if skipping:
+                continue
+
+            if hex_byte is not None:
+                if pending_skip:
+                    pending_skip -= 1
+                else:
+                    emit(CP1256[int(hex_byte, 16)], offset, 4)
+            elif text is not None:
+                if pending_skip:
+                    dropped = min(pending_skip, len(text))
+                    pending_skip -= dropped
+                    offset += dropped
+                    text = text[dropped:]
+                if text:
+                    emit(text.decode('latin-1'), offset, len(text))
+
+    paragraph = flush()
+    if paragraph:
+        yield paragraph
+
+
+def decode_rtf(rtf_path=RTF_PATH, separator='\n'):
+    """Whole decoded text of an RTF file, paragraphs joined by separator."""
+    return separator.join(paragraph.text for paragraph in iter_paragraphs(rtf_path))
+
+
+class KeywordIndex:
+    """
+    Keyword search over decoded paragraphs.
+
+    Usage:
+        index = KeywordIndex.from_rtf()
+        index.count('جدول')
+        hits = index.contexts('جدول', before=300, after=500, limit=20)
+        findings = index.search(['جدول', 'هزینه.*جاری'], limit=3)
+    """
+
+    def __init__(self, paragraphs):
+        self.paragraphs = list(paragraphs)
+        self.text = '\n'.join(paragraph.text for paragraph in self.paragraphs)
+        self._normalized = fold(self.text)
+
+        self._starts = []
+        position = 0
+        for paragraph in self.paragraphs:
+            self._starts.append(position)
+            position += len(paragraph.text) + 1
+        self._postings = None
+
+    @classmethod
+    def from_rtf(cls, rtf_path=RTF_PATH):
+        """Index the paragraphs of an RTF file."""
+        return cls(iter_paragraphs(rtf_path))
+
+    @classmethod
+    def from_text(cls, text):
+        """Index plain text, one paragraph per line (start/end are character offsets)."""
+        paragraphs = []
+        position = 0
+        for line in text.split('\n'):
+            paragraphs.append(Paragraph(position, position + len(line), line))
+            position += len(line) + 1
+        return cls(paragraphs)
+
+    @property
+    def postings(self):
+        """Trigram -> paragraph numbers, built on the first find()."""
+        if self._postings is None:
+            self._postings = {}
+            for number, start in enumerate(self._starts):
+                normalized = self._normalized[start:start + len(self.paragraphs[number].text)]
+                for gram in {normalized[i:i + 3] for i in range(len(normalized) - 2)}:
+                    self._postings.setdefault(gram, []).append(number)
+        return self._postings
+
+    def _candidates(self, needle):
+        """Paragraph numbers that contain every trigram of needle."""
+        if len(needle) < 3:
+            return range(len(self.paragraphs))
+        grams = {needle[i:i + 3] for i in range(len(needle) - 2)}
+        postings = sorted((self.postings.get(gram, []) for gram in grams), key=len)
+        found = set(postings[0])
+        for posting in postings[1:]:
+            found.intersection_update(posting)
+            if not found:
+                break
+        return sorted(found)
+
+    def find(self, keyword):
+        """
+        Character positions of keyword in self.text.
+
+        Matches may not cross paragraph boundaries.
+
+        Returns:
+            list: Sorted positions
+        """
+        needle = fold(keyword)
+        if not needle:
+            return []
+        positions = []
+        for number in self._candidates(needle):
+            start = self._starts[number]
+            stop = start + len(self.paragraphs[number].text)
+            pos = self._normalized.find(needle, start, stop)
+            while pos != -1:
+                positions.append(pos)
+                pos = self._normalized.find(needle, pos + 1, stop)
+        return positions
+
+    def count(self, keyword):
+        """Number of occurrences of keyword."""
+        return len(self.find(keyword))
+
+    def paragraph_at(self, position):
+        """The Paragraph containing character position in self.text."""
+        return self.paragraphs[bisect_right(self._starts, position) - 1]
+
+    def _context(self, start, end, before, after):
+        """Hit dict for self.text[start:end] with its context window."""
+        context = self.text[max(0, start - before):end + after]
+        return {
+            'position': start,
+            'end': end,
+            'offset': self.paragraph_at(start).start,
+            'context': context,
+            'numbers': PAREN_NUMBER.findall(context),
+        }
+
+    def contexts(self, keyword, before=300, after=500, limit=None):
+        """
+        Occurrences of keyword with surrounding text.
+
+        Args:
+            keyword (str): Text to look for
+            before (int): Characters of context before the keyword
+            after (int): Characters of context after the keyword
+            limit (int, optional): Stop after this many hits
+
+        Returns:
+            list: Dicts with 'position' and 'end' (in self.text), 'offset'
+                (source offset of the paragraph), 'context' and 'numbers'
+                (parenthesized budget numbers in the context)
+        """
+        hits = []
+        for position in self.find(keyword):
+            if limit is not None and len(hits) >= limit:
+                break
+            hits.append(self._context(position, position + len(keyword), before, after))
+        return hits
+
+    def finditer(self, keywords, max_gap=None):
+        """
+        Every hit of every keyword, in one pass over the text.
+
+        Args:
+            keywords (list): Keywords; '.*' allows a gap of up to max_gap characters
+            max_gap (int, optional): Longest gap between the parts of a keyword
+                (default: keyword_search.MAX_GAP)
+
+        Yields:
+            Hit: (keyword, start, end) in self.text positions, ordered by end
+        """
+        # keyword_search imports this module for fold()
+        from keyword_search import KeywordSearch
+
+        return KeywordSearch(keywords, max_gap).finditer_folded(self._normalized)
+
+    def search(self, keywords, before=300, after=500, limit=None, max_gap=None):
+        """
+        contexts() for several keywords at once, found in a single pass.
+
+        Args:
+            keywords (list): Keywords; '.*' allows a short gap
+            limit (int, optional): Keep at most this many hits per keyword
+
+        Returns:
+            dict: {keyword: [contexts() dicts]} for keywords with at least
+                one hit, in keyword order
+        """
+        findings = {keyword: [] for keyword in dict.fromkeys(keywords)}
+        for hit in self.finditer(keywords, max_gap):
+            found = findings[hit.keyword]
+            if limit is not None and len(found) >= limit:
+                continue
+            found.append(self._context(hit.start, hit.end, before, after))
+        return {keyword: found for keyword, found in findings.items() if found}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decode the 1399 budget RTF (or a text file) and search it")
+    parser.add_argument('keywords', nargs='*', help="Keywords to look up; '.*' allows a short gap")
+    parser.add_argument('--rtf', default=RTF_PATH, help=f'RTF file (default: {RTF_PATH})')
+    parser.add_argument('--file', help='UTF-8 text file to search instead of the RTF')
+    parser.add_argument('--limit', type=int, default=5, help='Contexts shown per keyword')
+    parser.add_argument('--context', type=int, default=150, help='Characters of context on each side')
+    args = parser.parse_args(argv)
+
+    print("="*80)
+    print("1399 BUDGET TEXT")
+    print("="*80)
+
+    start = time.perf_counter()
+    if args.file:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            index = KeywordIndex.from_text(f.read())
+    else:
+        index = KeywordIndex.from_rtf(args.rtf)
+    print(f"📄 {len(index.paragraphs):,} paragraphs, {len(index.text):,} characters "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    if args.keywords:
+        start = time.perf_counter()
+        counts = {keyword: 0 for keyword in dict.fromkeys(args.keywords)}
+        for hit in index.finditer(args.keywords):
+            counts[hit.keyword] += 1
+        print(f"⏱️  {len(counts)} keywords in one pass: {time.perf_counter() - start:.3f}s")
+
+        findings = index.search(args.keywords, args.context, args.context, args.limit)
+        for keyword, count in counts.items():
+            print(f"\n🔍 '{keyword}': {count} occurrences")
+            for hit in findings.get(keyword, []):
+                print(f"  @{hit['offset']:>8}  {' '.join(hit['context'].split())}")
+                if hit['numbers']:
+                    print(f"            numbers: {hit['numbers']}")
+
+    print("="*80)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
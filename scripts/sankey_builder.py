@@ -1,60 +1,649 @@
 """
 Sankey Builder - Auto-Index Node Management
 Eliminates manual index tracking for Plotly Sankey diagrams
+
+Nodes and links are stored column by column (parallel typed arrays),
+not as one dict per element, so Sankeys built from line-item data with
+thousands of links stay cheap:
+
+- colors are interned: each distinct color string is stored once and
+  nodes/links keep its id; the default link color (source color at 40%
+  opacity) is computed once per source color
+- add_nodes_from_frame() / add_links_from_frame() ingest a whole
+  DataFrame at a time
+- build() emits every Plotly field straight from its column
+- layout() pins x/y automatically: columns by longest path, rows ordered
+  by barycenter sweeps to reduce link crossings, heights proportional
+  to each node's flow (see solve_layout)
+- fold_long_tail() bounds the node count of every column by merging the
+  smallest flows of each parent into one "other" node
+- build() checks flow conservation (check_flow): every node's inflow,
+  outflow and declared value must agree within a tolerance
+
+Usage:
+    builder = SankeyBuilder()
+    builder.add_nodes_from_frame(nodes_df, name='id', label='label', value='value', color='color')
+    builder.add_links_from_frame(links_df, source='source', target='target', value='value')
+    builder.layout(columns=[0.05, 0.28, 0.48, 0.52, 0.72, 0.95])
+    data = builder.build()
 """
 
+from array import array
+from collections import namedtuple
+from functools import lru_cache
+import math
+
+import numpy as np
+
+LINK_OPACITY = 0.4
+
+# solve_layout() defaults
+LAYOUT_PAD = 0.02        # vertical gap between nodes of a column (fraction of the height)
+LAYOUT_X_MARGIN = 0.05   # first / last column x
+LAYOUT_SWEEPS = 4        # barycenter down + up sweeps
+
+# check_flow() defaults: |a - b| <= max(FLOW_ABS_TOL, FLOW_REL_TOL * max(|a|, |b|))
+FLOW_REL_TOL = 1e-3
+FLOW_ABS_TOL = 1e-6
+
+Layout = namedtuple('Layout', ['x', 'y', 'layers', 'crossings'])
+Folded = namedtuple('Folded', ['nodes', 'others', 'links'])
+FlowViolation = namedtuple('FlowViolation', ['node', 'check', 'expected', 'actual', 'tolerance'])
+
+
+@lru_cache(maxsize=None)
+def hex_to_rgba(hex_color, opacity):
+    """Convert hex color to rgba string (cached per color and opacity)."""
+    hex_color = hex_color.lstrip('#')
+    r = int(hex_color[0:2], 16)
+    g = int(hex_color[2:4], 16)
+    b = int(hex_color[4:6], 16)
+    return f'rgba({r},{g},{b},{opacity})'
+
+
+def assign_layers(node_count, sources, targets, align='justify', pinned=None):
+    """
+    Column of every node by longest path from the source nodes.
+
+    Args:
+        node_count (int): Number of nodes
+        sources (np.ndarray): Source node index of every link
+        targets (np.ndarray): Target node index of every link
+        align (str): 'left' keeps every node at its longest-path depth;
+            'justify' moves nodes without outgoing links to the last column
+        pinned (dict, optional): {node index: column} for nodes whose
+            column is fixed, e.g. a source that is not linked to the
+            column before it; their descendants are placed after them
+
+    Returns:
+        np.ndarray: Column number per node
+
+    Raises:
+        ValueError: If the links form a cycle
+    """
+    outgoing = [[] for _ in range(node_count)]
+    for source, target in zip(sources.tolist(), targets.tolist()):
+        outgoing[source].append(target)
+    indegree = np.bincount(targets, minlength=node_count).tolist()
+
+    pinned = pinned or {}
+
+    # Kahn's topological order; a node's depth is final once it is queued
+    depth = [0] * node_count
+    for node, layer in pinned.items():
+        depth[node] = layer
+    queue = [node for node in range(node_count) if not indegree[node]]
+    for node in queue:
+        for target in outgoing[node]:
+            if target not in pinned and depth[node] + 1 > depth[target]:
+                depth[target] = depth[node] + 1
+            indegree[target] -= 1
+            if not indegree[target]:
+                queue.append(target)
+    if len(queue) < node_count:
+        raise ValueError(f"Links form a cycle through {node_count - len(queue)} nodes")
+
+    layers = np.array(depth, dtype=np.int64)
+    if align == 'justify' and node_count:
+        sinks = np.bincount(sources, minlength=node_count) == 0
+        sinks[list(pinned)] = False
+        layers[sinks] = layers.max()
+    elif align != 'left':
+        raise ValueError(f"Unknown align '{align}' (use 'left' or 'justify')")
+    return layers
+
+
+def _inversions(ranks, size):
+    """Pairs i < j with ranks[i] > ranks[j] (Fenwick tree, O(n log size))."""
+    tree = [0] * (size + 1)
+    found = 0
+    for seen, rank in enumerate(ranks, 1):
+        i = rank + 1
+        while i <= size:
+            tree[i] += 1
+            i += i & -i
+        i = rank + 1
+        not_greater = 0
+        while i:
+            not_greater += tree[i]
+            i -= i & -i
+        found += seen - not_greater
+    return found
+
+
+def _crossings(layers, rank, sources, targets):
+    """Link crossings between neighbouring columns for the current row ranks."""
+    adjacent = layers[targets] == layers[sources] + 1
+    src, tgt = sources[adjacent], targets[adjacent]
+    total = 0
+    for layer in np.unique(layers[src]).tolist():
+        in_layer = layers[src] == layer
+        src_rank, tgt_rank = rank[src[in_layer]], rank[tgt[in_layer]]
+        order = np.lexsort((tgt_rank, src_rank))
+        total += _inversions(tgt_rank[order].tolist(), int(tgt_rank.max()) + 1)
+    return total
+
+
+def order_layers(layers, sources, targets, weights, sweeps=LAYOUT_SWEEPS):
+    """
+    Order the nodes of every column to reduce link crossings.
+
+    Starts from insertion order and runs barycenter sweeps: going right,
+    each column is sorted by the flow-weighted mean position of its
+    nodes' sources, going left by that of their targets. Every sweep
+    costs O(links + nodes) per column; the ordering with the fewest
+    crossings between neighbouring columns is kept.
+
+    Args:
+        layers (np.ndarray): Column per node (assign_layers)
+        sources (np.ndarray): Source node index of every link
+        targets (np.ndarray): Target node index of every link
+        weights (np.ndarray): Flow value of every link
+        sweeps (int): Number of right + left sweep pairs
+
+    Returns:
+        tuple: (list of node index arrays per column, top to bottom;
+            crossings left)
+    """
+    node_count = len(layers)
+    column_count = int(layers.max()) + 1 if node_count else 0
+    members = [np.flatnonzero(layers == layer) for layer in range(column_count)]
+    local = np.zeros(node_count, dtype=np.int64)   # fixed slot of a node within its column
+    for nodes in members:
+        local[nodes] = np.arange(len(nodes))
+
+    rank = np.zeros(node_count, dtype=np.int64)
+    position = np.zeros(node_count)
+
+    def place(layer):
+        nodes = members[layer]
+        rank[nodes] = np.arange(len(nodes))
+        position[nodes] = (rank[nodes] + 0.5) / len(nodes)
+
+    for layer in range(column_count):
+        place(layer)
+
+    weights = np.clip(np.nan_to_num(weights), 0, None)
+    incoming = [np.flatnonzero(layers[targets] == layer) for layer in range(column_count)]
+    outgoing = [np.flatnonzero(layers[sources] == layer) for layer in range(column_count)]
+
+    def reorder(layer, links, own, other):
+        nodes = members[layer]
+        if len(nodes) < 2 or not len(links):
+            return
+        slots = local[own[links]]
+        w = weights[links]
+        total = np.bincount(slots, weights=w, minlength=len(nodes))
+        weighted = np.bincount(slots, weights=w * position[other[links]], minlength=len(nodes))
+        key = np.empty(len(nodes))   # by slot; nodes without links keep their position
+        key[local[nodes]] = position[nodes]
+        linked = total > 0
+        key[linked] = weighted[linked] / total[linked]
+        members[layer] = nodes[np.argsort(key[local[nodes]], kind='stable')]
+        place(layer)
+
+    best = [nodes.copy() for nodes in members]
+    best_crossings = _crossings(layers, rank, sources, targets)
+    for _ in range(sweeps):
+        if not best_crossings:
+            break
+        for layer in range(1, column_count):
+            reorder(layer, incoming[layer], targets, sources)
+        for layer in range(column_count - 2, -1, -1):
+            reorder(layer, outgoing[layer], sources, targets)
+        crossings = _crossings(layers, rank, sources, targets)
+        if crossings < best_crossings:
+            best = [nodes.copy() for nodes in members]
+            best_crossings = crossings
+    return best, best_crossings
+
+
+def solve_layout(node_count, sources, targets, values, node_values=None, columns=None,
+                 pad=LAYOUT_PAD, x_margin=LAYOUT_X_MARGIN, align='justify', sweeps=LAYOUT_SWEEPS,
+                 pinned=None):
+    """
+    Pinned x/y positions for a Sankey diagram.
+
+    Columns come from assign_layers(), rows from order_layers(). Each
+    node gets a height proportional to max(inflow, outflow) (its own
+    value if it has no links), columns share one scale and are centered
+    vertically, and y is the node's center as Plotly expects.
+
+    Args:
+        node_count (int): Number of nodes
+        sources (array-like): Source node index of every link
+        targets (array-like): Target node index of every link
+        values (array-like): Flow value of every link
+        node_values (array-like, optional): Declared node values
+        columns (list, optional): x of every column (default: evenly
+            spaced between x_margin and 1 - x_margin)
+        pad (float): Vertical gap between nodes (shrunk for crowded columns)
+        x_margin (float): x of the first and last column
+        align (str): 'justify' or 'left' (see assign_layers)
+        sweeps (int): Barycenter sweep pairs
+        pinned (dict, optional): {node index: column} (see assign_layers)
+
+    Returns:
+        Layout: (x, y, layers, crossings) with numpy arrays per node
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    values = np.asarray(values, dtype=float)
+    if not node_count:
+        return Layout(np.zeros(0), np.zeros(0), np.zeros(0, dtype=np.int64), 0)
+
+    layers = assign_layers(node_count, sources, targets, align, pinned)
+    members, crossings = order_layers(layers, sources, targets, values, sweeps)
+    column_count = len(members)
+
+    if columns is None:
+        if column_count == 1:
+            columns = [0.5]
+        else:
+            columns = np.linspace(x_margin, 1 - x_margin, column_count)
+    elif len(columns) < column_count:
+        raise ValueError(f"{len(columns)} column positions for {column_count} columns")
+    x = np.asarray(columns, dtype=float)[layers]
+
+    flow = np.abs(np.nan_to_num(values))
+    sizes = np.fmax(np.bincount(sources, weights=flow, minlength=node_count),
+                    np.bincount(targets, weights=flow, minlength=node_count))
+    if node_values is not None:
+        declared = np.abs(np.nan_to_num(np.asarray(node_values, dtype=float)))
+        sizes = np.where(sizes > 0, sizes, declared)
+
+    # One scale for every column; at most half of a column is padding
+    crowded = max(len(nodes) for nodes in members)
+    pad = min(pad, 0.5 / (crowded - 1)) if crowded > 1 else 0.0
+    scale = min(
+        (1 - pad * (len(nodes) - 1)) / sizes[nodes].sum()
+        for nodes in members if sizes[nodes].sum() > 0
+    ) if sizes.any() else 0.0
+
+    y = np.zeros(node_count)
+    for nodes in members:
+        heights = sizes[nodes] * scale
+        tops = np.concatenate(([0.0], np.cumsum(heights[:-1] + pad)))
+        used = heights.sum() + pad * (len(nodes) - 1)
+        y[nodes] = (1 - used) / 2 + tops + heights / 2
+    return Layout(x, y, layers, crossings)
+
+
+def _tree_parents(node_count, sources, targets, flow):
+    """
+    Hang every node off its neighbour closest to the widest node.
+
+    Distances are undirected hops from the node with the largest
+    throughput (the budget column) of each connected part; a node's
+    parent link is its largest link to a node one hop closer.
+
+    Returns:
+        tuple: (distance per node, parent link index per node; -1 for roots)
+    """
+    throughput = np.fmax(np.bincount(sources, weights=flow, minlength=node_count),
+                         np.bincount(targets, weights=flow, minlength=node_count))
+    adjacency = [[] for _ in range(node_count)]
+    for link, (source, target) in enumerate(zip(sources.tolist(), targets.tolist())):
+        adjacency[source].append((target, link))
+        adjacency[target].append((source, link))
+
+    distance = [-1] * node_count
+    for root in np.argsort(-throughput, kind='stable').tolist():
+        if distance[root] >= 0:
+            continue
+        distance[root] = 0
+        queue = [root]
+        for node in queue:
+            for neighbour, _ in adjacency[node]:
+                if distance[neighbour] < 0:
+                    distance[neighbour] = distance[node] + 1
+                    queue.append(neighbour)
+
+    flow = flow.tolist()
+    parent = [-1] * node_count
+    for node in range(node_count):
+        closer = [link for neighbour, link in adjacency[node] if distance[neighbour] == distance[node] - 1]
+        if closer:
+            parent[node] = max(closer, key=lambda link: flow[link])
+    return distance, parent
+
+
+def fold_long_tail(node_count, sources, targets, values, max_nodes=None, min_share=0.0):
+    """
+    Merge the smallest flows of every parent into one "other" node per parent.
+
+    The diagram is read as a tree around its widest node: every other
+    node hangs off the neighbour one hop closer to it (its parent), and
+    folding a node drops the subtree behind it. Only nodes whose subtree
+    is linked to the rest of the diagram through the parent link alone
+    are folded, so every remaining node keeps its inflow and outflow.
+
+    A column is the set of nodes at the same hop distance from the center
+    on the same side of it (levels of the hierarchy). Columns are
+    processed from the center outwards:
+
+    - a node whose flow is below min_share of its parent's total flow on
+      that side is folded
+    - while a column has more than max_nodes nodes (one "other" node per
+      parent counted), its smallest remaining node is folded
+
+    An "other" node that would replace a single node is not created.
+
+    Args:
+        node_count (int): Number of nodes
+        sources (array-like): Source node index of every link
+        targets (array-like): Target node index of every link
+        values (array-like): Flow value of every link
+        max_nodes (int, optional): Most nodes per column
+        min_share (float): Smallest flow kept, as a share of the parent's total
+
+    Returns:
+        Folded: (nodes, others, links) where nodes are the kept node
+            indices (new index = position), others are (parent, folded
+            nodes largest first) for the "other" nodes appended after
+            them, and links are (source, target, value, merged link
+            indices largest first) in the new indices
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    flow = np.abs(np.nan_to_num(np.asarray(values, dtype=float)))
+    distance, parent = _tree_parents(node_count, sources, targets, flow)
+    source_list, target_list, flow_list = sources.tolist(), targets.tolist(), flow.tolist()
+    out_total = np.bincount(sources, weights=flow, minlength=node_count).tolist()
+    in_total = np.bincount(targets, weights=flow, minlength=node_count).tolist()
+
+    children = [[] for _ in range(node_count)]
+    incident = [set() for _ in range(node_count)]
+    for link, (source, target) in enumerate(zip(source_list, target_list)):
+        incident[source].add(link)
+        incident[target].add(link)
+    for node, link in enumerate(parent):
+        if link >= 0:
+            children[source_list[link] if target_list[link] == node else target_list[link]].append(node)
+
+    # A subtree is closed if none of its links leave it except the parent link
+    closed = [False] * node_count
+    for node in sorted(range(node_count), key=lambda node: -distance[node]):
+        tree_links = {parent[child] for child in children[node]}
+        if parent[node] >= 0:
+            tree_links.add(parent[node])
+        closed[node] = incident[node] == tree_links and all(closed[child] for child in children[node])
+
+    def side(node):
+        """True if the node's parent flows into it (right of the center)."""
+        return parent[node] >= 0 and target_list[parent[node]] == node
+
+    def group(node):
+        """(parent node, parent is the source) of a foldable node."""
+        link = parent[node]
+        outflow = side(node)
+        return (source_list[link] if outflow else target_list[link], outflow)
+
+    # A column is one hop distance on one side of the center
+    columns = {}
+    for node in range(node_count):
+        columns.setdefault((distance[node], side(node)), []).append(node)
+
+    dropped = [False] * node_count
+    others = {}
+    for column in sorted(columns):
+        live = [node for node in columns[column] if not dropped[node]]
+        candidates = [node for node in live if parent[node] >= 0 and closed[node]]
+        fixed = len(live) - len(candidates)
+
+        folded = []
+        rest = []
+        for node in candidates:
+            owner, outflow = group(node)
+            total = out_total[owner] if outflow else in_total[owner]
+            if flow_list[parent[node]] < min_share * total:
+                folded.append(node)
+            else:
+                rest.append(node)
+
+        if max_nodes is not None:
+            rest.sort(key=lambda node: -flow_list[parent[node]])
+            groups = {group(node) for node in folded}
+            kept = len(rest)
+            while kept and fixed + kept + len(groups) > max_nodes:
+                kept -= 1
+                groups.add(group(rest[kept]))
+            folded.extend(rest[kept:])
+
+        by_group = {}
+        for node in folded:
+            by_group.setdefault(group(node), []).append(node)
+        for key, members in by_group.items():
+            if len(members) < 2:
+                continue
+            others[key] = sorted(members, key=lambda node: -flow_list[parent[node]])
+            stack = list(members)
+            while stack:
+                node = stack.pop()
+                dropped[node] = True
+                stack.extend(children[node])
+
+    nodes = [node for node in range(node_count) if not dropped[node]]
+    new_index = {node: index for index, node in enumerate(nodes)}
+    other_keys = sorted(others, key=lambda key: others[key][0])
+    other_of = {}
+    for number, key in enumerate(other_keys):
+        for node in others[key]:
+            other_of[parent[node]] = len(nodes) + number
+
+    links = []
+    merged_at = {}
+    for link, (source, target) in enumerate(zip(source_list, target_list)):
+        if not dropped[source] and not dropped[target]:
+            links.append([new_index[source], new_index[target], flow_list[link], [link]])
+        elif link in other_of:
+            other = other_of[link]
+            if other not in merged_at:
+                merged_at[other] = len(links)
+                outflow = other_keys[other - len(nodes)][1]
+                owner = new_index[source if outflow else target]
+                links.append([owner, other] if outflow else [other, owner])
+                links[-1] += [0.0, []]
+            entry = links[merged_at[other]]
+            entry[2] += flow_list[link]
+            entry[3].append(link)
+    for entry in links:
+        entry[3].sort(key=lambda link: -flow_list[link])
+
+    return Folded(
+        nodes,
+        [(key[0], others[key]) for key in other_keys],
+        [tuple(entry) for entry in links],
+    )
+
+
+def check_flow(node_count, sources, targets, values, node_values=None,
+               rel_tol=FLOW_REL_TOL, abs_tol=FLOW_ABS_TOL):
+    """
+    Nodes whose inflow, outflow and declared value disagree.
+
+    One np.bincount per direction over the link arrays gives every
+    node's inflow and outflow; the comparisons are vectorized too, so
+    only violating nodes are touched in Python. Checks per node:
+
+    - 'in/out': inflow == outflow (nodes with both)
+    - 'value/in': declared value == inflow (nodes with inflow)
+    - 'value/out': declared value == outflow (nodes with outflow)
+
+    Two amounts agree when they differ by at most
+    max(abs_tol, rel_tol * the larger magnitude).
+
+    Args:
+        node_count (int): Number of nodes
+        sources (array-like): Source node index of every link
+        targets (array-like): Target node index of every link
+        values (array-like): Flow value of every link
+        node_values (array-like, optional): Declared node values (NaN = none)
+        rel_tol (float): Relative tolerance
+        abs_tol (float): Absolute tolerance
+
+    Returns:
+        list: FlowViolation(node, check, expected, actual, tolerance)
+            tuples, by node
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    values = np.asarray(values, dtype=float)
+    inflow = np.bincount(targets, weights=values, minlength=node_count)
+    outflow = np.bincount(sources, weights=values, minlength=node_count)
+    has_in = np.bincount(targets, minlength=node_count) > 0
+    has_out = np.bincount(sources, minlength=node_count) > 0
+
+    def tolerance(a, b):
+        return np.maximum(abs_tol, rel_tol * np.maximum(np.abs(a), np.abs(b)))
+
+    checks = [('in/out', inflow, outflow, has_in & has_out)]
+    if node_values is not None:
+        declared = np.asarray(node_values, dtype=float)
+        known = ~np.isnan(declared)
+        checks.append(('value/in', declared, inflow, known & has_in))
+        checks.append(('value/out', declared, outflow, known & has_out))
+
+    violations = []
+    for check, expected, actual, applies in checks:
+        allowed = tolerance(expected, actual)
+        for node in np.flatnonzero(applies & (np.abs(expected - actual) > allowed)).tolist():
+            violations.append(FlowViolation(node, check, float(expected[node]), float(actual[node]),
+                                            float(allowed[node])))
+    violations.sort(key=lambda violation: violation.node)
+    return violations
+
+
+def _float(value):
+    """Float for a typed array; None / NaN become NaN (= not set)."""
+    return math.nan if value is None else float(value)
+
+
 class SankeyBuilder:
     """
     Build Sankey diagrams without manually tracking node indices.
-    
+
     Usage:
         builder = SankeyBuilder()
         builder.add_node('corporate-tax', 'مالیات شرکت‌ها', 8.17, '#1E5F8C', 0.05, 0.10)
         builder.add_link('corporate-tax', 'tax-revenue', 8.17)
         data = builder.build()
     """
-    
+
     def __init__(self):
-        self.nodes = []
         self.node_map = {}  # name -> index
-        self.links = []
-    
-    def add_node(self, name, label, value, color, x, y):
+
+        # Node columns
+        self._names = []
+        self._labels = []
+        self._node_values = array('d')
+        self._node_colors = array('l')   # ids into self._palette
+        self._x = array('d')             # NaN = no pinned position
+        self._y = array('d')
+
+        # Link columns
+        self._sources = array('l')
+        self._targets = array('l')
+        self._link_values = array('d')
+        self._link_colors = array('l')
+
+        # Interned colors
+        self._palette = []
+        self._color_ids = {}
+        self._link_default = {}  # node color id -> default link color id
+
+        self.violations = []     # check_flow() result of the last build()
+
+    @property
+    def nodes(self):
+        """Nodes as dicts (name, label, value, color, x, y); built on access."""
+        return [
+            {
+                'name': self._names[i],
+                'label': self._labels[i],
+                'value': self._node_values[i],
+                'color': self._palette[self._node_colors[i]],
+                'x': self._optional(self._x[i]),
+                'y': self._optional(self._y[i]),
+            }
+            for i in range(len(self._names))
+        ]
+
+    @property
+    def links(self):
+        """Links as dicts (source, target, value, color); built on access."""
+        return [
+            {
+                'source': self._sources[i],
+                'target': self._targets[i],
+                'value': self._link_values[i],
+                'color': self._palette[self._link_colors[i]],
+            }
+            for i in range(len(self._sources))
+        ]
+
+    @property
+    def node_count(self):
+        return len(self._names)
+
+    @property
+    def link_count(self):
+        return len(self._sources)
+
+    def add_node(self, name, label, value, color, x=None, y=None):
         """
         Add a node to the diagram.
-        
+
         Args:
             name (str): Unique identifier (e.g., 'corporate-tax')
             label (str): Display label (e.g., 'مالیات شرکت‌ها')
             value (float): Node value for sizing
             color (str): Hex color code
-            x (float): X position (0.0 to 1.0)
-            y (float): Y position (0.0 to 1.0)
-        
+            x (float, optional): X position (0.0 to 1.0)
+            y (float, optional): Y position (0.0 to 1.0)
+
         Returns:
             int: Auto-assigned index
         """
         if name in self.node_map:
             raise ValueError(f"Node '{name}' already exists!")
-        
-        index = len(self.nodes)
+
+        index = len(self._names)
         self.node_map[name] = index
-        
-        self.nodes.append({
-            'name': name,
-            'label': label,
-            'value': value,
-            'color': color,
-            'x': x,
-            'y': y
-        })
-        
+
+        self._names.append(name)
+        self._labels.append(label)
+        self._node_values.append(_float(value))
+        self._node_colors.append(self._intern(color))
+        self._x.append(_float(x))
+        self._y.append(_float(y))
+
         return index
-    
+
     def add_link(self, source_name, target_name, value, color=None):
         """
         Add a link between two nodes.
-        
+
         Args:
             source_name (str): Source node name
             target_name (str): Target node name
@@ -65,40 +654,180 @@ class SankeyBuilder:
             raise ValueError(f"Source node '{source_name}' not found!")
         if target_name not in self.node_map:
             raise ValueError(f"Target node '{target_name}' not found!")
-        
+
         source_idx = self.node_map[source_name]
         target_idx = self.node_map[target_name]
-        
-        # Default color: inherit from source with transparency
+
+        self._sources.append(source_idx)
+        self._targets.append(target_idx)
+        self._link_values.append(float(value))
+        if color is None:
+            # Default color: inherit from source with transparency
+            self._link_colors.append(self._default_link_color(self._node_colors[source_idx]))
+        else:
+            self._link_colors.append(self._intern(color))
+
+    def add_nodes_from_frame(self, df, name='name', label='label', value='value', color='color',
+                             x='x', y='y'):
+        """
+        Add one node per DataFrame row.
+
+        Args:
+            df (pd.DataFrame): Node table
+            name (str): Column of unique identifiers
+            label (str): Label column (falls back to the name column if missing)
+            value (str): Value column
+            color (str): Color column, or one hex color for every node
+            x (str): X column (nodes are unpinned if missing)
+            y (str): Y column (nodes are unpinned if missing)
+
+        Returns:
+            range: Indices of the new nodes
+        """
+        names = df[name].tolist()
+        duplicates = {n for n in names if n in self.node_map}
+        if len(set(names)) != len(names):
+            duplicates.update(df[name][df[name].duplicated()].tolist())
+        if duplicates:
+            raise ValueError(f"Nodes already exist: {sorted(map(str, duplicates))[:10]}")
+
+        start = len(self._names)
+        count = len(names)
+        self.node_map.update(zip(names, range(start, start + count)))
+        self._names.extend(names)
+        self._labels.extend(df[label].tolist() if label in df.columns else names)
+        self._node_values.extend(self._float_column(df, value))
+        self._node_colors.extend(self._color_column(df, color, count))
+        self._x.extend(self._float_column(df, x))
+        self._y.extend(self._float_column(df, y))
+
+        return range(start, start + count)
+
+    def add_links_from_frame(self, df, source='source', target='target', value='value', color=None):
+        """
+        Add one link per DataFrame row.
+
+        Args:
+            df (pd.DataFrame): Link table
+            source (str): Column of source node names
+            target (str): Column of target node names
+            value (str): Flow value column
+            color (str, optional): Color column, or one color for every link
+                (defaults to each source node's color with opacity)
+        """
+        sources = df[source].map(self.node_map)
+        targets = df[target].map(self.node_map)
+        for column, indices in ((source, sources), (target, targets)):
+            missing = df[column][indices.isna()]
+            if len(missing):
+                raise ValueError(f"Nodes not found in '{column}': {sorted(map(str, set(missing)))[:10]}")
+
+        sources = sources.to_numpy(dtype=np.int64)
+        self._sources.extend(sources.tolist())
+        self._targets.extend(targets.to_numpy(dtype=np.int64).tolist())
+        self._link_values.extend(self._float_column(df, value))
         if color is None:
-            source_color = self.nodes[source_idx]['color']
-            # Convert hex to rgba with 40% opacity
-            color = self._hex_to_rgba(source_color, 0.4)
-        
-        self.links.append({
-            'source': source_idx,
-            'target': target_idx,
-            'value': value,
-            'color': color
-        })
-    
+            source_colors = self._column(self._node_colors)[sources]
+            defaults = {cid: self._default_link_color(cid) for cid in np.unique(source_colors).tolist()}
+            lookup = np.zeros(len(self._palette), dtype=np.int64)
+            lookup[list(defaults)] = list(defaults.values())
+            self._link_colors.extend(lookup[source_colors].tolist())
+        else:
+            self._link_colors.extend(self._color_column(df, color, len(df)))
+
+    def layout(self, columns=None, pad=LAYOUT_PAD, x_margin=LAYOUT_X_MARGIN, align='justify',
+               sweeps=LAYOUT_SWEEPS, pinned=None):
+        """
+        Pin every node's x/y with solve_layout(), replacing manual positions.
+
+        Args:
+            columns (list, optional): x of every column, left to right
+            pad (float): Vertical gap between nodes
+            x_margin (float): x of the first and last column if columns is not given
+            align (str): 'justify' (sinks in the last column) or 'left'
+            sweeps (int): Barycenter sweep pairs
+            pinned (dict, optional): {node name: column} for nodes whose
+                column cannot follow from their links
+
+        Returns:
+            Layout: (x, y, layers, crossings)
+        """
+        result = solve_layout(
+            self.node_count,
+            self._column(self._sources),
+            self._column(self._targets),
+            self._column(self._link_values),
+            node_values=self._column(self._node_values),
+            columns=columns, pad=pad, x_margin=x_margin, align=align, sweeps=sweeps,
+            pinned={self.node_map[name]: layer for name, layer in (pinned or {}).items()},
+        )
+        self._x = array('d', result.x.tolist())
+        self._y = array('d', result.y.tolist())
+        return result
+
     def get_index(self, name):
         """Get the index of a node by name."""
         return self.node_map.get(name)
-    
-    def build(self):
+
+    def validate(self, rel_tol=FLOW_REL_TOL, abs_tol=FLOW_ABS_TOL):
+        """
+        Flow-conservation violations of the current nodes and links (see check_flow).
+
+        Returns:
+            list: FlowViolation tuples
+        """
+        return check_flow(
+            self.node_count,
+            self._column(self._sources),
+            self._column(self._targets),
+            self._column(self._link_values),
+            node_values=self._column(self._node_values),
+            rel_tol=rel_tol, abs_tol=abs_tol,
+        )
+
+    def describe(self, violation):
+        """One line describing a FlowViolation with node names."""
+        expected, actual = {
+            'in/out': ('inflow', 'outflow'),
+            'value/in': ('value', 'inflow'),
+            'value/out': ('value', 'outflow'),
+        }[violation.check]
+        return (f"{self._names[violation.node]}: {expected} {violation.expected:,.2f} != "
+                f"{actual} {violation.actual:,.2f} "
+                f"(off by {violation.actual - violation.expected:+,.2f}, tolerance {violation.tolerance:,.2g})")
+
+    def build(self, check='warn', rel_tol=FLOW_REL_TOL, abs_tol=FLOW_ABS_TOL):
         """
         Generate Plotly-compatible Sankey structure.
-        
+
+        Flow conservation is checked first; the violations are kept in
+        self.violations.
+
+        Args:
+            check (str): 'warn' prints the violations, 'raise' raises
+                ValueError if there are any, None skips the check
+            rel_tol (float): Relative tolerance of the check
+            abs_tol (float): Absolute tolerance of the check
+
         Returns:
             dict: Ready for go.Sankey(node=..., link=...)
         """
+        self.violations = self.validate(rel_tol, abs_tol) if check else []
+        if self.violations:
+            lines = [self.describe(violation) for violation in self.violations]
+            if check == 'raise':
+                raise ValueError(f"{len(lines)} flow violations:\n" + '\n'.join(lines))
+            print(f"⚠️  {len(lines)} flow violations:")
+            for line in lines:
+                print(f"   {line}")
+
+        palette = np.array(self._palette, dtype=object)
         return {
             'node': {
-                'label': [n['label'] for n in self.nodes],
-                'color': [n['color'] for n in self.nodes],
-                'x': [n['x'] for n in self.nodes],
-                'y': [n['y'] for n in self.nodes],
+                'label': list(self._labels),
+                'color': palette[self._column(self._node_colors)].tolist(),
+                'x': self._positions(self._x),
+                'y': self._positions(self._y),
                 'pad': 15,
                 'thickness': 60,
                 'line': {
@@ -107,45 +836,89 @@ class SankeyBuilder:
                 }
             },
             'link': {
-                'source': [l['source'] for l in self.links],
-                'target': [l['target'] for l in self.links],
-                'value': [l['value'] for l in self.links],
-                'color': [l['color'] for l in self.links]
+                'source': self._sources.tolist(),
+                'target': self._targets.tolist(),
+                'value': self._link_values.tolist(),
+                'color': palette[self._column(self._link_colors)].tolist()
             }
         }
-    
+
     def stats(self):
         """Print builder statistics."""
-        print(f"Nodes: {len(self.nodes)}")
-        print(f"Links: {len(self.links)}")
+        print(f"Nodes: {self.node_count}")
+        print(f"Links: {self.link_count}")
+        print(f"Colors: {len(self._palette)}")
         print(f"Node names: {list(self.node_map.keys())}")
-    
+
+    def _intern(self, color):
+        """Id of color in the palette, adding it on first use."""
+        color_id = self._color_ids.get(color)
+        if color_id is None:
+            color_id = self._color_ids[color] = len(self._palette)
+            self._palette.append(color)
+        return color_id
+
+    def _default_link_color(self, node_color_id):
+        """Interned id of a node color at LINK_OPACITY, computed once per color."""
+        color_id = self._link_default.get(node_color_id)
+        if color_id is None:
+            rgba = hex_to_rgba(self._palette[node_color_id], LINK_OPACITY)
+            color_id = self._link_default[node_color_id] = self._intern(rgba)
+        return color_id
+
+    def _color_column(self, df, color, count):
+        """Interned color ids for a column name or a single color string."""
+        if color in df.columns:
+            codes, uniques = df[color].factorize()
+            if (codes < 0).any():
+                raise ValueError(f"Missing colors in '{color}'")
+            ids = np.array([self._intern(c) for c in uniques], dtype=np.int64)
+            return ids[codes].tolist()
+        return [self._intern(color)] * count
+
+    @staticmethod
+    def _float_column(df, column):
+        """A column as floats with NaN for missing values (all NaN if absent)."""
+        if column not in df.columns:
+            return [math.nan] * len(df)
+        return df[column].astype(float).tolist()
+
+    @staticmethod
+    def _column(values):
+        """Zero-copy numpy view of a typed array."""
+        return np.frombuffer(values, dtype=values.typecode)
+
+    @staticmethod
+    def _optional(value):
+        return None if math.isnan(value) else value
+
+    @staticmethod
+    def _positions(values):
+        """x / y column for Plotly: None where a node is not pinned."""
+        return [None if math.isnan(v) else v for v in values]
+
     @staticmethod
     def _hex_to_rgba(hex_color, opacity):
         """Convert hex color to rgba string."""
-        hex_color = hex_color.lstrip('#')
-        r = int(hex_color[0:2], 16)
-        g = int(hex_color[2:4], 16)
-        b = int(hex_color[4:6], 16)
-        return f'rgba({r},{g},{b},{opacity})'
+        return hex_to_rgba(hex_color, opacity)
 
 
 # Example usage
 if __name__ == '__main__':
     builder = SankeyBuilder()
-    
+
     # Add nodes
     builder.add_node('source1', 'Source 1', 100, '#2A7BA8', 0.1, 0.3)
     builder.add_node('source2', 'Source 2', 50, '#2A7BA8', 0.1, 0.7)
     builder.add_node('target', 'Target', 150, '#D6006E', 0.9, 0.5)
-    
+
     # Add links
     builder.add_link('source1', 'target', 100)
     builder.add_link('source2', 'target', 50)
-    
+
     # Build
     data = builder.build()
-    
+
     print("Sankey data structure:")
     print(f"Nodes: {data['node']['label']}")
     print(f"Links: {list(zip(data['link']['source'], data['link']['target'], data['link']['value']))}")
@@ -6,17 +6,11 @@ Based on ISNA article analysis showing proper categorization
 
 import json
 import psycopg2
-from psycopg2.extras import execute_values
-import getpass
 
-# Database connection parameters (same as import_data.py)
-DB_PARAMS = {
-    'host': 'localhost',
-    'database': 'iran_budget',
-    'user': getpass.getuser(),  # Use current system user
-    'password': '',  # set password if required
-    'port': 5432
-}
+import budget_db
+
+# Database connection parameters from DB_HOST/DB_NAME/DB_USER/... (see budget_db.py)
+DB_PARAMS = budget_db.db_config()
 
 def update_1404_breakdown():
     """
@@ -31,102 +25,95 @@ def update_1404_breakdown():
     Note: Database stores values in thousands (1000 = 1 billion rials)
     """
     
-    conn = None
-    cur = None
-    
     try:
-        # Connect to database
-        conn = psycopg2.connect(**DB_PARAMS)
-        cur = conn.cursor()
-        
-        print("Updating 1404 expenditure breakdown...")
-        
-        # Update expenditures table for year 1404
-        # Values are in thousands (database unit: thousand billion rials = trillion rials)
-        update_query = """
-        UPDATE expenditures
-        SET 
-            current_exp = 22676000,
-            capital_exp = 20700000,
-            subsidy_spending = 10500000,
-            unclassified = 10469000
-        WHERE year_id = (SELECT year_id FROM years WHERE year_persian = 1404);
-        """
+        # Pooled connection, shared with the other scripts; commits when the block exits cleanly
+        with budget_db.cursor(DB_PARAMS) as cur:
+            print("Updating 1404 expenditure breakdown...")
+            
+            # Update expenditures table for year 1404
+            # Values are in thousands (database unit: thousand billion rials = trillion rials)
+            update_query = """
+            UPDATE expenditures
+            SET 
+                current_exp = 22676000,
+                capital_exp = 20700000,
+                subsidy_spending = 10500000,
+                unclassified = 10469000
+            WHERE year_id = (SELECT year_id FROM years WHERE year_persian = 1404);
+            """
         
-        cur.execute(update_query)
+            cur.execute(update_query)
         
-        # Verify the update
-        verify_query = """
-        SELECT 
-            y.year_persian,
-            e.current_exp,
-            e.capital_exp,
-            e.subsidy_spending,
-            e.unclassified,
-            (e.current_exp + e.capital_exp + e.subsidy_spending + e.unclassified) as total
-        FROM expenditures e
-        JOIN years y ON e.year_id = y.year_id
-        WHERE y.year_persian = 1404;
-        """
+            # Verify the update
+            verify_query = """
+            SELECT 
+                y.year_persian,
+                e.current_exp,
+                e.capital_exp,
+                e.subsidy_spending,
+                e.unclassified,
+                (e.current_exp + e.capital_exp + e.subsidy_spending + e.unclassified) as total
+            FROM expenditures e
+            JOIN years y ON e.year_id = y.year_id
+            WHERE y.year_persian = 1404;
+            """
         
-        cur.execute(verify_query)
-        result = cur.fetchone()
+            cur.execute(verify_query)
+            result = cur.fetchone()
         
-        if result:
-            print("\n✅ 1404 Expenditure Breakdown Updated:")
-            print(f"   Year: {result[0]}")
-            print(f"   Current Expenses: {result[1]/1000:,.1f} trillion rials ({result[1]:,.0f} DB units)")
-            print(f"   Capital Investments: {result[2]/1000:,.1f} trillion rials ({result[2]:,.0f} DB units)")
-            print(f"   Subsidy Spending: {result[3]/1000:,.1f} trillion rials ({result[3]:,.0f} DB units)")
-            print(f"   Financial Operations: {result[4]/1000:,.1f} trillion rials ({result[4]:,.0f} DB units)")
-            print(f"   Total: {result[5]/1000:,.1f} trillion rials ({result[5]:,.0f} DB units)")
+            if result:
+                print("\n✅ 1404 Expenditure Breakdown Updated:")
+                print(f"   Year: {result[0]}")
+                print(f"   Current Expenses: {result[1]/1000:,.1f} trillion rials ({result[1]:,.0f} DB units)")
+                print(f"   Capital Investments: {result[2]/1000:,.1f} trillion rials ({result[2]:,.0f} DB units)")
+                print(f"   Subsidy Spending: {result[3]/1000:,.1f} trillion rials ({result[3]:,.0f} DB units)")
+                print(f"   Financial Operations: {result[4]/1000:,.1f} trillion rials ({result[4]:,.0f} DB units)")
+                print(f"   Total: {result[5]/1000:,.1f} trillion rials ({result[5]:,.0f} DB units)")
         
-        # Also update the source JSON file for consistency
-        json_file = '/Users/hamidreza/Documents/AI-Projects/IranBudget/data/processed/iran_budget_1395_1404_complete.json'
+            # Also update the source JSON file for consistency
+            json_file = '/Users/hamidreza/Documents/AI-Projects/IranBudget/data/processed/iran_budget_1395_1404_complete.json'
         
-        with open(json_file, 'r', encoding='utf-8') as f:
-            budget_data = json.load(f)
+            with open(json_file, 'r', encoding='utf-8') as f:
+                budget_data = json.load(f)
         
-        # Find and update 1404 entry (budget_data is a list of year objects)
-        for year_data in budget_data:
-            # Check if this is the 1404 entry
-            if isinstance(year_data, dict) and year_data.get('year') == 1404:
-                if 'expenditures' in year_data and isinstance(year_data['expenditures'], dict):
-                    year_data['expenditures']['current_exp'] = 22676000
-                    year_data['expenditures']['capital_exp'] = 20700000
-                    year_data['expenditures']['subsidy_spending'] = 10500000
-                    year_data['expenditures']['unclassified'] = 10469000
+            # Find and update 1404 entry (budget_data is a list of year objects)
+            for year_data in budget_data:
+                # Check if this is the 1404 entry
+                if isinstance(year_data, dict) and year_data.get('year') == 1404:
+                    if 'expenditures' in year_data and isinstance(year_data['expenditures'], dict):
+                        year_data['expenditures']['current_exp'] = 22676000
+                        year_data['expenditures']['capital_exp'] = 20700000
+                        year_data['expenditures']['subsidy_spending'] = 10500000
+                        year_data['expenditures']['unclassified'] = 10469000
                     
-                    # Add a note about the breakdown
-                    if 'notes' not in year_data:
-                        year_data['notes'] = {}
-                    year_data['notes']['expenditure_breakdown'] = (
-                        "Updated based on ISNA article: "
-                        "Current (22.7T), Capital (20.7T), Financial Ops (10.5T), Subsidies (10.5T)"
-                    )
-                break
+                        # Add a note about the breakdown
+                        if 'notes' not in year_data:
+                            year_data['notes'] = {}
+                        year_data['notes']['expenditure_breakdown'] = (
+                            "Updated based on ISNA article: "
+                            "Current (22.7T), Capital (20.7T), Financial Ops (10.5T), Subsidies (10.5T)"
+                        )
+                    break
         
-        # Save updated JSON
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(budget_data, f, ensure_ascii=False, indent=2)
+            # Save updated JSON
+            with open(json_file, 'w', encoding='utf-8') as f:
+                json.dump(budget_data, f, ensure_ascii=False, indent=2)
         
-        print(f"\n✅ Updated source JSON file: {json_file}")
-        
-        # Commit changes
-        conn.commit()
+            print(f"\n✅ Updated source JSON file: {json_file}")
+
         print("\n✅ Database updated successfully!")
+
+        # Refresh materialized rollups (create_materialized_views.sql), if installed
+        with budget_db.cursor(DB_PARAMS) as cur:
+            cur.execute("SELECT to_regproc('refresh_budget_views') IS NOT NULL;")
+            if cur.fetchone()[0]:
+                cur.execute("SELECT refresh_budget_views();")
+                print("✅ Materialized views refreshed")
         
     except psycopg2.Error as e:
         print(f"\n❌ Database error: {e}")
-        if conn:
-            conn.rollback()
     except Exception as e:
         print(f"\n❌ Error: {e}")
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
 
 if __name__ == '__main__':
     update_1404_breakdown()
@@ -167,3 +167,13 @@ INSERT INTO data_quality_notes (table_name, year_persian, note_type, note) VALUE
 -- GRANT SELECT ON budget_scope_notes TO budget_user;
 -- GRANT SELECT ON budget_overview_detailed TO budget_user;
 -- GRANT SELECT ON operational_revenues_view TO budget_user;
+
+-- =====================================================
+-- REFRESH MATERIALIZED VIEWS (create_materialized_views.sql)
+-- =====================================================
+DO $$
+BEGIN
+    IF to_regproc('refresh_budget_views') IS NOT NULL THEN
+        PERFORM refresh_budget_views();
+    END IF;
+END $$;